@@ -53,6 +53,40 @@ export interface paths {
         patch?: never;
         trace?: never;
     };
+    "/api/enhanced-data/{id}/export/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        /** @description Download the enhanced rows as a file. Rows are read and serialised in batches while the response streams, so the size of the result does not matter. */
+        get: operations["enhanced_data_export_retrieve"];
+        put?: never;
+        post?: never;
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
+    "/api/enhanced-data/{id}/stats/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        /** @description Where the job's time and tokens go: LLM calls, tokens, retries, cache hits and wall time per graph node and tool, for the whole job and per chunk. While the job runs, the numbers cover the chunk runs finished so far. */
+        get: operations["enhanced_data_stats_retrieve"];
+        put?: never;
+        post?: never;
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/original-data/": {
         parameters: {
             query?: never;
@@ -85,16 +119,45 @@ export interface paths {
         patch: operations["original_data_partial_update"];
         trace?: never;
     };
+    "/api/original-data/upload/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        get?: never;
+        put?: never;
+        /** @description Upload a CSV, JSON or JSONL file. The file is parsed on the server as it is read and its rows are stored in batches, so large files never have to fit in memory. */
+        post: operations["original_data_upload_create"];
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
 }
 export type webhooks = Record<string, never>;
 export interface components {
     schemas: {
+        ChunkStats: {
+            chunk_index: number;
+            status: string;
+            rows: number;
+            totals: components["schemas"]["MetricsTotals"];
+        };
         EnhancedData: {
             readonly id: number;
             /** @default pending */
             status: string;
             /** @description Array of objects representing the enhanced data */
             data?: unknown;
+            /** @description Number of chunks the data was split into */
+            readonly total_chunks: number;
+            /** @description Number of successfully enhanced chunks */
+            readonly chunks_done: number;
+            /** @description Number of chunks that failed */
+            readonly chunks_failed: number;
             /** Format: date-time */
             readonly created_at: string;
             /** Format: date-time */
@@ -108,6 +171,102 @@ export interface components {
             schema: {
                 [key: string]: components["schemas"]["SchemaField"];
             };
+            /** @description ID of a complete EnhancedData to re-enhance incrementally: unchanged rows and fields are copied from it */
+            previous_enhanced_data_id?: number | null;
+        };
+        EnhancedDataStats: {
+            id: number;
+            status: string;
+            total_chunks: number;
+            chunks_done: number;
+            chunks_failed: number;
+            /**
+             * Format: double
+             * @description Time since the job started, or its duration once it finished
+             */
+            elapsed_seconds: number;
+            /** @description Cache hits and misses and rows that bypassed the LLM */
+            stats: {
+                [key: string]: unknown;
+            };
+            /** @description Metrics summed over every chunk run so far */
+            metrics: components["schemas"]["JobMetrics"];
+            chunks: components["schemas"]["ChunkStats"][];
+        };
+        /** @description List representation without `data`. */
+        EnhancedDataSummary: {
+            readonly id: number;
+            /** @description Status of the enhancement process */
+            status?: "pending" | "complete" | "failed";
+            /** @description Target output schema the data was enhanced with */
+            schema?: unknown;
+            /** @description Fingerprint of the schema, kept up to date on save */
+            readonly schema_fingerprint: string;
+            /** @description Job statistics such as cache hits and misses */
+            stats?: unknown;
+            /** @description Number of chunks the data was split into */
+            total_chunks?: number;
+            /** @description Number of successfully enhanced chunks */
+            chunks_done?: number;
+            /** @description Number of chunks that failed */
+            chunks_failed?: number;
+            /** @description Number of rows in data */
+            readonly row_count: number;
+            /** Format: date-time */
+            readonly created_at: string;
+            /** Format: date-time */
+            readonly updated_at: string;
+            /** @description Fields that deduplicated rows take from their entity's representative */
+            readonly dedup_fields: unknown;
+            original_data: number;
+            /** @description Earlier job whose results for unchanged rows and fields were copied forward */
+            previous_enhanced_data?: number | null;
+        };
+        JobMetrics: {
+            /** @description Metrics per graph node */
+            nodes: {
+                [key: string]: components["schemas"]["NodeMetrics"];
+            };
+            /** @description Metrics per tool */
+            tools: {
+                [key: string]: components["schemas"]["ToolMetrics"];
+            };
+            totals: components["schemas"]["MetricsTotals"];
+        };
+        MetricsTotals: {
+            llm_calls: number;
+            prompt_tokens: number;
+            completion_tokens: number;
+            retries: number;
+            /** Format: double */
+            node_seconds: number;
+            /** Format: double */
+            llm_seconds: number;
+            tool_calls: number;
+            tool_cache_hits: number;
+            /** Format: double */
+            tool_seconds: number;
+        };
+        NodeMetrics: {
+            runs: number;
+            /**
+             * Format: double
+             * @description Wall time of the node runs
+             */
+            seconds: number;
+            errors: number;
+            llm_calls: number;
+            /**
+             * Format: double
+             * @description Wall time of the node's LLM requests, including rate limiting and retries
+             */
+            llm_seconds: number;
+            /** @description Provider-reported input tokens, estimated when the provider reports none */
+            prompt_tokens: number;
+            /** @description Provider-reported output tokens, estimated when the provider reports none */
+            completion_tokens: number;
+            /** @description LLM requests retried after a rate limit error */
+            retries: number;
         };
         OriginalData: {
             readonly id: number;
@@ -115,12 +274,97 @@ export interface components {
             schema?: {
                 [key: string]: "int" | "str" | "bool" | "float";
             } | null;
+            /** @description Fingerprint of the schema, kept up to date on save */
+            readonly schema_fingerprint: string;
             data?: unknown;
             /** Format: date-time */
             readonly created_at: string;
             /** Format: date-time */
             readonly updated_at: string;
         };
+        /**
+         * @description * `csv` - csv
+         *     * `json` - json
+         *     * `jsonl` - jsonl
+         * @enum {string}
+         */
+        FileTypeEnum: "csv" | "json" | "jsonl";
+        /** @description List representation without `data`; `first_row` is annotated by the view for previews. */
+        OriginalDataSummary: {
+            readonly id: number;
+            /** @description Schema definition mapping field names to types (e.g., {'id': 'int', 'name': 'str'}) */
+            schema?: unknown;
+            /** @description Fingerprint of the schema, kept up to date on save */
+            readonly schema_fingerprint: string;
+            /** @description Number of rows in data */
+            readonly row_count: number;
+            /** @description First row of data, for previews */
+            readonly first_row: unknown;
+            /** Format: date-time */
+            readonly created_at: string;
+            /** Format: date-time */
+            readonly updated_at: string;
+        };
+        OriginalDataUpload: {
+            /**
+             * Format: uri
+             * @description CSV (with a header line), JSON array of objects or JSONL file
+             */
+            file: string;
+            /**
+             * @description Format of the file; detected from the file extension when omitted
+             *
+             *     * `csv` - csv
+             *     * `json` - json
+             *     * `jsonl` - jsonl
+             */
+            file_type?: components["schemas"]["FileTypeEnum"];
+            /** @description JSON schema mapping field names to types; inferred from a sample of rows when omitted */
+            schema?: unknown;
+        };
+        OriginalDataUploadResult: {
+            id: number;
+            schema: {
+                [key: string]: string;
+            };
+            row_count: number;
+            /**
+             * Format: double
+             * @description Time spent parsing and storing the rows
+             */
+            seconds: number;
+            /**
+             * Format: double
+             * @description Ingestion throughput
+             */
+            rows_per_second: number;
+        };
+        PaginatedEnhancedDataSummaryList: {
+            /**
+             * Format: uri
+             * @example http://api.example.org/accounts/?cursor=cD00ODY%3D"
+             */
+            next?: string | null;
+            /**
+             * Format: uri
+             * @example http://api.example.org/accounts/?cursor=cj0xJnA9NDg3
+             */
+            previous?: string | null;
+            results: components["schemas"]["EnhancedDataSummary"][];
+        };
+        PaginatedOriginalDataSummaryList: {
+            /**
+             * Format: uri
+             * @example http://api.example.org/accounts/?cursor=cD00ODY%3D"
+             */
+            next?: string | null;
+            /**
+             * Format: uri
+             * @example http://api.example.org/accounts/?cursor=cj0xJnA9NDg3
+             */
+            previous?: string | null;
+            results: components["schemas"]["OriginalDataSummary"][];
+        };
         PatchedEnhancedData: {
             readonly id?: number;
             /** @default pending */
@@ -139,6 +383,8 @@ export interface components {
             schema?: {
                 [key: string]: "int" | "str" | "bool" | "float";
             } | null;
+            /** @description Fingerprint of the schema, kept up to date on save */
+            readonly schema_fingerprint?: string;
             data?: unknown;
             /** Format: date-time */
             readonly created_at?: string;
@@ -158,6 +404,13 @@ export interface components {
             /** @description Description of what this field should contain */
             description?: string;
         };
+        ToolMetrics: {
+            calls: number;
+            /** Format: double */
+            seconds: number;
+            errors: number;
+            cache_hits: number;
+        };
         /**
          * @description * `int` - int
          *     * `str` - str
@@ -177,7 +430,16 @@ export type $defs = Record<string, never>;
 export interface operations {
     enhanced_data_list: {
         parameters: {
-            query?: never;
+            query?: {
+                /** @description The pagination cursor value. */
+                cursor?: string;
+                /** @description Only list enhancements of this OriginalData */
+                original_data?: number;
+                /** @description Number of results to return per page. */
+                page_size?: number;
+                /** @description Only list enhancements with this status */
+                status?: "complete" | "failed" | "pending";
+            };
             header?: never;
             path?: never;
             cookie?: never;
@@ -189,7 +451,7 @@ export interface operations {
                     [name: string]: unknown;
                 };
                 content: {
-                    "application/json": components["schemas"]["EnhancedData"][];
+                    "application/json": components["schemas"]["PaginatedEnhancedDataSummaryList"];
                 };
             };
         };
@@ -221,7 +483,14 @@ export interface operations {
     };
     enhanced_data_retrieve: {
         parameters: {
-            query?: never;
+            query?: {
+                /** @description Maximum number of rows of `data` to return (default: all) */
+                limit?: number;
+                /** @description Index of the first row of `data` to return (default: 0) */
+                offset?: number;
+                /** @description While the job is pending, return the rows of the chunks completed so far (default: true) */
+                partial?: boolean;
+            };
             header?: never;
             path: {
                 /** @description A unique integer value identifying this enhanced data. */
@@ -342,10 +611,64 @@ export interface operations {
             };
         };
     };
-    original_data_list: {
+    enhanced_data_export_retrieve: {
+        parameters: {
+            query?: {
+                /** @description File format (default: csv) */
+                format?: "csv" | "jsonl" | "parquet";
+            };
+            header?: never;
+            path: {
+                /** @description A unique integer value identifying this enhanced data. */
+                id: number;
+            };
+            cookie?: never;
+        };
+        requestBody?: never;
+        responses: {
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "text/csv": string;
+                    "application/jsonl": string;
+                    "application/vnd.apache.parquet": string;
+                };
+            };
+        };
+    };
+    enhanced_data_stats_retrieve: {
         parameters: {
             query?: never;
             header?: never;
+            path: {
+                /** @description A unique integer value identifying this enhanced data. */
+                id: number;
+            };
+            cookie?: never;
+        };
+        requestBody?: never;
+        responses: {
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["EnhancedDataStats"];
+                };
+            };
+        };
+    };
+    original_data_list: {
+        parameters: {
+            query?: {
+                /** @description The pagination cursor value. */
+                cursor?: string;
+                /** @description Number of results to return per page. */
+                page_size?: number;
+            };
+            header?: never;
             path?: never;
             cookie?: never;
         };
@@ -356,7 +679,7 @@ export interface operations {
                     [name: string]: unknown;
                 };
                 content: {
-                    "application/json": components["schemas"]["OriginalData"][];
+                    "application/json": components["schemas"]["PaginatedOriginalDataSummaryList"];
                 };
             };
         };
@@ -388,7 +711,12 @@ export interface operations {
     };
     original_data_retrieve: {
         parameters: {
-            query?: never;
+            query?: {
+                /** @description Maximum number of rows of `data` to return (default: all) */
+                limit?: number;
+                /** @description Index of the first row of `data` to return (default: 0) */
+                offset?: number;
+            };
             header?: never;
             path: {
                 /** @description A unique integer value identifying this original data. */
@@ -485,4 +813,27 @@ export interface operations {
             };
         };
     };
+    original_data_upload_create: {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        requestBody: {
+            content: {
+                "multipart/form-data": components["schemas"]["OriginalDataUpload"];
+            };
+        };
+        responses: {
+            201: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["OriginalDataUploadResult"];
+                };
+            };
+        };
+    };
 }
@@ -3,6 +3,7 @@ import { INTERNAL__useGetOriginalDataDetail } from "./api_hooks/INTERNAL__useGet
 import { INTERNAL__useGetEnhancedDataList } from "./api_hooks/INTERNAL__useGetEnhancedDataList";
 import { INTERNAL__useGetEnhancedDataDetail } from "./api_hooks/INTERNAL__useGetEnhancedDataDetail";
 import { INTERNAL__useDeleteEnhancedData } from "./api_hooks/INTERNAL__useDeleteEnhancedData";
+import { INTERNAL__useEnhancedDataEvents } from "./api_hooks/INTERNAL__useEnhancedDataEvents";
 
 export const INTERNAL__dataOverviewApi = {
 	useGetOriginalDataList: INTERNAL__useGetOriginalDataList,
@@ -10,4 +11,5 @@ export const INTERNAL__dataOverviewApi = {
 	useGetEnhancedDataList: INTERNAL__useGetEnhancedDataList,
 	useGetEnhancedDataDetail: INTERNAL__useGetEnhancedDataDetail,
 	useDeleteEnhancedData: INTERNAL__useDeleteEnhancedData,
+	useEnhancedDataEvents: INTERNAL__useEnhancedDataEvents,
 };
@@ -4,8 +4,12 @@ import { apiClientFetch } from "@/api/apiClient";
 export const INTERNAL__dataOverviewQueries = createQueryKeys("dataOverview", {
 	getOriginalDataList: () => ({
 		queryKey: ["getOriginalDataList"],
-		queryFn: async () => {
-			const response = await apiClientFetch.GET("/api/original-data/");
+		queryFn: async ({ pageParam }: { pageParam?: unknown }) => {
+			const response = await apiClientFetch.GET("/api/original-data/", {
+				params: {
+					query: { cursor: (pageParam as string | null) ?? undefined },
+				},
+			});
 
 			const { error } = response;
 			if (error) {
@@ -34,10 +38,17 @@ export const INTERNAL__dataOverviewQueries = createQueryKeys("dataOverview", {
 			return response.data;
 		},
 	}),
-	getEnhancedDataList: () => ({
-		queryKey: ["getEnhancedDataList"],
+	getEnhancedDataList: ({
+		originalDataId,
+		pageSize,
+	}: { originalDataId?: number; pageSize?: number } = {}) => ({
+		queryKey: ["getEnhancedDataList", { originalDataId, pageSize }],
 		queryFn: async () => {
-			const response = await apiClientFetch.GET("/api/enhanced-data/");
+			const response = await apiClientFetch.GET("/api/enhanced-data/", {
+				params: {
+					query: { original_data: originalDataId, page_size: pageSize },
+				},
+			});
 
 			const { error } = response;
 			if (error) {
@@ -0,0 +1,59 @@
+import { useEffect } from "react";
+import { useQueryClient } from "@tanstack/react-query";
+import { baseApiUrl } from "@/api/apiClient";
+import { queries } from "@/api/queries";
+import type { components } from "@/api/schema";
+
+type EnhancedData = components["schemas"]["EnhancedData"];
+
+type JobProgress = Pick<
+	EnhancedData,
+	"status" | "total_chunks" | "chunks_done" | "chunks_failed"
+>;
+
+export const INTERNAL__useEnhancedDataEvents = ({
+	id,
+	enabled,
+}: {
+	id: number;
+	enabled?: boolean;
+}) => {
+	const queryClient = useQueryClient();
+
+	useEffect(() => {
+		if (enabled === false || !id) return;
+
+		const eventSource = new EventSource(
+			`${baseApiUrl}/api/enhanced-data/${id}/events/`,
+			{ withCredentials: true },
+		);
+		const detailQueryKey =
+			queries.dataOverview.getEnhancedDataDetail({ id }).queryKey;
+
+		// Progress events only carry counters, so they update the cached detail in place;
+		// the rows are fetched again once the job has finished
+		const updateProgress = (event: Event) => {
+			const { status, total_chunks, chunks_done, chunks_failed } = JSON.parse(
+				(event as MessageEvent).data,
+			) as JobProgress;
+
+			if (status === "complete" || status === "failed") {
+				eventSource.close();
+				queryClient.invalidateQueries({ queryKey: detailQueryKey });
+				return;
+			}
+
+			queryClient.setQueryData<EnhancedData>(detailQueryKey, (detail) =>
+				detail
+					? { ...detail, status, total_chunks, chunks_done, chunks_failed }
+					: detail,
+			);
+		};
+
+		eventSource.addEventListener("started", updateProgress);
+		eventSource.addEventListener("chunk", updateProgress);
+		eventSource.addEventListener("status", updateProgress);
+
+		return () => eventSource.close();
+	}, [id, enabled, queryClient]);
+};
@@ -1,8 +1,11 @@
 import { useQuery } from "@tanstack/react-query";
 import { queries } from "@/api/queries";
 
-export const INTERNAL__useGetEnhancedDataList = () => {
+export const INTERNAL__useGetEnhancedDataList = ({
+	originalDataId,
+	pageSize,
+}: { originalDataId?: number; pageSize?: number } = {}) => {
 	return useQuery({
-		...queries.dataOverview.getEnhancedDataList(),
+		...queries.dataOverview.getEnhancedDataList({ originalDataId, pageSize }),
 	});
 };
@@ -1,8 +1,12 @@
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery } from "@tanstack/react-query";
 import { queries } from "@/api/queries";
 
+// Cursor-paginated: each page holds `results` and the `next` page URL
 export const INTERNAL__useGetOriginalDataList = () => {
-	return useQuery({
+	return useInfiniteQuery({
 		...queries.dataOverview.getOriginalDataList(),
+		initialPageParam: null as string | null,
+		getNextPageParam: (lastPage) =>
+			lastPage?.next ? new URL(lastPage.next).searchParams.get("cursor") : null,
 	});
 };
@@ -1,20 +1,39 @@
+import { baseApiUrl } from "@/api/apiClient";
 import type { ParsedData } from "../data-upload-form/data-upload-form.types";
 import type { DataPreviewInfo } from "./data-overview.types";
 
-export function formatDataPreview(data: unknown): DataPreviewInfo | null {
-	if (!data || !Array.isArray(data) || data.length === 0) {
+export type ExportFormat = "csv" | "jsonl" | "parquet";
+
+export const EXPORT_FORMATS: { format: ExportFormat; label: string }[] = [
+	{ format: "csv", label: "CSV" },
+	{ format: "jsonl", label: "JSONL" },
+	{ format: "parquet", label: "Parquet" },
+];
+
+// The backend streams the export, so every row is included however large the result is
+export function enhancedDataExportUrl(
+	enhancedDataId: number,
+	format: ExportFormat,
+): string {
+	return `${baseApiUrl}/api/enhanced-data/${enhancedDataId}/export/?format=${format}`;
+}
+
+export function formatDataPreview(
+	firstRow: unknown,
+	rowCount: number,
+): DataPreviewInfo | null {
+	if (!firstRow || typeof firstRow !== "object" || rowCount === 0) {
 		return null;
 	}
 
-	const parsedData = data as ParsedData;
-	const firstRow = parsedData[0];
-	const columnNames = Object.keys(firstRow);
+	const row = firstRow as ParsedData[number];
+	const columnNames = Object.keys(row);
 
 	return {
-		rowCount: parsedData.length,
+		rowCount,
 		columnCount: columnNames.length,
 		columnNames,
-		firstRow,
+		firstRow: row,
 	};
 }
 
@@ -5,16 +5,25 @@ import { Button } from "@/components/ui/button"
 import { Input } from "@/components/ui/input"
 import { Label } from "@/components/ui/label"
 import type { ParsedData } from "./data-upload-form.types"
-import { detectFileType, parseCSV, parseJSON } from "./data-upload-form"
+import {
+  detectFileType,
+  parseCSV,
+  parseJSON,
+  shouldUploadToServer,
+} from "./data-upload-form"
 
 export type DataUploadFormProps = {
   onDataParsed: (data: ParsedData) => void
+  onLargeFile: (file: File) => void
   onError: (error: string) => void
+  isUploading?: boolean
 }
 
 export const DataUploadForm = ({
   onDataParsed,
+  onLargeFile,
   onError,
+  isUploading = false,
 }: DataUploadFormProps) => {
   const [isLoading, setIsLoading] = useState(false)
   const fileInputRef = useRef<HTMLInputElement>(null)
@@ -27,6 +36,11 @@ export const DataUploadForm = ({
     onError("")
 
     try {
+      if (shouldUploadToServer(file)) {
+        onLargeFile(file)
+        return
+      }
+
       const fileType = detectFileType(file)
       let parsedData: ParsedData
 
@@ -68,21 +82,25 @@ export const DataUploadForm = ({
             id="file-upload"
             ref={fileInputRef}
             type="file"
-            accept=".csv,.json"
+            accept=".csv,.json,.jsonl,.ndjson"
             onChange={handleFileChange}
             className="hidden"
           />
           <Button
             onClick={handleButtonClick}
-            disabled={isLoading}
+            disabled={isLoading || isUploading}
             variant="default"
             className="w-full sm:w-auto"
             size="default"
           >
-            {isLoading ? "Processing..." : "Choose File"}
+            {isUploading
+              ? "Uploading..."
+              : isLoading
+                ? "Processing..."
+                : "Choose File"}
           </Button>
           <span className="text-xs text-muted-foreground sm:text-sm">
-            CSV or JSON files only
+            CSV, JSON or JSONL files only
           </span>
         </div>
       </div>
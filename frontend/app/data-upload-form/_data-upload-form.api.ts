@@ -1,7 +1,9 @@
 import { INTERNAL__usePostEnhanceData } from "./api_hooks/usePostEnhanceData";
 import { INTERNAL__usePostOriginalData } from "./api_hooks/INTERNAL__usePostOriginalData";
+import { INTERNAL__usePostOriginalDataUpload } from "./api_hooks/INTERNAL__usePostOriginalDataUpload";
 
 export const INTERNAL__dataUploadFormApi = {
 	usePostEnhanceData: INTERNAL__usePostEnhanceData,
 	usePostOriginalData: INTERNAL__usePostOriginalData,
+	usePostOriginalDataUpload: INTERNAL__usePostOriginalDataUpload,
 };
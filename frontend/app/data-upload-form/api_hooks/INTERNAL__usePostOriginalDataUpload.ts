@@ -0,0 +1,31 @@
+import { apiClientFetch } from "@/api/apiClient";
+import { components } from "@/api/schema";
+import { useMutation } from "@tanstack/react-query";
+
+export const INTERNAL__usePostOriginalDataUpload = () => {
+	return useMutation({
+		mutationFn: async (data: {
+			file: File;
+			schema?: Record<string, "int" | "str" | "bool" | "float">;
+		}) => {
+			// The file is sent as-is and parsed on the server, so it never has to fit in browser memory
+			const response = await apiClientFetch.POST("/api/original-data/upload/", {
+				body: {
+					file: data.file.name,
+				} as components["schemas"]["OriginalDataUpload"],
+				bodySerializer: () => {
+					const formData = new FormData();
+					formData.append("file", data.file);
+					if (data.schema) {
+						formData.append("schema", JSON.stringify(data.schema));
+					}
+					return formData;
+				},
+			});
+			if (response.error) {
+				throw response.error;
+			}
+			return response.data;
+		},
+	});
+};
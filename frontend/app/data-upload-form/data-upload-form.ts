@@ -5,6 +5,18 @@ import type {
 	JsonArray,
 } from "./data-upload-form.types";
 
+// Larger files (and JSONL) are uploaded as-is and parsed on the server
+export const CLIENT_PARSE_MAX_BYTES = 10 * 1024 * 1024;
+
+export function shouldUploadToServer(file: File): boolean {
+	const extension = file.name.split(".").pop()?.toLowerCase();
+	return (
+		file.size > CLIENT_PARSE_MAX_BYTES ||
+		extension === "jsonl" ||
+		extension === "ndjson"
+	);
+}
+
 export function detectFileType(file: File): "csv" | "json" {
 	const extension = file.name.split(".").pop()?.toLowerCase();
 	if (extension === "csv") return "csv";
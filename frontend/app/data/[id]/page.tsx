@@ -8,7 +8,12 @@ import { DataPreview } from "@/app/data-preview/DataPreview.component";
 import { api } from "@/api/api";
 import { queries } from "@/api/queries";
 import { inferSchema } from "@/app/data-upload-form/data-upload-form";
-import { exportToCSV } from "@/app/data-overview/data-overview";
+import {
+	EXPORT_FORMATS,
+	enhancedDataExportUrl,
+	exportToCSV,
+	type ExportFormat,
+} from "@/app/data-overview/data-overview";
 import type { ParsedData } from "@/app/data-upload-form/data-upload-form.types";
 import type { SchemaField } from "@/app/data-detail/data-detail.types";
 import { SchemaEditor } from "@/app/data-detail/SchemaEditor.component";
@@ -21,7 +26,11 @@ export default function DataDetailPage() {
 
 	const { data: originalData, isLoading: isLoadingOriginal } =
 		api.dataOverview.useGetOriginalDataDetail({ id });
-	const { data: enhancedDataList } = api.dataOverview.useGetEnhancedDataList();
+	// Only the latest enhancement of this dataset is shown
+	const { data: enhancedDataList } = api.dataOverview.useGetEnhancedDataList({
+		originalDataId: id,
+		pageSize: 1,
+	});
 	const enhanceMutation = api.dataUploadForm.usePostEnhanceData();
 	const deleteMutation = api.dataOverview.useDeleteEnhancedData();
 
@@ -33,9 +42,8 @@ export default function DataDetailPage() {
 	>(null);
 
 	const enhancedDataFromList = useMemo(() => {
-		if (!enhancedDataList) return null;
-		return enhancedDataList.find((ed) => ed.original_data === id) || null;
-	}, [enhancedDataList, id]);
+		return enhancedDataList?.results[0] ?? null;
+	}, [enhancedDataList]);
 
 	// Determine which ID to poll for - prioritize manually set ID, then pending from list
 	const pollId = useMemo(() => {
@@ -51,33 +59,37 @@ export default function DataDetailPage() {
 
 	const shouldPoll = pollId !== null;
 
+	// The list only carries summaries, the rows come from the detail endpoint
+	const detailId = enhancedDataId ?? enhancedDataFromList?.id ?? null;
+
 	const { data: enhancedDataDetail } =
 		api.dataOverview.useGetEnhancedDataDetail({
-			id: pollId ?? 0,
-			enabled: shouldPoll,
-			refetchInterval: (data) => {
-				const status = (data as { status?: string })?.status;
-				if (status === "pending") {
-					return 2000;
-				}
-				return false;
-			},
+			id: detailId ?? 0,
+			enabled: detailId !== null,
 		});
 
+	// Status and chunk completions are pushed by the server instead of polled
+	api.dataOverview.useEnhancedDataEvents({
+		id: pollId ?? 0,
+		enabled: shouldPoll,
+	});
+
 	useEffect(() => {
 		if (enhancedDataDetail) {
 			const status = (enhancedDataDetail as { status?: string })?.status;
 			if (status === "complete" || status === "failed") {
 				queryClient.invalidateQueries({
-					queryKey: queries.dataOverview.getEnhancedDataList().queryKey,
+					queryKey: queries.dataOverview.getEnhancedDataList._def,
 				});
 			}
 		}
 	}, [enhancedDataDetail, queryClient]);
 
-	const enhancedData = enhancedDataDetail || enhancedDataFromList;
+	const enhancedData = enhancedDataDetail ?? null;
 
-	const enhancedDataStatus = (enhancedData as { status?: string })?.status;
+	const enhancedDataStatus = (
+		(enhancedDataDetail ?? enhancedDataFromList) as { status?: string } | null
+	)?.status;
 
 	// Check if we're in a pending state (either from data or from polling)
 	const isPending =
@@ -194,7 +206,7 @@ export default function DataDetailPage() {
 			}
 
 			await queryClient.invalidateQueries({
-				queryKey: queries.dataOverview.getEnhancedDataList().queryKey,
+				queryKey: queries.dataOverview.getEnhancedDataList._def,
 			});
 		} catch (err) {
 			const errorMessage =
@@ -212,9 +224,9 @@ export default function DataDetailPage() {
 		exportToCSV(originalDataParsed, `original-data-${id}.csv`);
 	};
 
-	const handleExportEnhanced = () => {
-		if (!enhancedDataParsed) return;
-		exportToCSV(enhancedDataParsed, `enhanced-data-${id}.csv`);
+	const handleExportEnhanced = (format: ExportFormat) => {
+		if (!enhancedData) return;
+		window.location.assign(enhancedDataExportUrl(enhancedData.id, format));
 	};
 
 	const handleDeleteEnhancedData = async () => {
@@ -229,7 +241,7 @@ export default function DataDetailPage() {
 			setEnhancementSchemaState(null);
 
 			await queryClient.invalidateQueries({
-				queryKey: queries.dataOverview.getEnhancedDataList().queryKey,
+				queryKey: queries.dataOverview.getEnhancedDataList._def,
 			});
 
 			if (enhancedData.id) {
@@ -287,13 +299,18 @@ export default function DataDetailPage() {
 				<div className="space-y-6">
 					<div className="flex items-center justify-between">
 						<h2 className="text-xl font-semibold">Enhanced Data</h2>
-						<button
-							type="button"
-							onClick={handleExportEnhanced}
-							className="text-sm text-primary underline hover:text-primary/80"
-						>
-							Export to CSV
-						</button>
+						<div className="flex gap-3">
+							{EXPORT_FORMATS.map(({ format, label }) => (
+								<button
+									key={format}
+									type="button"
+									onClick={() => handleExportEnhanced(format)}
+									className="text-sm text-primary underline hover:text-primary/80"
+								>
+									Export to {label}
+								</button>
+							))}
+						</div>
 					</div>
 					<div className="rounded-md border border-green-500 bg-green-50 p-4 text-sm text-green-800 dark:bg-green-950 dark:text-green-200">
 						This data has been enhanced. You can view it below or export it.
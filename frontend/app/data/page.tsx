@@ -7,11 +7,18 @@ import { Button } from "@/components/ui/button";
 
 export default function DataOverviewPage() {
 	const {
-		data: originalDataList,
+		data: originalDataPages,
 		isLoading,
 		error,
+		hasNextPage,
+		fetchNextPage,
+		isFetchingNextPage,
 	} = api.dataOverview.useGetOriginalDataList();
 
+	const originalDataList = originalDataPages?.pages.flatMap(
+		(page) => page?.results ?? [],
+	);
+
 	if (isLoading) {
 		return (
 			<div className="container mx-auto max-w-7xl px-4 py-6 sm:px-6 sm:py-8 lg:px-8">
@@ -61,7 +68,7 @@ export default function DataOverviewPage() {
 
 			<div className="grid gap-4 sm:grid-cols-2 lg:grid-cols-3">
 				{originalDataList.map((item) => {
-					const preview = formatDataPreview(item.data);
+					const preview = formatDataPreview(item.first_row, item.row_count);
 					const createdDate = new Date(item.created_at).toLocaleDateString();
 
 					return (
@@ -118,6 +125,18 @@ export default function DataOverviewPage() {
 					);
 				})}
 			</div>
+
+			{hasNextPage && (
+				<div className="mt-6 flex justify-center">
+					<Button
+						variant="outline"
+						onClick={() => fetchNextPage()}
+						disabled={isFetchingNextPage}
+					>
+						{isFetchingNextPage ? "Loading..." : "Load more"}
+					</Button>
+				</div>
+			)}
 		</div>
 	);
 }
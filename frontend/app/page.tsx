@@ -20,6 +20,7 @@ export default function DataEnhancementPage() {
 	const [columnMetadata, setColumnMetadata] = useState<ColumnMetadataMap>({});
 
 	const saveMutation = api.dataUploadForm.usePostOriginalData();
+	const uploadMutation = api.dataUploadForm.usePostOriginalDataUpload();
 
 	const handleDataParsed = (data: ParsedData) => {
 		setParsedData(data);
@@ -32,6 +33,26 @@ export default function DataEnhancementPage() {
 		setParsedData(null);
 	};
 
+	const handleLargeFile = async (file: File) => {
+		setParsedData(null);
+		setError(null);
+
+		try {
+			const result = await uploadMutation.mutateAsync({ file });
+			if (result?.id) {
+				router.push(`/data/${result.id}`);
+			}
+		} catch (err) {
+			const errorMessage =
+				err instanceof Error
+					? err.message
+					: typeof err === "object" && err !== null && "error" in err
+						? String(err.error)
+						: "Failed to upload file. Please try again.";
+			setError(errorMessage);
+		}
+	};
+
 	const handleSave = async () => {
 		if (!parsedData || parsedData.length === 0) {
 			return;
@@ -72,7 +93,12 @@ export default function DataEnhancementPage() {
 			</div>
 
 			<div className="mb-6 sm:mb-8">
-				<DataUploadForm onDataParsed={handleDataParsed} onError={handleError} />
+				<DataUploadForm
+					onDataParsed={handleDataParsed}
+					onLargeFile={handleLargeFile}
+					onError={handleError}
+					isUploading={uploadMutation.isPending}
+				/>
 			</div>
 
 			{error && (
@@ -1,32 +1,27 @@
-from pydantic import BaseModel, Field
+from typing import Any
+
 from langchain_core.messages import AIMessage
 from langchain_core.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+from pydantic import BaseModel
 
 from graph.models import composer_model_name
-from graph.output_formats import build_dynamic_model
+from graph.output_formats import build_response_wrapper
+from graph.routing import enhanced_records
+from graph.runtime import runtime
+from graph.schema_registry import schema_registry
 from graph.states import MessagesState
+from graph.utils import estimate_tokens
 from dotenv import load_dotenv
 load_dotenv()
 
 
-def composer_node(state: MessagesState) -> MessagesState:
-    schema_dict = state["schema"]
-    DynamicDataModel = build_dynamic_model(schema_dict, "ComposerResponse")
-    
-    class ComposerResponseWrapper(BaseModel):
-        composed_data: list[DynamicDataModel] = Field(
-            description="The final formatted dataset as a list of record dictionaries"
-        )
-    
-    composer_model = ChatGoogleGenerativeAI(
-        model=composer_model_name,
-        temperature=0,
-    ).with_structured_output(ComposerResponseWrapper)
-
-    enhanced_data = state["enhanced_data"]
-
-    prompt = PromptTemplate.from_template("""
+def _composer_model(state: MessagesState):
+    ComposerResponseWrapper = build_response_wrapper(state["schema"], "ComposerResponse", state.get("schema_fingerprint"))
+    return runtime.get_model(composer_model_name, ComposerResponseWrapper)
+
+
+def _composer_prompt(enhanced_data: list[Any]) -> str:
+    return PromptTemplate.from_template("""
         You are a Data Composer and Formatter.
         Your goal is to assemble the final data product by combining the original data with any newly fetched information, and then formatting it for the user.
 
@@ -47,11 +42,71 @@ def composer_node(state: MessagesState) -> MessagesState:
         - Do not add annotations or comments to the data.
     """).format(enhanced_data=enhanced_data)
 
-    response = composer_model.invoke(prompt)
+
+def _composer_update(composed_data: list[BaseModel]) -> MessagesState:
     return {
-        "messages": [
-            *state["messages"],
-            AIMessage(str(response.composed_data)),
-        ],
-        "composed_data": response.composed_data,
-    }
\ No newline at end of file
+        "messages": [AIMessage(str(composed_data))],
+        "composed_data": composed_data,
+    }
+
+
+def parse_composed_data(state: MessagesState) -> tuple[list[BaseModel | None] | None, list[dict[str, Any]]]:
+    """Validate the enhancer's records against the schema in Python, without the LLM.
+
+    Returns:
+        One validated record per enhanced record (None where it failed validation)
+        and the records that failed, in order; (None, []) when the output is not records at all
+    """
+    records = enhanced_records(state["enhanced_data"])
+    if records is None:
+        return None, []
+
+    # The registry entry behind the composer's response wrapper, so both produce the same instances
+    composed, _ = schema_registry.get(
+        state["schema"], "ComposerResponse", state.get("schema_fingerprint")
+    ).validate_rows(records)
+    invalid = [record for record, validated in zip(records, composed) if validated is None]
+    return composed, invalid
+
+
+def _merge_repairs(composed: list[BaseModel | None], repaired: list[BaseModel]) -> list[BaseModel] | None:
+    """Put the LLM's repaired records in place of the invalid ones; None unless there is exactly one per invalid record."""
+    if len(repaired) != composed.count(None):
+        return None
+    repaired = iter(repaired)
+    return [record if record is not None else next(repaired) for record in composed]
+
+
+def _compose_with_llm(state: MessagesState, enhanced_data: list[Any]) -> list[BaseModel]:
+    prompt = _composer_prompt(enhanced_data)
+    composer_model = _composer_model(state)
+    response = runtime.call_llm(composer_model_name, estimate_tokens(prompt), lambda: composer_model.invoke(prompt))
+    return response.composed_data
+
+
+async def _acompose_with_llm(state: MessagesState, enhanced_data: list[Any]) -> list[BaseModel]:
+    prompt = _composer_prompt(enhanced_data)
+    composer_model = _composer_model(state)
+    response = await runtime.acall_llm(composer_model_name, estimate_tokens(prompt), lambda: composer_model.ainvoke(prompt))
+    return response.composed_data
+
+
+def composer_node(state: MessagesState) -> MessagesState:
+    if state.get("composer_mode") == "parse":
+        composed, invalid = parse_composed_data(state)
+        if composed is not None:
+            # Only the records that failed validation cost an LLM call
+            merged = _merge_repairs(composed, _compose_with_llm(state, invalid)) if invalid else composed
+            if merged is not None:
+                return _composer_update(merged)
+    return _composer_update(_compose_with_llm(state, state["enhanced_data"]))
+
+
+async def acomposer_node(state: MessagesState) -> MessagesState:
+    if state.get("composer_mode") == "parse":
+        composed, invalid = parse_composed_data(state)
+        if composed is not None:
+            merged = _merge_repairs(composed, await _acompose_with_llm(state, invalid)) if invalid else composed
+            if merged is not None:
+                return _composer_update(merged)
+    return _composer_update(await _acompose_with_llm(state, state["enhanced_data"]))
@@ -1,25 +1,22 @@
-from langchain.agents import AgentExecutor, create_tool_calling_agent
+import json
+import os
+
+from langchain.agents import AgentExecutor
+from langchain.agents.format_scratchpad.tools import format_to_tool_messages
+from langchain.agents.output_parsers.tools import ToolsAgentOutputParser
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.runnables import Runnable, RunnableLambda, RunnablePassthrough
 from langchain_tavily import TavilySearch
 from graph.models import enhancer_model_name
+from graph.output_formats import apply_row_patches, row_patches_adapter
+from graph.runtime import runtime
+from graph.search_cache import CachedSearchTool
 from graph.states import MessagesState
+from graph.utils import context_window, estimate_tokens, extract_json
 from dotenv import load_dotenv
 load_dotenv()
 
-search_tool = TavilySearch(
-    max_results=5,
-    topic="general",
-)
-
-tools = [search_tool]
-
-enhancer_model = ChatGoogleGenerativeAI(
-    model=enhancer_model_name,
-    temperature=0,
-)
-
 prompt = ChatPromptTemplate.from_messages([
     ("system", """You are an expert Data Scientist and Researcher.
 Your goal is to modify the dataset based on the Supervisor's instructions.
@@ -30,32 +27,110 @@ Your goal is to modify the dataset based on the Supervisor's instructions.
 
 ## IMPORTANT 
 - make sure to follow the Supervisor's instructions strictly.
-- always return all of the data you have both modified and the original data."""),
+{output_instructions}"""),
     MessagesPlaceholder(variable_name="messages"),
     MessagesPlaceholder(variable_name="agent_scratchpad"),
 ])
 
-agent = create_tool_calling_agent(enhancer_model, tools, prompt)
-agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+TEXT_OUTPUT_INSTRUCTIONS = "- always return all of the data you have both modified and the original data."
+
+PATCH_OUTPUT_INSTRUCTIONS = """- do NOT return the whole dataset. Rows are numbered from 0 in the order they appear in the input data.
+- return ONLY a JSON array of patches, one per changed row: [{"row": <row number>, "updates": {"<field>": <new value>}}]
+- include only the fields you changed or added; omit rows that need no changes (return [] if nothing changes)."""
+
+
+def build_search_tool():
+    return CachedSearchTool(
+        TavilySearch(
+            max_results=5,
+            topic="general",
+        ),
+        runtime.get_redis(),
+        ttl=int(os.environ.get("SEARCH_CACHE_TTL", 24 * 60 * 60)),
+    )
+
+
+def rate_limited(model_name: str, model: Runnable) -> Runnable:
+    """`model` with every request sent through `runtime.call_llm`, so each tool round of an agent run takes its own token."""
+
+    def invoke(prompt_value, config):
+        tokens = estimate_tokens(prompt_value.to_string())
+        return runtime.call_llm(model_name, tokens, lambda: model.invoke(prompt_value, config))
+
+    async def ainvoke(prompt_value, config):
+        tokens = estimate_tokens(prompt_value.to_string())
+        return await runtime.acall_llm(model_name, tokens, lambda: model.ainvoke(prompt_value, config))
+
+    return RunnableLambda(invoke, afunc=ainvoke, name=model_name)
 
-def enhancer_node(state: MessagesState) -> MessagesState:
 
+def build_agent_executor():
+    tools = [runtime.get_resource("search_tool", build_search_tool)]
+    enhancer_model = runtime.get_model(enhancer_model_name)
+    # create_tool_calling_agent, with the model call rate limited
+    agent = (
+        RunnablePassthrough.assign(agent_scratchpad=lambda x: format_to_tool_messages(x["intermediate_steps"]))
+        | prompt
+        | rate_limited(enhancer_model_name, enhancer_model.bind_tools(tools))
+        | ToolsAgentOutputParser()
+    )
+    return AgentExecutor(agent=agent, tools=tools, verbose=True)
+
+
+def _enhancer_input(state: MessagesState) -> dict:
     supervisor_instructions = state["messages"][-1].content if len(state["messages"]) > 0 else ""
+    patch_mode = state.get("enhancer_mode") == "patch" and state.get("rows")
     
     instruction_message = HumanMessage(
         content=f"Supervisor Instructions: {supervisor_instructions}\n\nPlease modify the dataset according to these instructions."
     )
 
-    response = agent_executor.invoke({
-        "messages": [*state["messages"], instruction_message]
-    })
+    # The task message plus the most recent turns; older turns are superseded by newer data
+    history = context_window(state["messages"], state.get("context_window"))
+    return {
+        "messages": [*history, instruction_message],
+        "output_instructions": PATCH_OUTPUT_INSTRUCTIONS if patch_mode else TEXT_OUTPUT_INSTRUCTIONS,
+    }
+
+
+def _enhancer_update(state: MessagesState, output: str) -> MessagesState:
+    patch_mode = state.get("enhancer_mode") == "patch" and state.get("rows")
+
+    if patch_mode:
+        try:
+            patches = row_patches_adapter.validate_python(extract_json(output))
+        except ValueError:
+            # Unparseable patches fall back to the free-text result
+            patches = None
+
+        if patches is not None:
+            # Revisions patch the previous result rather than the original rows
+            previous = state.get("enhanced_data") or []
+            base_rows = previous if previous and all(isinstance(row, dict) for row in previous) else state["rows"]
+            patches_json = json.dumps([patch.model_dump() for patch in patches], default=str)
+            return {
+                "messages": [AIMessage(content=f"TASK COMPLETED: {len(patches)} row patches applied. Patches: {patches_json}")],
+                "enhanced_data": apply_row_patches(base_rows, patches),
+            }
     
-    agent_message = AIMessage(content=response.get("output", ""))
+    agent_message = AIMessage(content=output)
     
     return {
-        "messages": [
-            *state["messages"],
-            agent_message
-        ],
+        "messages": [agent_message],
         "enhanced_data": [agent_message.content],
-   } 
\ No newline at end of file
+   }
+
+
+def enhancer_node(state: MessagesState) -> MessagesState:
+    agent_input = _enhancer_input(state)
+    agent_executor = runtime.get_resource("enhancer_agent", build_agent_executor)
+    # The agent's model calls go through the rate limiter one by one (`rate_limited`)
+    response = agent_executor.invoke(agent_input)
+    return _enhancer_update(state, response.get("output", ""))
+
+
+async def aenhancer_node(state: MessagesState) -> MessagesState:
+    agent_input = _enhancer_input(state)
+    agent_executor = runtime.get_resource("enhancer_agent", build_agent_executor)
+    response = await agent_executor.ainvoke(agent_input)
+    return _enhancer_update(state, response.get("output", ""))
@@ -2,10 +2,11 @@ from typing import Literal
 from pydantic import BaseModel, Field
 from langchain_core.messages import AIMessage
 from langchain_core.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 
 from graph.models import reviewer_model_name
+from graph.runtime import runtime
 from graph.states import MessagesState
+from graph.utils import estimate_tokens
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -18,22 +19,19 @@ class ReviewerResponse(BaseModel):
     reasoning: str = Field(description="Explanation of the review decision")
 
 
-reviewer_model = ChatGoogleGenerativeAI(
-    model=reviewer_model_name,
-    temperature=0,
-).with_structured_output(ReviewerResponse)
-
-def reviewer_node(state: MessagesState) -> MessagesState:
-
+def _reviewer_prompt(state: MessagesState) -> str:
     last_message = state["messages"][-1].content if len(state["messages"]) > 0 else ""
+    # Rules routing mode only asks for a review when the automated checks failed
+    check_problems = " ".join(state.get("check_problems") or []) or "none"
 
-    prompt = PromptTemplate.from_template(
+    return PromptTemplate.from_template(
    """
     You are a Data Quality Auditor.
     You are reviewing a dataset modification performed by an automated agent.
 
     **Context:**
     - Enhancer's Claimed Actions and current data: {last_message}
+    - Problems found by automated checks: {check_problems}
 
     **Audit Checklist:**
     1. **Completeness:** Did the Enhancer actually do what was asked? (e.g., if asked to remove duplicates, are they gone?)
@@ -42,13 +40,25 @@ def reviewer_node(state: MessagesState) -> MessagesState:
     4. **Formatting:** Are the column names clean and consistent?
 
 """
-    ).format(last_message=last_message)
+    ).format(last_message=last_message, check_problems=check_problems)
 
-    response = reviewer_model.invoke(prompt)
+
+def _reviewer_update(state: MessagesState, response: ReviewerResponse) -> MessagesState:
     return {
-        "messages": [
-            *state["messages"],
-            AIMessage(f"Status: {response.status}. {response.reasoning}"),
-        ],
+        "messages": [AIMessage(f"Status: {response.status}. {response.reasoning}")],
         "review_count": state["review_count"] + 1,
-    }
\ No newline at end of file
+    }
+
+
+def reviewer_node(state: MessagesState) -> MessagesState:
+    prompt = _reviewer_prompt(state)
+    reviewer_model = runtime.get_model(reviewer_model_name, ReviewerResponse)
+    response = runtime.call_llm(reviewer_model_name, estimate_tokens(prompt), lambda: reviewer_model.invoke(prompt))
+    return _reviewer_update(state, response)
+
+
+async def areviewer_node(state: MessagesState) -> MessagesState:
+    prompt = _reviewer_prompt(state)
+    reviewer_model = runtime.get_model(reviewer_model_name, ReviewerResponse)
+    response = await runtime.acall_llm(reviewer_model_name, estimate_tokens(prompt), lambda: reviewer_model.ainvoke(prompt))
+    return _reviewer_update(state, response)
@@ -2,10 +2,12 @@ from typing import Literal
 from pydantic import BaseModel, Field
 from langchain_core.messages import AIMessage
 from langchain_core.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 
 from graph.models import supervisor_model_name
+from graph.routing import rule_supervisor_update
+from graph.runtime import runtime
 from graph.states import MessagesState
+from graph.utils import estimate_tokens
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -14,16 +16,11 @@ class SupervisorResponse(BaseModel):
     response: str = Field(description="Reasoning for the routing decision")
     cmd: Literal["composer", "enhancer"] = Field(description="Next agent to route to")
 
-supervisor_model = ChatGoogleGenerativeAI(
-    model=supervisor_model_name,
-    temperature=0,
-).with_structured_output(SupervisorResponse)
-
-def supervisor_node(state: MessagesState) -> MessagesState:
+def _supervisor_prompt(state: MessagesState) -> str:
     last_message = state["messages"][-1].content if len(state["messages"]) > 0 else ""
     review_count = state["review_count"]
 
-    prompt = PromptTemplate.from_template("""
+    return PromptTemplate.from_template("""
     You are the Supervisor of a Data Enhancement pipeline.
         Your role is to orchestrate the workflow between two workers:
         1. "Enhancer": Modifies, cleans, and researches data.
@@ -51,12 +48,27 @@ def supervisor_node(state: MessagesState) -> MessagesState:
     Review count: {review_count}
     """).format(last_message=last_message, review_count=review_count)
 
-    response = supervisor_model.invoke(prompt)
 
+def _supervisor_update(response: SupervisorResponse) -> MessagesState:
     return {
-        "messages": [
-            *state["messages"],
-            AIMessage(response.response),
-        ],
+        "messages": [AIMessage(response.response)],
         "cmd": response.cmd,
-    }
\ No newline at end of file
+    }
+
+
+def supervisor_node(state: MessagesState) -> MessagesState:
+    if state.get("routing_mode") == "rules":
+        return rule_supervisor_update(state)
+    prompt = _supervisor_prompt(state)
+    supervisor_model = runtime.get_model(supervisor_model_name, SupervisorResponse)
+    response = runtime.call_llm(supervisor_model_name, estimate_tokens(prompt), lambda: supervisor_model.invoke(prompt))
+    return _supervisor_update(response)
+
+
+async def asupervisor_node(state: MessagesState) -> MessagesState:
+    if state.get("routing_mode") == "rules":
+        return rule_supervisor_update(state)
+    prompt = _supervisor_prompt(state)
+    supervisor_model = runtime.get_model(supervisor_model_name, SupervisorResponse)
+    response = await runtime.acall_llm(supervisor_model_name, estimate_tokens(prompt), lambda: supervisor_model.ainvoke(prompt))
+    return _supervisor_update(response)
@@ -0,0 +1,134 @@
+import asyncio
+import json
+from typing import Any
+
+from langchain_core.messages import HumanMessage
+
+from graph.instrumentation import instrument_node
+from graph.output_formats import column_values_adapter
+from graph.runtime import runtime
+from graph.schema_registry import schema_registry
+from graph.states import MessagesState
+from graph.utils import extract_json
+
+COLUMN_OUTPUT_INSTRUCTIONS = """- do NOT return the dataset. Entities are identified by their "row" number.
+- return ONLY a JSON array with one object per entity: [{"row": <row number>, "value": <value>}]
+- use null as the value when it cannot be found; never make values up."""
+
+
+def _is_null(value: Any) -> bool:
+    return value is None or value == ""
+
+
+def _field_model(name: str, spec: dict[str, str]):
+    # Single-field schemas, so one column is validated in one batch call
+    return schema_registry.get({name: spec}, "ColumnField")
+
+
+def column_plan(rows: list[dict[str, Any]], schema: dict[str, dict[str, str]]) -> tuple[list[dict[str, Any]], dict[str, list[int]]]:
+    """Validate the rows column by column.
+
+    Returns:
+        The output records with every valid value filled in (None elsewhere) and,
+        per field, the positions of the rows whose value is missing or invalid
+    """
+    records = [{} for _ in rows]
+    missing = {}
+    for name, spec in schema.items():
+        column = [{name: row.get(name)} for row in rows]
+        validated, _ = _field_model(name, spec).validate_rows(column)
+        for i, (record, value) in enumerate(zip(validated, column)):
+            if record is None or _is_null(value[name]):
+                records[i][name] = None
+                missing.setdefault(name, []).append(i)
+            else:
+                records[i][name] = getattr(record, name)
+    return records, missing
+
+
+def column_entities(rows: list[dict[str, Any]], indexes: list[int], name: str, key_fields: list[str] | None = None) -> list[dict[str, Any]]:
+    """The compact rows sent when asking for `name`: the row number and its key values only.
+
+    Without configured `key_fields`, a row's non-empty text values identify it.
+    """
+    entities = []
+    for i in indexes:
+        row = rows[i]
+        keys = key_fields or [key for key, value in row.items() if isinstance(value, str) and value]
+        entities.append({"row": i, **{key: row[key] for key in keys if key != name and not _is_null(row.get(key))}})
+    return entities
+
+
+def _column_task(name: str, spec: dict[str, str], entities: list[dict[str, Any]]) -> str:
+    description = spec.get("description") or name
+    lines = "\n".join(json.dumps(entity, default=str) for entity in entities)
+    return (
+        f'Find the value of "{name}" ({description}; type {spec.get("type", "str")}) for every entity below, '
+        f"researching with web search where needed.\n\nEntities, one JSON object per line:\n{lines}"
+    )
+
+
+def _column_input(task: str) -> dict:
+    return {"messages": [HumanMessage(task)], "output_instructions": COLUMN_OUTPUT_INSTRUCTIONS}
+
+
+def _column_values(output: str, name: str, spec: dict[str, str], indexes: list[int]) -> dict[int, Any]:
+    """Parse the agent's answer into valid values by row; unparseable answers and invalid values are dropped."""
+    try:
+        values = column_values_adapter.validate_python(extract_json(output))
+    except ValueError:
+        print(f"Could not parse the values of column {name}")
+        return {}
+
+    asked = set(indexes)
+    answered = [value for value in values if value.row in asked]
+    validated, _ = _field_model(name, spec).validate_rows([{name: value.value} for value in answered])
+    return {
+        value.row: getattr(record, name)
+        for value, record in zip(answered, validated)
+        if record is not None and not _is_null(getattr(record, name))
+    }
+
+
+def _fill_column(state: MessagesState, name: str, indexes: list[int]) -> dict[int, Any]:
+    from graph.agents.enhancer import build_agent_executor
+
+    spec = state["schema"][name]
+    task = _column_task(name, spec, column_entities(state["rows"], indexes, name, state.get("column_key_fields")))
+    agent_executor = runtime.get_resource("enhancer_agent", build_agent_executor)
+    response = agent_executor.invoke(_column_input(task))
+    return _column_values(response.get("output", ""), name, spec, indexes)
+
+
+async def _afill_column(state: MessagesState, name: str, indexes: list[int]) -> dict[int, Any]:
+    from graph.agents.enhancer import build_agent_executor
+
+    spec = state["schema"][name]
+    task = _column_task(name, spec, column_entities(state["rows"], indexes, name, state.get("column_key_fields")))
+    agent_executor = runtime.get_resource("enhancer_agent", build_agent_executor)
+    response = await agent_executor.ainvoke(_column_input(task))
+    return _column_values(response.get("output", ""), name, spec, indexes)
+
+
+def column_filler_node(state: MessagesState) -> MessagesState:
+    """Fill a chunk's missing values with one LLM call per field, joining the answers back by row (columns strategy)."""
+    records, missing = column_plan(state["rows"], state["schema"])
+    for name, indexes in missing.items():
+        for i, value in _fill_column(state, name, indexes).items():
+            records[i][name] = value
+    return {"composed_data": records}
+
+
+async def acolumn_filler_node(state: MessagesState) -> MessagesState:
+    # The fields of a chunk are independent, so their calls run concurrently
+    records, missing = column_plan(state["rows"], state["schema"])
+    filled = await asyncio.gather(*(_afill_column(state, name, indexes) for name, indexes in missing.items()))
+    for name, values in zip(missing, filled):
+        for i, value in values.items():
+            records[i][name] = value
+    return {"composed_data": records}
+
+
+def build_column_filler():
+    """The columns strategy's replacement for the graph: a single instrumented step with `invoke` and `ainvoke`."""
+    return instrument_node("column_filler", column_filler_node, acolumn_filler_node)
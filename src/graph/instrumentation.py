@@ -0,0 +1,237 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, TypeVar
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import RunnableLambda
+
+from graph.utils import estimate_tokens
+
+T = TypeVar("T")
+
+NODE_COUNTERS = (
+    "runs", "seconds", "errors", "llm_calls", "llm_seconds", "prompt_tokens", "completion_tokens", "retries",
+)
+TOOL_COUNTERS = ("calls", "seconds", "errors", "cache_hits")
+
+
+class ChunkMetrics:
+    """Counters of one chunk's graph run, per node and per tool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.nodes: dict[str, dict[str, float]] = {}
+        self.tools: dict[str, dict[str, float]] = {}
+
+    def add(self, section: str, name: str, **counters: float) -> None:
+        with self._lock:
+            entries = self.nodes if section == "nodes" else self.tools
+            entry = entries.setdefault(name, dict.fromkeys(NODE_COUNTERS if section == "nodes" else TOOL_COUNTERS, 0))
+            for counter, value in counters.items():
+                entry[counter] += value
+
+    def as_dict(self) -> dict[str, dict[str, dict[str, float]]]:
+        with self._lock:
+            return {
+                "nodes": {name: _rounded(entry) for name, entry in self.nodes.items()},
+                "tools": {name: _rounded(entry) for name, entry in self.tools.items()},
+            }
+
+
+class _NodeRun:
+    def __init__(self, name: str):
+        self.name = name
+        self.llm_calls = 0
+
+
+# Metrics of the chunk being enhanced; nothing is recorded outside a chunk
+current_metrics: ContextVar[ChunkMetrics | None] = ContextVar("current_metrics", default=None)
+_current_node: ContextVar[_NodeRun | None] = ContextVar("current_node", default=None)
+# Provider-reported usage of the LLM call in progress, filled by `UsageCallbackHandler`
+_llm_usage: ContextVar[dict[str, int] | None] = ContextVar("llm_usage", default=None)
+
+
+def _rounded(counters: dict[str, float]) -> dict[str, float]:
+    return {key: round(value, 6) if isinstance(value, float) else value for key, value in counters.items()}
+
+
+def merge_metrics(*metrics: dict[str, Any] | None) -> dict[str, dict[str, dict[str, float]]]:
+    """Sum `ChunkMetrics.as_dict()` results, e.g. the chunks of a job."""
+    merged = {"nodes": {}, "tools": {}}
+    for entry in metrics:
+        for section in merged:
+            for name, counters in (entry or {}).get(section, {}).items():
+                total = merged[section].setdefault(name, {})
+                for counter, value in counters.items():
+                    total[counter] = total.get(counter, 0) + value
+    return {section: {name: _rounded(counters) for name, counters in entries.items()} for section, entries in merged.items()}
+
+
+def metrics_totals(metrics: dict[str, Any] | None) -> dict[str, float]:
+    """Headline numbers of a job or chunk: LLM calls, tokens, retries and time."""
+    nodes = (metrics or {}).get("nodes", {}).values()
+    tools = (metrics or {}).get("tools", {}).values()
+    totals = {
+        "llm_calls": sum(node.get("llm_calls", 0) for node in nodes),
+        "prompt_tokens": sum(node.get("prompt_tokens", 0) for node in nodes),
+        "completion_tokens": sum(node.get("completion_tokens", 0) for node in nodes),
+        "retries": sum(node.get("retries", 0) for node in nodes),
+        "node_seconds": sum(node.get("seconds", 0) for node in nodes),
+        "llm_seconds": sum(node.get("llm_seconds", 0) for node in nodes),
+        "tool_calls": sum(tool.get("calls", 0) for tool in tools),
+        "tool_cache_hits": sum(tool.get("cache_hits", 0) for tool in tools),
+        "tool_seconds": sum(tool.get("seconds", 0) for tool in tools),
+    }
+    return _rounded(totals)
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """Collects the token usage providers report for the LLM call in progress.
+
+    Structured output parsers drop the usage metadata from the response, so it
+    is read from the raw generations as they pass through the callbacks.
+    """
+
+    run_inline = True
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        usage = _llm_usage.get()
+        if usage is None:
+            return
+        usage["calls"] += 1
+        for generations in response.generations:
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if metadata:
+                    usage["prompt_tokens"] += metadata.get("input_tokens", 0)
+                    usage["completion_tokens"] += metadata.get("output_tokens", 0)
+
+
+usage_callback = UsageCallbackHandler()
+
+
+def _response_text(response: Any) -> str:
+    if hasattr(response, "model_dump_json"):
+        return response.model_dump_json()
+    if isinstance(response, dict) and "output" in response:
+        return str(response["output"])
+    return str(getattr(response, "content", response))
+
+
+def _record_llm_call(usage: dict[str, int], tokens: int, response: Any, seconds: float, error: bool) -> None:
+    node = _current_node.get()
+    metrics = current_metrics.get()
+    # Requests seen by `usage_callback`, or the one request when no callbacks ran
+    calls = usage["calls"] or (0 if error else 1)
+    if node is not None:
+        node.llm_calls += calls
+    if metrics is None or node is None:
+        return
+    prompt_tokens = usage["prompt_tokens"] or (tokens if calls else 0)
+    completion_tokens = usage["completion_tokens"] or (estimate_tokens(_response_text(response)) if calls else 0)
+    metrics.add(
+        "nodes",
+        node.name,
+        llm_calls=calls,
+        llm_seconds=seconds,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        retries=max(0, usage["attempts"] - 1),
+    )
+
+
+def _new_usage() -> dict[str, int]:
+    return {"calls": 0, "attempts": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+
+def call_llm(limiter, model_name: str, tokens: int, fn: Callable[[], T]) -> T:
+    """Run `fn` through `limiter.call`, recording its time, tokens and retries for the current node.
+
+    Token counts are the ones the provider reports, or estimates when it reports none.
+    """
+    usage = _new_usage()
+
+    def attempt():
+        usage["attempts"] += 1
+        return fn()
+
+    token = _llm_usage.set(usage)
+    started = time.perf_counter()
+    response, error = None, True
+    try:
+        response = limiter.call(model_name, tokens, attempt)
+        error = False
+        return response
+    finally:
+        _llm_usage.reset(token)
+        _record_llm_call(usage, tokens, response, time.perf_counter() - started, error)
+
+
+async def acall_llm(limiter, model_name: str, tokens: int, fn: Callable[[], Awaitable[T]]) -> T:
+    """Async `call_llm`, through `limiter.acall`."""
+    usage = _new_usage()
+
+    def attempt():
+        usage["attempts"] += 1
+        return fn()
+
+    token = _llm_usage.set(usage)
+    started = time.perf_counter()
+    response, error = None, True
+    try:
+        response = await limiter.acall(model_name, tokens, attempt)
+        error = False
+        return response
+    finally:
+        _llm_usage.reset(token)
+        _record_llm_call(usage, tokens, response, time.perf_counter() - started, error)
+
+
+def record_tool_call(tool: str, seconds: float, cache_hit: bool = False, error: bool = False) -> None:
+    metrics = current_metrics.get()
+    if metrics is not None:
+        metrics.add("tools", tool, calls=1, seconds=seconds, cache_hits=int(cache_hit), errors=int(error))
+
+
+def _node_update(state: dict, update: dict, run: _NodeRun) -> dict:
+    # `llm_calls` counts every LLM request of the graph run so far
+    return {**update, "llm_calls": (state.get("llm_calls") or 0) + run.llm_calls}
+
+
+def instrument_node(name: str, func: Callable[[dict], dict], afunc: Callable[[dict], Awaitable[dict]]) -> RunnableLambda:
+    """Wrap a graph node so its runs, wall time and errors are recorded and `llm_calls` is kept up to date."""
+
+    def run(state):
+        node_run = _NodeRun(name)
+        token = _current_node.set(node_run)
+        started = time.perf_counter()
+        failed = True
+        try:
+            update = _node_update(state, func(state), node_run)
+            failed = False
+            return update
+        finally:
+            _current_node.reset(token)
+            _record_node_run(name, time.perf_counter() - started, failed)
+
+    async def arun(state):
+        node_run = _NodeRun(name)
+        token = _current_node.set(node_run)
+        started = time.perf_counter()
+        failed = True
+        try:
+            update = _node_update(state, await afunc(state), node_run)
+            failed = False
+            return update
+        finally:
+            _current_node.reset(token)
+            _record_node_run(name, time.perf_counter() - started, failed)
+
+    return RunnableLambda(run, arun, name=name)
+
+
+def _record_node_run(name: str, seconds: float, failed: bool) -> None:
+    metrics = current_metrics.get()
+    if metrics is not None:
+        metrics.add("nodes", name, runs=1, seconds=seconds, errors=int(failed))
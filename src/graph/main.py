@@ -1,6 +1,51 @@
 from typing import Literal
 
+from langgraph.graph import START, END, StateGraph
+
+from graph.instrumentation import instrument_node
+from graph.routing import avalidator_node, validator_node, validator_routing
 from graph.states import MessagesState
 
 def supervisor_routing(state: MessagesState) -> Literal["composer", "enhancer"]:
     return state["cmd"]
+
+
+def enhancer_routing(state: MessagesState) -> Literal["reviewer", "validator"]:
+    # The rules routing mode checks the output in Python before spending a reviewer call
+    return "validator" if state.get("routing_mode") == "rules" else "reviewer"
+
+
+def build_graph():
+    """Build and compile the supervisor -> enhancer -> (validator ->) reviewer -> composer graph."""
+    from graph.agents.composer import acomposer_node, composer_node
+    from graph.agents.enhancer import aenhancer_node, enhancer_node
+    from graph.agents.reviewer import areviewer_node, reviewer_node
+    from graph.agents.supervisor import asupervisor_node, supervisor_node
+
+    # Each node has a sync and an async implementation, so the same graph serves `invoke` and `ainvoke`;
+    # both are instrumented for the chunk's metrics
+    graph = StateGraph(MessagesState)
+    graph.add_node("supervisor", instrument_node("supervisor", supervisor_node, asupervisor_node))
+    graph.add_node("composer", instrument_node("composer", composer_node, acomposer_node))
+    graph.add_node("enhancer", instrument_node("enhancer", enhancer_node, aenhancer_node))
+    graph.add_node("reviewer", instrument_node("reviewer", reviewer_node, areviewer_node))
+    graph.add_node("validator", instrument_node("validator", validator_node, avalidator_node))
+
+    graph.add_edge(START, "supervisor")
+    graph.add_conditional_edges("supervisor", supervisor_routing, {
+        "composer": "composer",
+        "enhancer": "enhancer"
+    })
+
+    graph.add_conditional_edges("enhancer", enhancer_routing, {
+        "reviewer": "reviewer",
+        "validator": "validator"
+    })
+    graph.add_conditional_edges("validator", validator_routing, {
+        "composer": "composer",
+        "reviewer": "reviewer"
+    })
+    graph.add_edge("reviewer", "supervisor")
+    graph.add_edge("composer", END)
+
+    return graph.compile()
@@ -3,3 +3,29 @@ composer_model_name = "gemini-2.5-flash"
 enhancer_model_name = "gemini-2.5-flash"
 reviewer_model_name = "gemini-2.5-flash"
 supervisor_model_name = "gemini-2.5-flash"
+
+# Estimated data tokens (input rows + expected output) packed into a single chunk, per model
+chunk_token_budgets = {
+    "gemini-2.5-flash": 6000,
+}
+default_chunk_token_budget = 4000
+
+
+def chunk_token_budget(model_name: str) -> int:
+    return chunk_token_budgets.get(model_name, default_chunk_token_budget)
+
+
+# Bump whenever agent prompts change in a way that invalidates cached results
+# 2: patch enhancer output, rules-routing reviewer, composer repair and column filler prompts
+prompt_version = "2"
+
+
+# Provider quotas shared by every worker process, per model: requests and tokens per minute
+rate_limits = {
+    "gemini-2.5-flash": {"rpm": 1000, "tpm": 1000000},
+}
+default_rate_limit = {"rpm": 60, "tpm": 250000}
+
+
+def rate_limit(model_name: str) -> dict[str, int]:
+    return rate_limits.get(model_name, default_rate_limit)
@@ -1,40 +1,23 @@
-from typing import Optional
-from pydantic import BaseModel, Field, create_model
+import copy
+from typing import Any
+from pydantic import BaseModel, Field, TypeAdapter
 
-_model_cache: dict[str, type[BaseModel]] = {}
-
-def _parse_type(type_spec: str | type) -> type:
-    """Parse type specification to Python type."""
-    if isinstance(type_spec, type):
-        return type_spec
-    
-    if not isinstance(type_spec, str):
-        return str
-    
-    type_map = {"str": str, "int": int, "float": float, "bool": bool}
-    type_spec = type_spec.strip().lower()
-    
-    if "|" in type_spec:
-        parts = [p.strip() for p in type_spec.split("|")]
-        base_type = type_map.get(parts[0], str)
-        if any(p in ("null", "none") for p in parts):
-            return Optional[base_type]
-        return base_type
-    
-    return type_map.get(type_spec, str)
+from graph.schema_registry import schema_registry
 
 
 def build_dynamic_model(
     schema: dict[str, dict[str, str]],
     model_name: str = "DynamicDataModel",
+    fingerprint: str | None = None,
 ) -> type[BaseModel]:
-    """Build a Pydantic model dynamically from a schema.
+    """Build a Pydantic model dynamically from a schema (compiled once per fingerprint by the schema registry).
     
     Args:
         schema: Dictionary mapping field names to field specs.
                 Each field spec must have "type" key, and optionally "description".
                 Type specs: "str", "int", "float", "bool", "str | null", etc.
         model_name: Name for the generated model class.
+        fingerprint: The schema's fingerprint when it is already known.
     
     Example:
         >>> schema = {
@@ -44,25 +27,44 @@ def build_dynamic_model(
         ... }
         >>> Model = build_dynamic_model(schema, "UserModel")
     """
-    schema_items = tuple(sorted(
-        (name, spec.get("type", "str"), spec.get("description", ""))
-        for name, spec in schema.items()
-    ))
-    cache_key = f"{model_name}:{str(schema_items)}"
-    
-    if cache_key in _model_cache:
-        return _model_cache[cache_key]
-    
-    fields = {}
-    for name, field_spec in schema.items():
-        field_type = _parse_type(field_spec.get("type", "str"))
-        description = field_spec.get("description", "")
-        
-        if description:
-            fields[name] = (field_type, Field(..., description=description))
-        else:
-            fields[name] = (field_type, ...)
-    
-    model = create_model(model_name, **fields)
-    _model_cache[cache_key] = model
-    return model
+    return schema_registry.get(schema, model_name, fingerprint).model
+
+
+def build_response_wrapper(
+    schema: dict[str, dict[str, str]],
+    model_name: str = "ComposerResponse",
+    fingerprint: str | None = None,
+) -> type[BaseModel]:
+    """Build (and cache) a `composed_data: list[Model]` wrapper for structured output.
+
+    The wrapper class must be stable across calls so pooled structured-output
+    clients keyed on it can be reused.
+    """
+    return schema_registry.get(schema, model_name, fingerprint).wrapper
+
+
+class RowPatch(BaseModel):
+    """Field updates for a single row, keyed by the row's position in the chunk."""
+    row: int = Field(description="0-based index of the row in the input data")
+    updates: dict[str, Any] = Field(description="Fields to set on the row, only the ones that change")
+
+
+row_patches_adapter = TypeAdapter(list[RowPatch])
+
+
+class ColumnValue(BaseModel):
+    """The value of one field for a single row, keyed by the row's position in the chunk."""
+    row: int = Field(description="0-based index of the row in the input data")
+    value: Any = Field(default=None, description="Value of the requested field, null when it cannot be found")
+
+
+column_values_adapter = TypeAdapter(list[ColumnValue])
+
+
+def apply_row_patches(rows: list[dict[str, Any]], patches: list[RowPatch]) -> list[dict[str, Any]]:
+    """Apply patches to a copy of `rows`; patches for unknown rows are ignored."""
+    patched = copy.deepcopy(rows)
+    for patch in patches:
+        if 0 <= patch.row < len(patched):
+            patched[patch.row].update(patch.updates)
+    return patched
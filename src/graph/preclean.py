@@ -0,0 +1,115 @@
+import math
+from typing import Any, Callable
+
+from graph.schema_registry import base_field_type
+
+_TRUE_VALUES = {"true", "yes", "y", "1", "t"}
+_FALSE_VALUES = {"false", "no", "n", "0", "f"}
+
+
+class CoercionError(ValueError):
+    pass
+
+
+def normalize_whitespace(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def _to_int(value: Any) -> int:
+    if isinstance(value, bool):
+        raise CoercionError("bool is not an int")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        text = value.replace(",", "").replace("_", "")
+        try:
+            return int(text)
+        except ValueError:
+            number = float(text)
+            if number.is_integer():
+                return int(number)
+    raise CoercionError(f"{value!r} is not an int")
+
+
+def _to_float(value: Any) -> float:
+    if isinstance(value, bool):
+        raise CoercionError("bool is not a float")
+    if isinstance(value, (int, float)):
+        number = float(value)
+    elif isinstance(value, str):
+        number = float(value.replace(",", "").replace("_", ""))
+    else:
+        raise CoercionError(f"{value!r} is not a float")
+    if math.isnan(number) or math.isinf(number):
+        raise CoercionError(f"{value!r} is not a finite float")
+    return number
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        text = value.lower()
+        if text in _TRUE_VALUES:
+            return True
+        if text in _FALSE_VALUES:
+            return False
+    raise CoercionError(f"{value!r} is not a bool")
+
+
+def _to_str(value: Any) -> str:
+    if isinstance(value, (dict, list)):
+        raise CoercionError(f"{value!r} is not a str")
+    return str(value)
+
+
+_COERCERS: dict[type, Callable[[Any], Any]] = {int: _to_int, float: _to_float, bool: _to_bool, str: _to_str}
+
+
+def field_coercer(spec: Any) -> Callable[[Any], Any]:
+    """The lossless coercion to a field spec's type, raising `CoercionError` (or `ValueError`) when there is none."""
+    # Optional[X] -> X; null values are treated as missing either way
+    return _COERCERS.get(base_field_type(spec), _to_str)
+
+
+def preclean_rows(
+    rows: list[dict[str, Any]],
+    schema: dict[str, dict[str, str]],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any] | None]]:
+    """Apply rule-based normalisation and type coercion to rows, column by column.
+
+    Whitespace is normalised in every string value, and schema fields are
+    coerced to their schema type where that is lossless (e.g. "42" -> 42,
+    "yes" -> True). Values that cannot be coerced are left untouched for the LLM.
+
+    Returns:
+        The cleaned rows, and for each row either its final output (when every
+        schema field is present and valid, so the row can bypass the LLM) or None.
+    """
+    cleaned = [{key: normalize_whitespace(value) for key, value in row.items()} for row in rows]
+    complete = [True] * len(cleaned)
+
+    # Work one schema column at a time so each field's coercer is resolved once
+    for name, spec in schema.items():
+        coerce = field_coercer(spec)
+        for i, row in enumerate(cleaned):
+            value = row.get(name)
+            if value is None or value == "":
+                complete[i] = False
+                continue
+            try:
+                row[name] = coerce(value)
+            except (CoercionError, ValueError):
+                complete[i] = False
+
+    resolved = [
+        {name: row[name] for name in schema} if is_complete else None
+        for row, is_complete in zip(cleaned, complete)
+    ]
+    return cleaned, resolved
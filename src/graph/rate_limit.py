@@ -0,0 +1,313 @@
+import asyncio
+import random
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Awaitable, Callable, Iterator, TypeVar
+
+from graph.models import rate_limit
+
+T = TypeVar("T")
+
+# Atomically refills every bucket, then takes `amount` from all of them or from none.
+# KEYS: bucket keys; ARGV: (capacity, refill per second, amount) per key.
+# Returns the seconds to wait before the request fits (0 when it was taken).
+TAKE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 3 - 2])
+    local rate = tonumber(ARGV[i * 3 - 1])
+    local amount = tonumber(ARGV[i * 3])
+    local state = redis.call('HMGET', key, 'level', 'updated_at')
+    local level = tonumber(state[1]) or capacity
+    local updated_at = tonumber(state[2]) or now
+    level = math.min(capacity, level + math.max(0, now - updated_at) * rate)
+    levels[i] = level
+    if level < amount then
+        wait = math.max(wait, (amount - level) / rate)
+    end
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 3 - 2])
+    local rate = tonumber(ARGV[i * 3 - 1])
+    local level = levels[i]
+    if wait == 0 then
+        level = level - tonumber(ARGV[i * 3])
+    end
+    redis.call('HSET', key, 'level', level, 'updated_at', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 60)
+end
+return tostring(wait)
+"""
+
+# KEYS[1]: sorted set of slot holders scored by lease start; ARGV: slot id, limit, lease seconds
+SLOT_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[3]))
+if redis.call('ZSCORE', KEYS[1], ARGV[1]) or redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], now, ARGV[1])
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# KEYS[1]: scale hash; ARGV: factor, recovery per second, minimum scale, ttl.
+# The stored scale recovers linearly with the time since it was last lowered; a factor below 1 lowers it.
+# Returns the current scale.
+SCALE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local factor = tonumber(ARGV[1])
+local state = redis.call('HMGET', KEYS[1], 'scale', 'updated_at')
+local scale = tonumber(state[1]) or 1
+local updated_at = tonumber(state[2]) or now
+scale = math.min(1, scale + math.max(0, now - updated_at) * tonumber(ARGV[2]))
+if factor < 1 then
+    scale = math.max(tonumber(ARGV[3]), scale * factor)
+    redis.call('HSET', KEYS[1], 'scale', scale, 'updated_at', now)
+    redis.call('EXPIRE', KEYS[1], ARGV[4])
+end
+return tostring(scale)
+"""
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """Return whether `exc` is a provider rate limit (HTTP 429 / RESOURCE_EXHAUSTED) error."""
+    for attr in ("code", "status_code", "status"):
+        value = getattr(exc, attr, None)
+        if value == 429 or getattr(value, "value", None) == 429:
+            return True
+    message = str(exc)
+    return "429" in message or "RESOURCE_EXHAUSTED" in message or "rate limit" in message.lower()
+
+
+class RedisLimiterStore:
+    """Limiter state in Redis, shared by every worker process of the cluster."""
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self._take = redis_client.register_script(TAKE_SCRIPT)
+        self._acquire_slot = redis_client.register_script(SLOT_SCRIPT)
+        self._scale = redis_client.register_script(SCALE_SCRIPT)
+
+    def take(self, buckets: list[tuple[str, float, float, float]]) -> float:
+        args = [value for _, capacity, rate, amount in buckets for value in (capacity, rate, amount)]
+        return float(self._take(keys=[key for key, *_ in buckets], args=args))
+
+    def scale(self, key: str, factor: float, recovery_rate: float, min_scale: float, ttl: int) -> float:
+        return float(self._scale(keys=[key], args=[factor, recovery_rate, min_scale, ttl]))
+
+    def acquire_slot(self, key: str, slot_id: str, limit: int, lease: int) -> bool:
+        return bool(self._acquire_slot(keys=[key], args=[slot_id, limit, lease]))
+
+    def release_slot(self, key: str, slot_id: str) -> None:
+        self.redis.zrem(key, slot_id)
+
+
+class LocalLimiterStore:
+    """In-process limiter state with the same semantics, for a single process (tests, benchmarks)."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.buckets: dict[str, tuple[float, float]] = {}
+        self.scales: dict[str, tuple[float, float]] = {}
+        self.slots: dict[str, dict[str, float]] = {}
+
+    def take(self, buckets: list[tuple[str, float, float, float]]) -> float:
+        with self._lock:
+            now = self.clock()
+            levels = []
+            wait = 0.0
+            for key, capacity, rate, amount in buckets:
+                level, updated_at = self.buckets.get(key, (capacity, now))
+                level = min(capacity, level + max(0.0, now - updated_at) * rate)
+                levels.append(level)
+                if level < amount:
+                    wait = max(wait, (amount - level) / rate)
+            for (key, _, _, amount), level in zip(buckets, levels):
+                self.buckets[key] = (level - amount if wait == 0 else level, now)
+            return wait
+
+    def scale(self, key: str, factor: float, recovery_rate: float, min_scale: float, ttl: int) -> float:
+        with self._lock:
+            now = self.clock()
+            scale, updated_at = self.scales.get(key, (1.0, now))
+            scale = min(1.0, scale + max(0.0, now - updated_at) * recovery_rate)
+            if factor < 1:
+                scale = max(min_scale, scale * factor)
+                self.scales[key] = (scale, now)
+            return scale
+
+    def acquire_slot(self, key: str, slot_id: str, limit: int, lease: int) -> bool:
+        with self._lock:
+            now = self.clock()
+            holders = {
+                holder: started for holder, started in self.slots.get(key, {}).items()
+                if started > now - lease
+            }
+            self.slots[key] = holders
+            if slot_id in holders or len(holders) < limit:
+                holders[slot_id] = now
+                return True
+            return False
+
+    def release_slot(self, key: str, slot_id: str) -> None:
+        with self._lock:
+            self.slots.get(key, {}).pop(slot_id, None)
+
+
+class RateLimiter:
+    """Cluster-wide token-bucket limiter for LLM calls, with AIMD backoff on 429s.
+
+    Every call takes one request and its estimated tokens from the model's
+    buckets, sized from `graph.models.rate_limits`. A 429 halves the model's
+    rate scale, which also lowers the number of chunks allowed to run at once,
+    and the call is retried with exponential backoff. The scale then recovers
+    by `recovery_rate` per second, however many calls succeed meanwhile.
+    """
+
+    scale_ttl = 60 * 60
+
+    def __init__(
+        self,
+        store,
+        limits: Callable[[str], dict[str, int]] = rate_limit,
+        max_retries: int = 5,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        min_scale: float = 0.05,
+        recovery_rate: float = 0.01,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.store = store
+        self.limits = limits
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.min_scale = min_scale
+        self.recovery_rate = recovery_rate
+        self.sleep = sleep
+
+    def _update_scale(self, model_name: str, factor: float) -> float:
+        key = f"llm-limiter:scale:{model_name}"
+        return self.store.scale(key, factor, self.recovery_rate, self.min_scale, self.scale_ttl)
+
+    def scale(self, model_name: str) -> float:
+        """Fraction of the configured quota the model currently runs at (1.0 until a 429)."""
+        return self._update_scale(model_name, 1.0)
+
+    def on_throttle(self, model_name: str) -> None:
+        # Read and halved in one atomic step, so concurrent 429s each halve the latest scale
+        self._update_scale(model_name, 0.5)
+
+    def _buckets(self, model_name: str, tokens: int) -> list[tuple[str, float, float, float]]:
+        limits = self.limits(model_name)
+        scale = self.scale(model_name)
+        buckets = []
+        for name, amount in (("rpm", 1), ("tpm", tokens)):
+            capacity = limits[name] * scale
+            # A request bigger than the bucket can never fit, let it through on a full bucket instead
+            buckets.append((f"llm-limiter:{name}:{model_name}", capacity, capacity / 60, min(amount, capacity)))
+        return buckets
+
+    def _backoff(self, model_name: str, attempt: int) -> float:
+        self.on_throttle(model_name)
+        backoff = min(self.max_backoff, self.base_backoff * 2 ** attempt)
+        print(f"Rate limited by {model_name}, retrying in {backoff:.1f}s (attempt {attempt + 1})")
+        return backoff * random.uniform(0.5, 1.0)
+
+    def acquire(self, model_name: str, tokens: int) -> None:
+        """Block until the model's buckets hold one request and `tokens` tokens, then take them."""
+        buckets = self._buckets(model_name, tokens)
+        while True:
+            wait = self.store.take(buckets)
+            if wait <= 0:
+                return
+            self.sleep(min(wait, self.max_backoff))
+
+    async def aacquire(self, model_name: str, tokens: int) -> None:
+        """Async `acquire`; waiting yields to the event loop instead of blocking it."""
+        buckets = await asyncio.to_thread(self._buckets, model_name, tokens)
+        while True:
+            wait = await asyncio.to_thread(self.store.take, buckets)
+            if wait <= 0:
+                return
+            await asyncio.sleep(min(wait, self.max_backoff))
+
+    def call(self, model_name: str, tokens: int, fn: Callable[[], T]) -> T:
+        """Run `fn` (one LLM request of about `tokens` tokens) under the limiter, retrying on 429s."""
+        for attempt in range(self.max_retries + 1):
+            self.acquire(model_name, tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                self.sleep(self._backoff(model_name, attempt))
+                continue
+            return result
+
+    async def acall(self, model_name: str, tokens: int, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async `call`; `fn` returns the awaitable LLM request."""
+        for attempt in range(self.max_retries + 1):
+            await self.aacquire(model_name, tokens)
+            try:
+                result = await fn()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                # Lowering the scale is a Redis round trip, keep it off the event loop
+                await asyncio.sleep(await asyncio.to_thread(self._backoff, model_name, attempt))
+                continue
+            return result
+
+    def concurrency(self, model_name: str, max_concurrency: int) -> int:
+        """Number of chunks allowed to run at once at the model's current rate scale."""
+        return max(1, round(max_concurrency * self.scale(model_name)))
+
+    def _acquire_slot(self, key: str, slot_id: str, model_name: str, max_concurrency: int, lease: int) -> bool:
+        return self.store.acquire_slot(key, slot_id, self.concurrency(model_name, max_concurrency), lease)
+
+    @contextmanager
+    def chunk_slot(
+        self,
+        model_name: str,
+        max_concurrency: int,
+        lease: int = 15 * 60,
+        poll_interval: float = 1.0,
+    ) -> Iterator[None]:
+        """Hold one of the model's adaptive chunk concurrency slots while the block runs."""
+        key = f"llm-limiter:slots:{model_name}"
+        slot_id = uuid.uuid4().hex
+        while not self._acquire_slot(key, slot_id, model_name, max_concurrency, lease):
+            self.sleep(poll_interval)
+        try:
+            yield
+        finally:
+            self.store.release_slot(key, slot_id)
+
+    @asynccontextmanager
+    async def achunk_slot(
+        self,
+        model_name: str,
+        max_concurrency: int,
+        lease: int = 15 * 60,
+        poll_interval: float = 1.0,
+    ) -> AsyncIterator[None]:
+        """Async `chunk_slot`, for chunk graphs sharing one event loop."""
+        key = f"llm-limiter:slots:{model_name}"
+        slot_id = uuid.uuid4().hex
+        # Reading the scale and taking the slot are both Redis calls
+        while not await asyncio.to_thread(self._acquire_slot, key, slot_id, model_name, max_concurrency, lease):
+            await asyncio.sleep(poll_interval)
+        try:
+            yield
+        finally:
+            await asyncio.to_thread(self.store.release_slot, key, slot_id)
@@ -0,0 +1,129 @@
+from typing import Any, Literal
+
+from langchain_core.messages import AIMessage
+
+from graph.schema_registry import schema_registry
+from graph.states import MessagesState
+from graph.utils import extract_json
+
+# Share of a field's values that may stay null (unfindable data) before the output is sent for review
+DEFAULT_MAX_NULL_RATE = 0.1
+DEFAULT_MAX_REVIEWS = 2
+# Validation problems listed per check, so instructions stay short for large chunks
+MAX_LISTED_PROBLEMS = 10
+
+FIRST_INSTRUCTIONS = (
+    "Clean the existing values and fill in every field of the target output schema for every row, "
+    "following the task instructions."
+)
+
+
+def _is_null(value: Any) -> bool:
+    return value is None or value == ""
+
+
+def enhanced_records(enhanced_data: list[Any] | None) -> list[dict[str, Any]] | None:
+    """The enhancer's output as records: patched rows as they are, free text parsed as JSON; None when it is neither."""
+    if not enhanced_data:
+        return None
+    if all(isinstance(item, dict) for item in enhanced_data):
+        return enhanced_data
+    records = []
+    for item in enhanced_data:
+        try:
+            parsed = extract_json(item) if isinstance(item, str) else item
+        except ValueError:
+            return None
+        parsed = parsed if isinstance(parsed, list) else [parsed]
+        if not all(isinstance(record, dict) for record in parsed):
+            return None
+        records.extend(parsed)
+    return records
+
+
+def check_enhanced_data(
+    enhanced_data: list[Any] | None,
+    rows: list[dict[str, Any]] | None,
+    schema: dict[str, dict[str, str]],
+    max_null_rate: float = DEFAULT_MAX_NULL_RATE,
+    fingerprint: str | None = None,
+) -> list[str]:
+    """Check the enhancer's output without an LLM; returns the problems found (empty when it passes).
+
+    The output must be one record per input row, every non-null value must
+    validate against the schema (in one batch call), and no field may be
+    null in more than `max_null_rate` of the rows.
+    """
+    records = enhanced_records(enhanced_data)
+    if records is None:
+        return ["The output is not a list of JSON records."]
+
+    problems = []
+    if rows and len(records) != len(rows):
+        problems.append(f"Expected {len(rows)} rows, got {len(records)}.")
+
+    null_counts = {name: sum(1 for record in records if _is_null(record.get(name))) for name in schema}
+    # Nulls are judged by the null rate below, not as type errors
+    invalid = [
+        f"row {error['loc'][0]} field {'.'.join(map(str, error['loc'][1:]))}: {error['msg']}"
+        for error in schema_registry.get(schema, fingerprint=fingerprint).row_errors(records)
+        if not (error["type"] == "missing" or _is_null(error.get("input")))
+    ]
+
+    if invalid:
+        listed = "; ".join(invalid[:MAX_LISTED_PROBLEMS])
+        more = f" (and {len(invalid) - MAX_LISTED_PROBLEMS} more)" if len(invalid) > MAX_LISTED_PROBLEMS else ""
+        problems.append(f"Invalid values: {listed}{more}.")
+
+    for name, nulls in null_counts.items():
+        if records and nulls / len(records) > max_null_rate:
+            problems.append(f"Field '{name}' is empty in {nulls} of {len(records)} rows.")
+    return problems
+
+
+def validator_node(state: MessagesState) -> MessagesState:
+    """Run the rule-based checks on the enhancer's output (rules routing mode)."""
+    return {
+        "check_problems": check_enhanced_data(
+            state.get("enhanced_data"),
+            state.get("rows"),
+            state["schema"],
+            state.get("max_null_rate", DEFAULT_MAX_NULL_RATE),
+            state.get("schema_fingerprint"),
+        ),
+    }
+
+
+async def avalidator_node(state: MessagesState) -> MessagesState:
+    return validator_node(state)
+
+
+def validator_routing(state: MessagesState) -> Literal["composer", "reviewer"]:
+    """Passed checks go straight to the composer; failed ones to the LLM reviewer while revisions are left."""
+    if not state.get("check_problems"):
+        return "composer"
+    if state.get("review_count", 0) >= state.get("max_reviews", DEFAULT_MAX_REVIEWS):
+        return "composer"
+    return "reviewer"
+
+
+def rule_supervisor_update(state: MessagesState) -> MessagesState:
+    """The supervisor's routing decision without an LLM call (rules routing mode).
+
+    The first step always goes to the enhancer. After a review, an approval or
+    the review cap goes to the composer, anything else back to the enhancer
+    with the reviewer's reasoning and the failed checks as instructions.
+    """
+    if state.get("enhanced_data") is None:
+        return {"messages": [AIMessage(FIRST_INSTRUCTIONS)], "cmd": "enhancer"}
+
+    last_message = str(state["messages"][-1].content) if state["messages"] else ""
+    approved = last_message.startswith("Status: APPROVED")
+    if approved or state.get("review_count", 0) >= state.get("max_reviews", DEFAULT_MAX_REVIEWS):
+        return {"messages": [AIMessage("The data is ready to be composed.")], "cmd": "composer"}
+
+    problems = " ".join(state.get("check_problems") or [])
+    instructions = f"Revise the data. Reviewer feedback: {last_message}"
+    if problems:
+        instructions += f" Automated checks found: {problems}"
+    return {"messages": [AIMessage(instructions)], "cmd": "enhancer"}
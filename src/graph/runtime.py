@@ -0,0 +1,180 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, TypeVar
+
+import redis
+from langchain_google_genai import ChatGoogleGenerativeAI
+from pydantic import BaseModel
+
+from graph.models import (
+    composer_model_name,
+    enhancer_model_name,
+    reviewer_model_name,
+    supervisor_model_name,
+)
+from graph.instrumentation import acall_llm, call_llm
+from graph.rate_limit import RateLimiter, RedisLimiterStore
+from graph.schema_registry import DEFAULT_REGISTRY_SIZE
+
+T = TypeVar("T")
+
+# Structured output variants of the pooled models kept per worker process; least recently used ones are dropped
+# first, as dynamic schemas (one response wrapper class per schema) would otherwise accumulate forever
+STRUCTURED_MODEL_POOL_SIZE = int(os.environ.get("STRUCTURED_MODEL_POOL_SIZE", DEFAULT_REGISTRY_SIZE))
+
+# Id of the EnhancedData job the current chunk belongs to, for per-job accounting
+current_job_id: ContextVar[int | None] = ContextVar("current_job_id", default=None)
+
+
+class GraphRuntime:
+    """Worker-lifetime holder for the compiled graph and pooled model clients.
+
+    Celery prefork workers create one runtime per child process (see the
+    `worker_process_init` handler in `main.celery`), so gRPC/HTTP sessions are
+    never shared across a fork and are reused by every chunk the child runs.
+    """
+
+    def __init__(self, structured_pool_size: int = STRUCTURED_MODEL_POOL_SIZE):
+        self._lock = threading.RLock()
+        self._resources: dict[Any, Any] = {}
+        self._structured_models: OrderedDict[Any, Any] = OrderedDict()
+        self.structured_pool_size = structured_pool_size
+        self.warmup_seconds: float | None = None
+
+    def get_resource(self, key: Any, factory: Callable[[], Any]) -> Any:
+        """Return the pooled resource for `key`, creating it with `factory` once."""
+        resource = self._resources.get(key)
+        if resource is None:
+            with self._lock:
+                resource = self._resources.get(key)
+                if resource is None:
+                    resource = factory()
+                    self._resources[key] = resource
+        return resource
+
+    def set_resource(self, key: Any, resource: Any) -> None:
+        """Override a pooled resource (e.g. a fake model in tests or benchmarks)."""
+        with self._lock:
+            self._resources[key] = resource
+
+    @property
+    def event_loop(self) -> asyncio.AbstractEventLoop:
+        """The event loop every async batch of this process runs on.
+
+        Pooled clients bind their async transports (e.g. the gRPC aio channel of a
+        Gemini model) to the loop they are first used on, so batches cannot each
+        run on a fresh `asyncio.run` loop.
+        """
+        return self.get_resource("event_loop", asyncio.new_event_loop)
+
+    def run_async(self, coro: Awaitable[T]) -> T:
+        """Run a coroutine to completion on the process's event loop."""
+        return self.event_loop.run_until_complete(coro)
+
+    @property
+    def graph(self):
+        from graph.main import build_graph
+
+        return self.get_resource("graph", build_graph)
+
+    @property
+    def column_filler(self):
+        from graph.columns import build_column_filler
+
+        return self.get_resource("column_filler", build_column_filler)
+
+    def get_model(
+        self,
+        model_name: str,
+        output_schema: type[BaseModel] | None = None,
+        temperature: float = 0,
+    ):
+        """Return a pooled chat model, optionally bound to a structured output schema.
+
+        Structured variants wrap the same base client, so every schema for a
+        given model shares one underlying HTTP session. They are kept in a
+        bounded LRU (`STRUCTURED_MODEL_POOL_SIZE`), like the schema registry.
+        """
+        if output_schema is None:
+            return self.get_resource(
+                ("model", model_name, temperature),
+                lambda: ChatGoogleGenerativeAI(model=model_name, temperature=temperature),
+            )
+
+        key = (model_name, temperature, output_schema)
+        with self._lock:
+            model = self._structured_models.get(key)
+            if model is None:
+                model = self.get_model(model_name, temperature=temperature).with_structured_output(output_schema)
+            self._set_structured_model(key, model)
+            return model
+
+    def _set_structured_model(self, key: Any, model: Any) -> None:
+        with self._lock:
+            self._structured_models[key] = model
+            self._structured_models.move_to_end(key)
+            while len(self._structured_models) > self.structured_pool_size:
+                self._structured_models.popitem(last=False)
+
+    def set_model(
+        self,
+        model_name: str,
+        model: Any,
+        output_schema: type[BaseModel] | None = None,
+        temperature: float = 0,
+    ) -> None:
+        if output_schema is None:
+            self.set_resource(("model", model_name, temperature), model)
+        else:
+            self._set_structured_model((model_name, temperature, output_schema), model)
+
+    def get_redis(self) -> redis.Redis:
+        """Return the pooled Redis client (REDIS_URL, falling back to the Celery broker)."""
+        return self.get_resource(
+            "redis",
+            lambda: redis.Redis.from_url(
+                os.environ.get("REDIS_URL") or os.environ.get("CELERY_BROKER_URL", "redis://redis:6379/0")
+            ),
+        )
+
+    def get_limiter(self) -> RateLimiter:
+        """Return the LLM rate limiter, backed by the shared Redis so quotas hold cluster-wide."""
+        return self.get_resource("limiter", lambda: RateLimiter(RedisLimiterStore(self.get_redis())))
+
+    def call_llm(self, model_name: str, tokens: int, fn: Callable[[], T]) -> T:
+        """Run one LLM request under the rate limiter, recording it in the current chunk's metrics."""
+        return call_llm(self.get_limiter(), model_name, tokens, fn)
+
+    async def acall_llm(self, model_name: str, tokens: int, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async `call_llm`."""
+        return await acall_llm(self.get_limiter(), model_name, tokens, fn)
+
+    def reset(self) -> None:
+        """Drop every pooled resource, e.g. ones inherited from a parent process."""
+        with self._lock:
+            loop = self._resources.get("event_loop")
+            if loop is not None and not loop.is_running():
+                loop.close()
+            self._resources.clear()
+            self._structured_models.clear()
+            self.warmup_seconds = None
+
+    def warm_up(self) -> float:
+        """Create the event loop, compile the graph and open the model clients, returning the time taken."""
+        from graph.agents.enhancer import build_agent_executor
+
+        started = time.perf_counter()
+        self.event_loop
+        self.graph
+        for model_name in {composer_model_name, enhancer_model_name, reviewer_model_name, supervisor_model_name}:
+            self.get_model(model_name)
+        self.get_resource("enhancer_agent", build_agent_executor)
+        self.warmup_seconds = time.perf_counter() - started
+        return self.warmup_seconds
+
+
+runtime = GraphRuntime()
@@ -0,0 +1,157 @@
+import os
+import threading
+import typing
+from collections import OrderedDict
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, create_model
+
+from graph.utils import content_hash
+
+# Compiled schemas kept per worker process; least recently used ones are dropped first
+DEFAULT_REGISTRY_SIZE = int(os.environ.get("SCHEMA_REGISTRY_SIZE", 256))
+
+
+def parse_type(type_spec: str | type) -> type:
+    """Parse type specification to Python type."""
+    if isinstance(type_spec, type):
+        return type_spec
+
+    if not isinstance(type_spec, str):
+        return str
+
+    type_map = {"str": str, "int": int, "float": float, "bool": bool}
+    type_spec = type_spec.strip().lower()
+
+    if "|" in type_spec:
+        parts = [p.strip() for p in type_spec.split("|")]
+        base_type = type_map.get(parts[0], str)
+        if any(p in ("null", "none") for p in parts):
+            return Optional[base_type]
+        return base_type
+
+    return type_map.get(type_spec, str)
+
+
+def _field_spec(spec: Any) -> tuple[str, str]:
+    # Original data schemas map names to type strings, target schemas to {"type", "description"} specs
+    if isinstance(spec, dict):
+        type_spec, description = spec.get("type", "str"), spec.get("description", "")
+    else:
+        type_spec, description = spec, ""
+    type_spec = type_spec.strip().lower() if isinstance(type_spec, str) else "str"
+    return type_spec or "str", description or ""
+
+
+def field_type(spec: Any) -> type:
+    """The Python type of a field spec, either a type string or a `{"type", "description"}` dict."""
+    return parse_type(_field_spec(spec)[0])
+
+
+def base_field_type(spec: Any) -> type:
+    """`field_type` with Optional[X] unwrapped to X."""
+    python_type = field_type(spec)
+    args = [arg for arg in typing.get_args(python_type) if arg is not type(None)]
+    return args[0] if args else python_type
+
+
+def schema_fingerprint(schema: dict[str, Any] | None) -> str:
+    """Stable SHA-256 of a schema's fields, types and descriptions, in field order.
+
+    Type spelling is normalised, so `{"id": "int"}` and `{"id": {"type": " INT "}}`
+    share a fingerprint; reordering fields changes it, as it changes the output.
+    """
+    return content_hash([[name, *_field_spec(spec)] for name, spec in (schema or {}).items()])
+
+
+class CompiledSchema:
+    """A schema's pydantic model, structured output wrapper and chunk validator, built once.
+
+    Attributes:
+        fingerprint: `schema_fingerprint` of the schema
+        model: One record of the schema
+        wrapper: `composed_data: list[model]`, for structured output
+        rows_adapter: Validates a whole list of records in one call
+    """
+
+    def __init__(self, fingerprint: str, schema: dict[str, Any], model_name: str):
+        self.fingerprint = fingerprint
+        fields = {}
+        for name, spec in schema.items():
+            _, description = _field_spec(spec)
+            python_type = field_type(spec)
+            fields[name] = (python_type, Field(..., description=description)) if description else (python_type, ...)
+        self.model = create_model(model_name, **fields)
+        self.wrapper = create_model(
+            f"{model_name}Wrapper",
+            composed_data=(
+                list[self.model],
+                Field(description="The final formatted dataset as a list of record dictionaries"),
+            ),
+        )
+        self.rows_adapter = TypeAdapter(list[self.model])
+
+    def row_errors(self, records: list[Any]) -> list[dict[str, Any]]:
+        """Validate a chunk of records in one call; returns the pydantic errors, whose `loc` starts with the record's index."""
+        try:
+            self.rows_adapter.validate_python(records)
+        except ValidationError as e:
+            return e.errors()
+        return []
+
+    def validate_rows(self, records: list[Any]) -> tuple[list[BaseModel | None], list[dict[str, Any]]]:
+        """Validate a chunk of records with at most two batch calls.
+
+        Returns:
+            One validated record per input record (None where it is invalid) and
+            the pydantic errors, whose `loc` starts with the record's index
+        """
+        try:
+            return self.rows_adapter.validate_python(records), []
+        except ValidationError as e:
+            errors = e.errors()
+
+        invalid = {error["loc"][0] for error in errors}
+        validated = iter(self.rows_adapter.validate_python(
+            [record for i, record in enumerate(records) if i not in invalid]
+        ))
+        return [None if i in invalid else next(validated) for i in range(len(records))], errors
+
+
+class SchemaRegistry:
+    """Bounded LRU of `CompiledSchema`s keyed on schema fingerprint and model name.
+
+    Model and wrapper classes must stay stable while a schema is in use, since
+    pooled structured output clients are keyed on them.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_REGISTRY_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CompiledSchema] = OrderedDict()
+
+    def get(self, schema: dict[str, Any], model_name: str = "DynamicDataModel", fingerprint: str | None = None) -> CompiledSchema:
+        """Return the compiled schema, compiling it on first use; pass `fingerprint` when it is already known."""
+        fingerprint = fingerprint or schema_fingerprint(schema)
+        key = f"{model_name}:{fingerprint}"
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                return compiled
+
+            compiled = CompiledSchema(fingerprint, schema, model_name)
+            self._entries[key] = compiled
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return compiled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+schema_registry = SchemaRegistry()
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import re
+import time
+import unicodedata
+import uuid
+from typing import Any
+
+from langchain_core.tools import BaseTool
+
+from graph.instrumentation import record_tool_call
+from graph.runtime import current_job_id
+from graph.utils import content_hash
+
+
+# KEYS[1]: lock key; ARGV[1]: the holder's token. Deletes the lock only while this caller still holds it,
+# so a lock that expired and was taken by another process is left alone
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def normalize_query(query: str) -> str:
+    """Normalise a search query so trivially different phrasings share a cache entry."""
+    query = unicodedata.normalize("NFKC", query).casefold()
+    query = re.sub(r"[^\w\s]", " ", query)
+    return " ".join(query.split())
+
+
+def search_cache_stats(redis_client, job_id: int) -> dict[str, Any]:
+    """Return search cache counters recorded for `job_id`."""
+    raw = redis_client.hgetall(f"search-cache:stats:{job_id}")
+    counters = {
+        (key.decode() if isinstance(key, bytes) else key): int(value)
+        for key, value in raw.items()
+    }
+    hits = counters.get("hits", 0)
+    misses = counters.get("misses", 0)
+    return {
+        "search_hits": hits,
+        "search_misses": misses,
+        "search_coalesced": counters.get("coalesced", 0),
+        "search_hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+    }
+
+
+class CachedSearchTool(BaseTool):
+    """Wraps a search tool with a shared Redis cache.
+
+    Queries are normalised before lookup. When several worker processes ask the
+    same query at once, only the one holding the Redis lock runs the search;
+    the others wait for its result instead of searching again.
+    """
+
+    search_tool: BaseTool
+    redis_client: Any
+    ttl: int = 24 * 60 * 60
+    lock_timeout: int = 60
+    poll_interval: float = 0.2
+    stats_ttl: int = 7 * 24 * 60 * 60
+    release_lock: Any = None
+
+    def __init__(self, search_tool: BaseTool, redis_client: Any, **kwargs):
+        super().__init__(
+            name=search_tool.name,
+            description=search_tool.description,
+            args_schema=search_tool.args_schema,
+            search_tool=search_tool,
+            redis_client=redis_client,
+            release_lock=redis_client.register_script(RELEASE_LOCK_SCRIPT),
+            **kwargs,
+        )
+
+    def _cache_key(self, tool_input: dict[str, Any]) -> str:
+        normalized = {
+            key: normalize_query(value) if key == "query" and isinstance(value, str) else value
+            for key, value in tool_input.items()
+            if value is not None
+        }
+        return f"search-cache:{self.search_tool.name}:{content_hash(normalized)}"
+
+    def _record(self, counter: str) -> None:
+        job_id = current_job_id.get()
+        if job_id is None:
+            return
+        stats_key = f"search-cache:stats:{job_id}"
+        self.redis_client.hincrby(stats_key, counter, 1)
+        self.redis_client.expire(stats_key, self.stats_ttl)
+
+    def _run(self, **tool_input: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            result, cache_hit = self._cached_search(tool_input)
+        except Exception:
+            record_tool_call(self.name, time.perf_counter() - started, error=True)
+            raise
+        record_tool_call(self.name, time.perf_counter() - started, cache_hit=cache_hit)
+        return result
+
+    async def _arun(self, **tool_input: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            result, cache_hit = await self._acached_search(tool_input)
+        except Exception:
+            record_tool_call(self.name, time.perf_counter() - started, error=True)
+            raise
+        record_tool_call(self.name, time.perf_counter() - started, cache_hit=cache_hit)
+        return result
+
+    def _get_cached(self, key: str, coalesced: bool = False) -> tuple[bool, Any]:
+        """Return whether `key` is cached and its result, recording the hit."""
+        cached = self.redis_client.get(key)
+        if cached is None:
+            return False, None
+        self._record("hits")
+        if coalesced:
+            self._record("coalesced")
+        return True, json.loads(cached)
+
+    def _lock(self, lock_key: str) -> str | None:
+        """Take the search lock, returning its token, or None when another process holds it."""
+        lock_token = uuid.uuid4().hex
+        if self.redis_client.set(lock_key, lock_token, nx=True, px=self.lock_timeout * 1000):
+            return lock_token
+        return None
+
+    def _is_locked(self, lock_key: str) -> bool:
+        return bool(self.redis_client.get(lock_key))
+
+    def _set_cached(self, key: str, result: Any) -> None:
+        self.redis_client.set(key, json.dumps(result, default=str), ex=self.ttl)
+
+    def _unlock(self, lock_key: str, lock_token: str) -> None:
+        self.release_lock(keys=[lock_key], args=[lock_token])
+
+    def _cached_search(self, tool_input: dict[str, Any]) -> tuple[Any, bool]:
+        """Return the search result and whether it came from the cache."""
+        key = self._cache_key(tool_input)
+        found, cached = self._get_cached(key)
+        if found:
+            return cached, True
+
+        lock_key = f"{key}:lock"
+        lock_token = self._lock(lock_key)
+        if lock_token is None:
+            # Another process is already running this search, wait for its result
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                found, cached = self._get_cached(key, coalesced=True)
+                if found:
+                    return cached, True
+                if not self._is_locked(lock_key):
+                    break
+            # Search without the lock rather than wait any longer; only the holder may release it
+
+        self._record("misses")
+        try:
+            result = self.search_tool.invoke(tool_input)
+            self._set_cached(key, result)
+        finally:
+            if lock_token is not None:
+                self._unlock(lock_key, lock_token)
+        return result, False
+
+    async def _acached_search(self, tool_input: dict[str, Any]) -> tuple[Any, bool]:
+        """`_cached_search` for the event loop: the Redis client is synchronous, so its calls run in a thread."""
+        key = self._cache_key(tool_input)
+        found, cached = await asyncio.to_thread(self._get_cached, key)
+        if found:
+            return cached, True
+
+        lock_key = f"{key}:lock"
+        lock_token = await asyncio.to_thread(self._lock, lock_key)
+        if lock_token is None:
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                found, cached = await asyncio.to_thread(self._get_cached, key, True)
+                if found:
+                    return cached, True
+                if not await asyncio.to_thread(self._is_locked, lock_key):
+                    break
+
+        await asyncio.to_thread(self._record, "misses")
+        try:
+            result = await self.search_tool.ainvoke(tool_input)
+            await asyncio.to_thread(self._set_cached, key, result)
+        finally:
+            if lock_token is not None:
+                await asyncio.to_thread(self._unlock, lock_key, lock_token)
+        return result, False
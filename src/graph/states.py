@@ -5,6 +5,7 @@ from langchain_core.messages import AnyMessage
 
 
 class MessagesState(TypedDict):
+    # Append-only: nodes return only the messages they add, never the existing history
     messages: Annotated[list[AnyMessage], operator.add]
     llm_calls: int
     cmd: Literal["composer", "data_chunk_supervisor", "end"]
@@ -12,3 +13,25 @@ class MessagesState(TypedDict):
     composed_data: list[dict | str | int | float | bool | None]
     review_count: int
     schema: dict[str, str]
+    # The job's stored fingerprint of `schema`, so compiled schemas are looked up without hashing it again
+    schema_fingerprint: str | None
+    # Input rows of the chunk, the base for structured patches
+    rows: list[dict]
+    # "patch": the enhancer returns per-row field updates applied in Python; "text": the full dataset as text
+    enhancer_mode: Literal["text", "patch"]
+    # Number of recent messages (besides the task message) agents see; None for all
+    context_window: int | None
+    # "llm": the supervisor and reviewer LLMs route every step; "rules": routing is decided by checks
+    # in Python and the reviewer LLM only runs when they fail
+    routing_mode: Literal["llm", "rules"]
+    # Problems the rule-based checks found in the enhancer's output; empty when it passed
+    check_problems: list[str]
+    # Reviews after which the rules routing mode composes regardless
+    max_reviews: int
+    # Share of a field's values that may stay null before the rules routing mode asks for a review
+    max_null_rate: float
+    # "llm": the composer LLM reshapes every record; "parse": records are validated in Python and only
+    # the ones that fail go to the LLM for repair
+    composer_mode: Literal["llm", "parse"]
+    # Fields identifying a row when the columns strategy asks for one field at a time; None for every text value
+    column_key_fields: list[str] | None
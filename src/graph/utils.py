@@ -1,64 +1,183 @@
+import hashlib
 import json
-from typing import Any
+from collections.abc import Iterable
+from itertools import repeat
+from typing import Any, Iterator
 
 
-class CsvChunker:
-    def __init__(self, data: list[dict[str, Any]], chunk_size: int):
+def content_hash(value: Any) -> str:
+    """Stable SHA-256 of a JSON-serialisable value (key order does not matter)."""
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def extract_json(text: str) -> Any:
+    """Return the first JSON array or object embedded in `text` (e.g. inside a ```json fence).
+
+    Raises:
+        ValueError: If `text` contains no valid JSON array or object
+    """
+    decoder = json.JSONDecoder()
+    for i, char in enumerate(text):
+        if char in "[{":
+            try:
+                value, _ = decoder.raw_decode(text, i)
+                return value
+            except json.JSONDecodeError:
+                continue
+    raise ValueError("No JSON found in text.")
+
+
+def context_window(messages: list, size: int | None) -> list:
+    """Return the first (task) message plus the last `size` messages.
+
+    `None` keeps the whole history.
+    """
+    if size is None or len(messages) <= size + 1:
+        return list(messages)
+    return [messages[0], *messages[-size:]] if size > 0 else [messages[0]]
+
+
+class Chunker:
+    def __init__(self, data: Iterable[dict[str, Any]], chunk_size: int):
         """
-        Initialize CSV chunker with an array of objects.
+        Initialize chunker with objects to chunk.
         
         Args:
-            data: Array of objects (dictionaries) to chunk
+            data: Objects (dictionaries) to chunk; any iterable, e.g. rows streamed from the database.
+                It is read lazily, one chunk at a time, and only once unless it is a list.
             chunk_size: Number of objects per chunk
         """
-        if not isinstance(data, list):
-            raise ValueError("Data must be an array/list of objects.")
-        
-        if len(data) == 0:
-            raise ValueError("Data array is empty.")
-        
-        if not all(isinstance(item, dict) for item in data):
-            raise ValueError("All items in the data array must be objects (dictionaries).")
+        if not isinstance(data, Iterable) or isinstance(data, (str, bytes, dict)):
+            raise ValueError("Data must be an iterable of objects.")
         
         self.data = data
         self.chunk_size = chunk_size
 
-    def chunk(self) -> list[list[dict[str, Any]]]:
-        """Split array of objects into chunks of chunk_size objects."""
-        chunks = []
-        for i in range(0, len(self.data), self.chunk_size):
-            chunk_objects = self.data[i:i + self.chunk_size]
-            chunks.append(chunk_objects)
-        
-        return chunks
+    def items(self) -> Iterator[dict[str, Any]]:
+        """Lazily yield the objects, checking each as it is read."""
+        empty = True
+        for item in self.data:
+            if not isinstance(item, dict):
+                raise ValueError("All items in the data must be objects (dictionaries).")
+            empty = False
+            yield item
+        if empty:
+            raise ValueError("Data is empty.")
+
+    def spans(self) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+        """Lazily yield the start index and objects of each chunk."""
+        start = 0
+        chunk = []
+        for i, item in enumerate(self.items()):
+            if len(chunk) >= self.chunk_size:
+                yield start, chunk
+                start = i
+                chunk = []
+            chunk.append(item)
+        yield start, chunk
+
+    def ranges(self) -> Iterator[tuple[int, int]]:
+        """Lazily yield (start, end) row ranges of each chunk."""
+        for start, chunk in self.spans():
+            yield start, start + len(chunk)
+
+    def chunk(self) -> Iterator[list[dict[str, Any]]]:
+        """Lazily yield chunks of the objects."""
+        for _, chunk in self.spans():
+            yield chunk
+
+
+# CSV and JSON uploads are both read as a stream of objects before chunking
+CsvChunker = Chunker
+JsonChunker = Chunker
+
+
+# Rough average for English text and JSON punctuation
+CHARS_PER_TOKEN = 4
 
 
-class JsonChunker:
-    def __init__(self, data: list[dict[str, Any]], chunk_size: int):
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate of a prompt, good enough for budgeting and rate limiting."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class TokenBudgetChunker(Chunker):
+    # Expected output size of a field that has no value in the input yet
+    MISSING_FIELD_TOKENS = {str: 16, int: 4, float: 6, bool: 2}
+
+    def __init__(
+        self,
+        data: Iterable[dict[str, Any]],
+        schema: dict[str, Any],
+        token_budget: int,
+        max_chunk_size: int = 50,
+        skip: Iterable[bool] | None = None,
+        max_chunk_rows: int = 1000,
+    ):
         """
-        Initialize JSON chunker with an array of objects.
+        Initialize chunker that packs rows into chunks of at most `token_budget` estimated tokens.
         
         Args:
-            data: Array of objects (dictionaries) to chunk
-            chunk_size: Number of objects per chunk
+            data: Objects (dictionaries) to chunk, read lazily like `Chunker`'s
+            schema: Target output schema, used to estimate the output tokens of each row
+            token_budget: Maximum estimated tokens (input + output) of a chunk
+            max_chunk_size: Upper bound on the number of objects per chunk that go to the LLM
+            skip: Flags for rows already resolved without the LLM, aligned with `data`; they cost no tokens
+            max_chunk_rows: Upper bound on the number of objects per chunk, including skipped ones
         """
-        if not isinstance(data, list):
-            raise ValueError("Data must be an array/list of objects.")
-        
-        if len(data) == 0:
-            raise ValueError("Data array is empty.")
-        
-        if not all(isinstance(item, dict) for item in data):
-            raise ValueError("All items in the data array must be objects (dictionaries).")
-        
-        self.data = data
-        self.chunk_size = chunk_size
+        from graph.schema_registry import base_field_type
 
-    def chunk(self) -> list[list[dict[str, Any]]]:
-        """Split array of objects into chunks of chunk_size objects."""
-        chunks = []
-        for i in range(0, len(self.data), self.chunk_size):
-            chunk_objects = self.data[i:i + self.chunk_size]
-            chunks.append(chunk_objects)
-        
-        return chunks
\ No newline at end of file
+        super().__init__(data, max_chunk_size)
+        self.schema = schema
+        # Either spec form: a type string or a {"type", "description"} dict
+        self.missing_field_tokens = {
+            name: self.MISSING_FIELD_TOKENS.get(base_field_type(spec), self.MISSING_FIELD_TOKENS[str])
+            for name, spec in schema.items()
+        }
+        self.token_budget = token_budget
+        self.skip = skip
+        self.max_chunk_rows = max_chunk_rows
+
+    def estimate_row_tokens(self, row: dict[str, Any]) -> int:
+        """Estimate the tokens a row costs as input plus its output in the target schema."""
+        input_tokens = estimate_tokens(json.dumps(row, default=str))
+
+        output_tokens = 0
+        for name, missing_tokens in self.missing_field_tokens.items():
+            value = row.get(name)
+            if value is None or value == "":
+                value_tokens = missing_tokens
+            else:
+                value_tokens = estimate_tokens(json.dumps(value, default=str))
+            output_tokens += estimate_tokens(name) + value_tokens
+
+        return input_tokens + output_tokens
+
+    def spans(self) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+        """Lazily yield the start index and objects of each chunk, packing rows up to the token budget.
+
+        A single row larger than the budget still gets a chunk of its own.
+        """
+        skip = iter(self.skip) if self.skip is not None else repeat(False)
+        start = 0
+        chunk = []
+        chunk_tokens = 0
+        chunk_llm_rows = 0
+        for i, (row, skipped) in enumerate(zip(self.items(), skip)):
+            row_tokens = 0 if skipped else self.estimate_row_tokens(row)
+            if chunk and (
+                chunk_tokens + row_tokens > self.token_budget
+                or (not skipped and chunk_llm_rows >= self.chunk_size)
+                or len(chunk) >= self.max_chunk_rows
+            ):
+                yield start, chunk
+                start = i
+                chunk = []
+                chunk_tokens = 0
+                chunk_llm_rows = 0
+            chunk.append(row)
+            chunk_tokens += row_tokens
+            chunk_llm_rows += 0 if skipped else 1
+
+        yield start, chunk
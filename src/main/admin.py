@@ -1,8 +1,16 @@
 from models.enhanced_data import EnhancedData
+from models.enhanced_data_chunk import EnhancedDataChunk
+from models.enhanced_data_row import EnhancedDataRow
+from models.enhancement_cache import EnhancementCacheEntry
 from models.original_data import OriginalData
+from models.original_data_row import OriginalDataRow
 from django.contrib import admin
 
 # Register your models here.
 
 admin.site.register(OriginalData)
-admin.site.register(EnhancedData)
\ No newline at end of file
+admin.site.register(EnhancedData)
+admin.site.register(EnhancedDataChunk)
+admin.site.register(EnhancementCacheEntry)
+admin.site.register(OriginalDataRow)
+admin.site.register(EnhancedDataRow)
@@ -0,0 +1,599 @@
+import ast
+import asyncio
+import json
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import cycle
+from typing import Any, Iterator
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tools import BaseTool
+
+from graph.agents.enhancer import PATCH_OUTPUT_INSTRUCTIONS
+from graph.columns import COLUMN_OUTPUT_INSTRUCTIONS, build_column_filler
+from graph.agents.reviewer import ReviewerResponse
+from graph.agents.supervisor import SupervisorResponse
+from graph.models import composer_model_name, enhancer_model_name, reviewer_model_name, supervisor_model_name
+from graph.output_formats import build_response_wrapper
+from graph.rate_limit import LocalLimiterStore, RateLimiter
+from graph.runtime import runtime
+from graph.schema_registry import field_type
+from graph.search_cache import RELEASE_LOCK_SCRIPT, CachedSearchTool
+from graph.utils import estimate_tokens
+
+BENCHMARK_SCHEMA = {
+    "id": {"type": "int", "description": "The id of the company"},
+    "company_name": {"type": "str", "description": "The name of the company"},
+    "country": {"type": "str", "description": "The country of the company's headquarters"},
+    "industry": {"type": "str", "description": "The industry of the company"},
+    "ceo": {"type": "str", "description": "The CEO of the company"},
+    "employees": {"type": "int", "description": "Number of employees"},
+}
+COUNTRIES = ["Germany", "France", "Croatia", "Japan", "Brazil"]
+UNLIMITED_RATE = {"rpm": 10 ** 9, "tpm": 10 ** 12}
+
+
+def synthetic_rows(size: int, salt: str = "", entity_repeats: int = 1) -> list[dict[str, Any]]:
+    """Company rows missing the enrichment fields of `BENCHMARK_SCHEMA`; `salt` keeps runs out of each other's cache.
+
+    Each company appears in `entity_repeats` consecutive rows with different ids.
+    """
+    companies = [i // max(entity_repeats, 1) for i in range(size)]
+    return [
+        {"id": i, "company_name": f"Company {salt}{company}", "country": COUNTRIES[company % len(COUNTRIES)]}
+        for i, company in enumerate(companies)
+    ]
+
+
+def _between(text: str, start: str, end: str) -> str:
+    return text.split(start, 1)[1].split(end, 1)[0].strip()
+
+
+def fake_value(spec: Any, field: str, key: str) -> Any:
+    """Deterministic stand-in for a researched value."""
+    python_type = field_type(spec)
+    if python_type is bool:
+        return zlib.crc32(f"{field}:{key}".encode()) % 2 == 0
+    if python_type in (int, float):
+        return python_type(zlib.crc32(f"{field}:{key}".encode()) % 10_000)
+    return f"{field} of {key}"
+
+
+class LocalRedis:
+    """In-process stand-in for the Redis commands used by the search cache, job events and metric totals.
+
+    Published job events are kept in `messages` as `(channel, payload)` pairs and
+    delivered to the subscribers of `pubsub()`.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+        self.messages = []
+        self.subscribers: dict[str, list[queue.Queue]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, nx=False, ex=None, px=None):
+        with self._lock:
+            if nx and key in self.values:
+                return None
+            self.values[key] = value
+            return True
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def _release_lock(self, keys, args):
+        with self._lock:
+            if self.values.get(keys[0]) != args[0]:
+                return 0
+            del self.values[keys[0]]
+            return 1
+
+    # Lua scripts with a local implementation; the rate limiter's scripts run against a real Redis only
+    SCRIPTS = {RELEASE_LOCK_SCRIPT: _release_lock}
+
+    def register_script(self, script):
+        if script not in self.SCRIPTS:
+            raise ValueError(f"LocalRedis has no implementation of the Lua script starting {script.strip()[:60]!r}")
+        implementation = self.SCRIPTS[script]
+        return lambda keys, args: implementation(self, keys, args)
+
+    def hincrby(self, key, field, amount=1):
+        with self._lock:
+            counters = self.hashes.setdefault(key, {})
+            counters[field] = counters.get(field, 0) + amount
+            return counters[field]
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def expire(self, key, seconds):
+        return True
+
+    def hincrbyfloat(self, key, field, amount=1.0):
+        with self._lock:
+            counters = self.hashes.setdefault(key, {})
+            counters[field] = counters.get(field, 0.0) + amount
+            return counters[field]
+
+    def pipeline(self):
+        # Commands run immediately; `execute` has nothing left to send
+        return _LocalPipeline(self)
+
+    def publish(self, channel, message):
+        self.messages.append((channel, json.loads(message)))
+        subscribers = self.subscribers.get(channel, [])
+        for inbox in subscribers:
+            inbox.put({"type": "message", "channel": channel, "data": message})
+        return len(subscribers)
+
+    def pubsub(self, ignore_subscribe_messages=True):
+        return _LocalPubSub(self)
+
+
+class _LocalPipeline:
+    def __init__(self, redis_client):
+        self.redis = redis_client
+
+    def __getattr__(self, name):
+        return getattr(self.redis, name)
+
+    def execute(self):
+        return []
+
+
+class _LocalPubSub:
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self.inbox = queue.Queue()
+        self.channels = []
+
+    def subscribe(self, channel):
+        self.redis.subscribers.setdefault(channel, []).append(self.inbox)
+        self.channels.append(channel)
+
+    def get_message(self, timeout=0.0):
+        try:
+            return self.inbox.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        for channel in self.channels:
+            self.redis.subscribers[channel].remove(self.inbox)
+        self.channels = []
+
+
+class CallLog:
+    """Thread-safe LLM and search call counters, per graph node."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: dict[str, dict[str, int]] = {}
+
+    def record(self, node: str, prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        with self._lock:
+            counters = self.calls.setdefault(node, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            counters["calls"] += 1
+            counters["prompt_tokens"] += prompt_tokens
+            counters["completion_tokens"] += completion_tokens
+
+
+class ReplayResponses:
+    """Recorded responses per node, replayed in order (and cycled) instead of the generated ones.
+
+    The file maps node names to response lists, e.g.
+    {"supervisor": [{"response": "...", "cmd": "enhancer"}], "reviewer": [{"status": "APPROVED", "reasoning": "..."}],
+     "enhancer": ["[{\"row\": 0, \"updates\": {...}}]"], "search": [{"results": [...]}]}
+    """
+
+    def __init__(self, recorded: dict[str, list[Any]] | None = None):
+        self._lock = threading.Lock()
+        self._cycles = {node: cycle(responses) for node, responses in (recorded or {}).items() if responses}
+
+    @classmethod
+    def from_file(cls, path: str | None) -> "ReplayResponses":
+        if not path:
+            return cls()
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def next(self, node: str) -> Any | None:
+        with self._lock:
+            responses = self._cycles.get(node)
+            return next(responses) if responses else None
+
+
+class FakeLLM:
+    """Deterministic local model for one graph node, with a fixed latency per call.
+
+    Token usage is recorded as the prompt's estimated tokens plus either
+    `completion_tokens` or the estimated tokens of the response.
+    """
+
+    def __init__(self, node: str, respond, log: CallLog | None = None, latency: float = 0.0, completion_tokens: int | None = None):
+        self.node = node
+        self.respond = respond
+        self.log = log if log is not None else CallLog()
+        self.latency = latency
+        self.completion_tokens = completion_tokens
+
+    def _record(self, prompt: Any, response: Any) -> None:
+        completion = self.completion_tokens
+        if completion is None:
+            completion = estimate_tokens(response.model_dump_json() if hasattr(response, "model_dump_json") else str(response))
+        self.log.record(self.node, estimate_tokens(str(prompt)), completion)
+
+    def invoke(self, prompt):
+        time.sleep(self.latency)
+        response = self.respond(prompt)
+        self._record(prompt, response)
+        return response
+
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(self.latency)
+        response = self.respond(prompt)
+        self._record(prompt, response)
+        return response
+
+
+class FakeSearchTool(BaseTool):
+    name: str = "tavily_search"
+    description: str = "Deterministic local stand-in for TavilySearch"
+    latency: float = 0.0
+    log: Any = None
+    replay: Any = None
+    calls: int = 0
+
+    def _run(self, query: str) -> dict:
+        time.sleep(self.latency)
+        self.calls += 1
+        if self.log is not None:
+            self.log.record("search")
+        recorded = self.replay.next("search") if self.replay else None
+        return recorded if recorded is not None else {"query": query, "results": [{"content": f"Result for {query}"}]}
+
+
+class FakeEnhancerAgent(FakeLLM):
+    """Stands in for the enhancer's AgentExecutor: searches once per row and fills the missing schema fields.
+
+    Each run counts as one rate-limited model call; `message_counts` keeps the number of messages each run was given.
+    """
+
+    def __init__(self, *args, search_tool: BaseTool, replay: ReplayResponses | None = None, **kwargs):
+        super().__init__("enhancer", self._respond, *args, **kwargs)
+        self.search_tool = search_tool
+        self.replay = replay
+        self.message_counts: list[int] = []
+
+    @staticmethod
+    def _prompt(inputs: dict) -> str:
+        return "".join(str(message.content) for message in inputs["messages"])
+
+    def _record(self, inputs: dict, response: dict) -> None:
+        super()._record(self._prompt(inputs), response["output"])
+
+    def _respond(self, inputs: dict) -> dict:
+        self.message_counts.append(len(inputs["messages"]))
+        recorded = self.replay.next("enhancer") if self.replay else None
+        if recorded is not None:
+            return {"output": recorded}
+
+        task = inputs["messages"][0].content
+        if inputs["output_instructions"] == COLUMN_OUTPUT_INSTRUCTIONS:
+            return {"output": json.dumps(self._column_values(task))}
+        rows = ast.literal_eval(_between(task, "Here is the raw data:", "Output format:"))
+        schema = ast.literal_eval(task.split("Output format:", 1)[1].strip())
+
+        patches = []
+        for i, row in enumerate(rows):
+            key = str(row.get("company_name") or i)
+            missing = [field for field in schema if row.get(field) in (None, "")]
+            if not missing:
+                continue
+            self.search_tool.invoke({"query": f"{missing[0]} of {key}"})
+            patches.append({"row": i, "updates": {field: fake_value(schema[field], field, key) for field in missing}})
+
+        if inputs["output_instructions"] == PATCH_OUTPUT_INSTRUCTIONS:
+            return {"output": json.dumps(patches)}
+        updates = {patch["row"]: patch["updates"] for patch in patches}
+        return {"output": json.dumps([{**row, **updates.get(i, {})} for i, row in enumerate(rows)])}
+
+    def _column_values(self, task: str) -> list[dict[str, Any]]:
+        field = _between(task, 'Find the value of "', '"')
+        type_spec = _between(task, "; type ", ") for every entity")
+        values = []
+        for line in task.split("one JSON object per line:", 1)[1].strip().splitlines():
+            entity = json.loads(line)
+            key = str(entity.get("company_name") or entity["row"])
+            self.search_tool.invoke({"query": f"{field} of {key}"})
+            values.append({"row": entity["row"], "value": fake_value(type_spec, field, key)})
+        return values
+
+    def invoke(self, inputs):
+        run = super().invoke
+        return runtime.call_llm(enhancer_model_name, estimate_tokens(self._prompt(inputs)), lambda: run(inputs))
+
+    async def _ainvoke(self, inputs):
+        # The search tool is synchronous, like the real agent's tool calls
+        await asyncio.sleep(self.latency)
+        response = await asyncio.to_thread(self.respond, inputs)
+        self._record(inputs, response)
+        return response
+
+    async def ainvoke(self, inputs):
+        return await runtime.acall_llm(enhancer_model_name, estimate_tokens(self._prompt(inputs)), lambda: self._ainvoke(inputs))
+
+
+def _fake_supervisor(replay: ReplayResponses, max_reviews: int):
+    def respond(prompt: str) -> SupervisorResponse:
+        recorded = replay.next("supervisor")
+        if recorded is not None:
+            return SupervisorResponse(**recorded)
+        review_count = int(prompt.rsplit("Review count:", 1)[1].split()[0])
+        approved = "Status: APPROVED" in prompt
+        if approved or review_count >= max_reviews:
+            return SupervisorResponse(response="The data is approved, compose it.", cmd="composer")
+        return SupervisorResponse(response="Fill in the missing fields of every row.", cmd="enhancer")
+    return respond
+
+
+def _fake_reviewer(replay: ReplayResponses, approval_rate: float):
+    def respond(prompt: str) -> ReviewerResponse:
+        recorded = replay.next("reviewer")
+        if recorded is not None:
+            return ReviewerResponse(**recorded)
+        # Deterministic per prompt, so reruns take the same route through the graph
+        if zlib.crc32(prompt.encode()) % 1000 < approval_rate * 1000:
+            return ReviewerResponse(status="APPROVED", reasoning="All fields are filled in.")
+        return ReviewerResponse(status="NEEDS_REVISION", reasoning="Some values look implausible.")
+    return respond
+
+
+def _fake_composer(schema: dict[str, Any]):
+    wrapper = build_response_wrapper(schema, "ComposerResponse")
+
+    def respond(prompt: str):
+        enhanced_data = ast.literal_eval(_between(prompt, "**Enhanced Data:**", "**Instructions:**"))
+        rows = []
+        for item in enhanced_data:
+            # Text mode hands over the enhancer's output as a JSON string
+            parsed = json.loads(item) if isinstance(item, str) else item
+            rows.extend(parsed if isinstance(parsed, list) else [parsed])
+        return wrapper.model_validate({"composed_data": [{field: row.get(field) for field in schema} for row in rows]})
+    return respond, wrapper
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Records the wall time of every graph node run."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started: dict[Any, tuple[str, float]] = {}
+        self.durations: dict[str, list[float]] = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id, tags=None, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        # The node run itself is tagged with its graph step; its inner runs are not
+        if node and any(tag.startswith("graph:step:") for tag in tags or []):
+            self._started[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            with self._lock:
+                self.durations.setdefault(started[0], []).append(time.perf_counter() - started[1])
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._started.pop(run_id, None)
+
+    def record(self, node: str, seconds: float) -> None:
+        with self._lock:
+            self.durations.setdefault(node, []).append(seconds)
+
+
+class TimedGraph:
+    """The compiled graph, invoked with a `NodeTimer` callback; with `node`, a single step timed as that node."""
+
+    def __init__(self, graph, timer: NodeTimer, node: str | None = None):
+        self.graph = graph
+        self.timer = timer
+        self.node = node
+
+    def _config(self, config):
+        config = config or {}
+        return {**config, "callbacks": [*config.get("callbacks", []), self.timer]}
+
+    def invoke(self, state, config=None):
+        started = time.perf_counter()
+        try:
+            return self.graph.invoke(state, config=self._config(config))
+        finally:
+            if self.node:
+                self.timer.record(self.node, time.perf_counter() - started)
+
+    async def ainvoke(self, state, config=None):
+        started = time.perf_counter()
+        try:
+            return await self.graph.ainvoke(state, config=self._config(config))
+        finally:
+            if self.node:
+                self.timer.record(self.node, time.perf_counter() - started)
+
+
+def install_fakes(
+    schema: dict[str, Any],
+    latency: float = 0.0,
+    search_latency: float = 0.0,
+    completion_tokens: int | None = None,
+    approval_rate: float = 1.0,
+    max_reviews: int = 2,
+    replay: ReplayResponses | None = None,
+) -> tuple[CallLog, NodeTimer]:
+    """Replace the graph's models, enhancer agent, search tool, Redis and rate limiter with local stand-ins."""
+    from graph.main import build_graph
+
+    replay = replay or ReplayResponses()
+    log = CallLog()
+    timer = NodeTimer()
+    runtime.reset()
+
+    runtime.set_resource("redis", LocalRedis())
+    runtime.set_resource("limiter", RateLimiter(LocalLimiterStore(), limits=lambda model_name: UNLIMITED_RATE))
+    search_tool = CachedSearchTool(FakeSearchTool(latency=search_latency, log=log, replay=replay), runtime.get_redis())
+    runtime.set_resource("search_tool", search_tool)
+
+    options = {"latency": latency, "completion_tokens": completion_tokens}
+    runtime.set_model(supervisor_model_name, FakeLLM("supervisor", _fake_supervisor(replay, max_reviews), log, **options), SupervisorResponse)
+    runtime.set_model(reviewer_model_name, FakeLLM("reviewer", _fake_reviewer(replay, approval_rate), log, **options), ReviewerResponse)
+    respond, wrapper = _fake_composer(schema)
+    runtime.set_model(composer_model_name, FakeLLM("composer", respond, log, **options), wrapper)
+    runtime.set_resource("enhancer_agent", FakeEnhancerAgent(log, search_tool=search_tool, replay=replay, **options))
+
+    runtime.set_resource("graph", TimedGraph(build_graph(), timer))
+    runtime.set_resource("column_filler", TimedGraph(build_column_filler(), timer, node="column_filler"))
+    return log, timer
+
+
+@contextmanager
+def local_workers(concurrency: int) -> Iterator[None]:
+    """Run each chord's chunk tasks on `concurrency` threads, standing in for Celery worker processes."""
+
+    def run(signature):
+        try:
+            return signature.apply().get()
+        finally:
+            connection.close()
+
+    def local_chord(header):
+        def apply_body(body):
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(run, header.tasks))
+            return body.apply(args=(results,))
+        return apply_body
+
+    with mock.patch("main.tasks.chord", local_chord):
+        yield
+
+
+@contextmanager
+def eager_tasks() -> Iterator[None]:
+    """Run Celery tasks in the calling process (`task_always_eager`), restoring the previous setting afterwards."""
+    from main.celery import app
+
+    previous = app.conf.task_always_eager
+    app.conf.task_always_eager = True
+    try:
+        yield
+    finally:
+        app.conf.task_always_eager = previous
+
+
+def _latency_summary(durations: list[float]) -> dict[str, float]:
+    ordered = sorted(durations)
+
+    def percentile(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 6)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 6),
+        "p50": percentile(0.5),
+        "p95": percentile(0.95),
+        "max": round(ordered[-1], 6),
+    }
+
+
+def run_benchmark(
+    size: int,
+    chunk_size: int,
+    concurrency: int,
+    mode: str,
+    routing: str = "llm",
+    composer: str = "llm",
+    strategy: str = "rows",
+    column_batch_size: int = 200,
+    dedup: bool = False,
+    entity_repeats: int = 1,
+    salt: str = "",
+    **fake_options,
+) -> dict[str, Any]:
+    """Enhance a synthetic dataset of `size` rows end to end and return its measurements.
+
+    Args:
+        size: Number of rows
+        chunk_size: Maximum rows per chunk (the token budget is lifted so this decides the chunking)
+        concurrency: Chunks in flight at once; worker threads in prefork mode, in-flight graphs in async mode
+        mode: "prefork" or "async" (`ENHANCEMENT_EXECUTION_MODE`)
+        routing: "llm" or "rules" (`ENHANCEMENT_ROUTING_MODE`)
+        composer: "llm" or "parse" (`ENHANCEMENT_COMPOSER_MODE`)
+        strategy: "rows" or "columns" (`ENHANCEMENT_STRATEGY`)
+        column_batch_size: Maximum rows per chunk under the columns strategy (`ENHANCEMENT_COLUMN_BATCH_SIZE`)
+        dedup: Deduplicate the rows by company name and country (`ENHANCEMENT_DEDUP_KEY_FIELDS`)
+        entity_repeats: Rows per company in the dataset
+        salt: Makes the rows unique so earlier runs cannot serve this one from the row cache
+        fake_options: Passed to `install_fakes`
+    """
+    from main.tasks import process_enhancement_coordinator
+    from models.enhanced_data import EnhancedData
+    from models.original_data import OriginalData
+
+    log, timer = install_fakes(BENCHMARK_SCHEMA, **fake_options)
+    original_data = OriginalData.objects.create(schema={})
+    original_data.set_rows(synthetic_rows(size, salt, entity_repeats))
+    enhanced_data = EnhancedData.objects.create(original_data=original_data, schema=BENCHMARK_SCHEMA, status="pending")
+
+    with override_settings(
+        ENHANCEMENT_EXECUTION_MODE=mode,
+        ENHANCEMENT_ROUTING_MODE=routing,
+        ENHANCEMENT_COMPOSER_MODE=composer,
+        ENHANCEMENT_STRATEGY=strategy,
+        ENHANCEMENT_COLUMN_BATCH_SIZE=column_batch_size,
+        ENHANCEMENT_DEDUP_KEY_FIELDS=["company_name", "country"] if dedup else [],
+        ENHANCEMENT_MAX_CHUNK_SIZE=chunk_size,
+        ENHANCEMENT_CHUNK_TOKEN_BUDGET=10 ** 9,
+        ENHANCEMENT_MAX_CONCURRENT_CHUNKS=concurrency,
+        ENHANCEMENT_ASYNC_BATCH_SIZE=concurrency,
+        ENHANCEMENT_ASYNC_MAX_IN_FLIGHT=concurrency,
+    ), eager_tasks(), local_workers(1 if mode == "async" else concurrency):
+        started = time.perf_counter()
+        process_enhancement_coordinator(enhanced_data.id)
+        seconds = time.perf_counter() - started
+
+    enhanced_data.refresh_from_db()
+    llm_calls = {node: counters for node, counters in log.calls.items() if node != "search"}
+    return {
+        "rows": size,
+        "chunk_size": chunk_size,
+        "concurrency": concurrency,
+        "mode": mode,
+        "routing": routing,
+        "composer": composer,
+        "strategy": strategy,
+        "dedup": dedup,
+        "status": enhanced_data.status,
+        "rows_enhanced": enhanced_data.row_count,
+        "chunks": enhanced_data.total_chunks,
+        "chunks_failed": enhanced_data.chunks_failed,
+        "seconds": round(seconds, 4),
+        "rows_per_second": round(size / seconds, 2) if seconds else None,
+        "llm_calls": sum(counters["calls"] for counters in llm_calls.values()),
+        "llm_calls_by_node": llm_calls,
+        "search_calls": log.calls.get("search", {}).get("calls", 0),
+        "node_latency": {node: _latency_summary(durations) for node, durations in sorted(timer.durations.items())},
+        "stats": enhanced_data.stats,
+        "metrics": enhanced_data.metrics,
+    }
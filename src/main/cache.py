@@ -0,0 +1,104 @@
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from graph.models import (
+    composer_model_name,
+    enhancer_model_name,
+    prompt_version,
+    reviewer_model_name,
+    supervisor_model_name,
+)
+from graph.schema_registry import schema_fingerprint
+from graph.utils import content_hash
+from models.enhancement_cache import EnhancementCacheEntry
+
+
+class RowCache:
+    """Content-addressed cache of enhanced rows, shared by every enhancement job.
+
+    A row is looked up by the hash of its content, the schema fingerprint, the
+    configured model names, the prompt version and the pipeline modes that
+    choose between prompts, so changing any of those naturally misses instead
+    of returning a stale result.
+    """
+
+    def __init__(self, schema_dict: dict[str, Any], ttl: int | None = None, fingerprint: str | None = None):
+        self.schema_fingerprint = fingerprint or schema_fingerprint(schema_dict)
+        self.ttl = settings.ENHANCEMENT_CACHE_TTL if ttl is None else ttl
+        self.hits = 0
+        self.misses = 0
+        self._namespace = content_hash([
+            self.schema_fingerprint,
+            composer_model_name,
+            enhancer_model_name,
+            reviewer_model_name,
+            supervisor_model_name,
+            prompt_version,
+            settings.ENHANCEMENT_ENHANCER_MODE,
+            settings.ENHANCEMENT_ROUTING_MODE,
+            settings.ENHANCEMENT_COMPOSER_MODE,
+            settings.ENHANCEMENT_STRATEGY,
+        ])
+
+    def key(self, row: dict[str, Any]) -> str:
+        return content_hash([self._namespace, content_hash(row)])
+
+    def get_many(self, rows: list[dict[str, Any]]) -> list[dict[str, Any] | None]:
+        """Return the cached result for each row, aligned with `rows` (None on a miss)."""
+        keys = [self.key(row) for row in rows]
+        entries = dict(
+            EnhancementCacheEntry.objects
+            .filter(key__in=set(keys), created_at__gte=timezone.now() - timedelta(seconds=self.ttl))
+            .values_list("key", "data")
+        )
+
+        if entries:
+            EnhancementCacheEntry.objects.filter(key__in=entries.keys()).update(
+                hits=F("hits") + 1,
+                last_used_at=timezone.now(),
+            )
+
+        results = [entries.get(key) for key in keys]
+        hits = sum(1 for result in results if result is not None)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def set_many(self, rows: list[dict[str, Any]], enhanced_rows: list[dict[str, Any]]) -> None:
+        """Store `enhanced_rows[i]` as the result for `rows[i]`."""
+        now = timezone.now()
+        EnhancementCacheEntry.objects.bulk_create(
+            [
+                EnhancementCacheEntry(key=self.key(row), data=enhanced, created_at=now, last_used_at=now)
+                for row, enhanced in zip(rows, enhanced_rows)
+            ],
+            update_conflicts=True,
+            unique_fields=["key"],
+            update_fields=["data", "created_at", "last_used_at"],
+        )
+
+    @staticmethod
+    def evict(ttl: int | None = None, max_entries: int | None = None) -> int:
+        """Drop expired entries, then the least recently used ones beyond `max_entries`."""
+        ttl = settings.ENHANCEMENT_CACHE_TTL if ttl is None else ttl
+        max_entries = settings.ENHANCEMENT_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+
+        deleted, _ = EnhancementCacheEntry.objects.filter(
+            created_at__lt=timezone.now() - timedelta(seconds=ttl)
+        ).delete()
+
+        overflow = EnhancementCacheEntry.objects.count() - max_entries
+        if overflow > 0:
+            stale_ids = list(
+                EnhancementCacheEntry.objects.order_by("last_used_at").values_list("id", flat=True)[:overflow]
+            )
+            deleted += EnhancementCacheEntry.objects.filter(id__in=stale_ids).delete()[0]
+
+        return deleted
+
+    def stats(self) -> dict[str, int]:
+        return {"cache_hits": self.hits, "cache_misses": self.misses}
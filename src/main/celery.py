@@ -1,6 +1,7 @@
 import os
 
 from celery import Celery
+from celery.signals import worker_process_init
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
@@ -22,3 +23,18 @@ def debug_task(self):
     print(f'Request: {self.request!r}')
 
 
+@worker_process_init.connect
+def init_worker_runtime(**kwargs):
+    """Warm up the graph runtime once per worker process, right after fork."""
+    from django.db import connection
+    from graph.runtime import runtime
+
+    # Anything pooled before the fork (e.g. gRPC channels) must not be shared with the parent
+    runtime.reset()
+    try:
+        warmup_seconds = runtime.warm_up()
+        connection.ensure_connection()
+        print(f"Worker {os.getpid()} runtime warm-up took {warmup_seconds:.2f}s")
+    except Exception as e:
+        # Resources are created lazily on first use, so a failed warm-up only costs latency
+        print(f"Worker {os.getpid()} runtime warm-up failed: {e}")
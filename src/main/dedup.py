@@ -0,0 +1,215 @@
+import difflib
+import re
+from collections import deque
+from typing import Any
+
+from graph.columns import column_plan
+
+# Legal-form words dropped from key values, so "ACME, Inc." and "Acme" are the same entity
+ENTITY_SUFFIXES = {
+    "ag", "co", "company", "corp", "corporation", "gmbh", "inc", "incorporated",
+    "limited", "llc", "ltd", "plc", "sa", "srl",
+}
+
+# Fuzzy matching only compares keys sharing their first BLOCK_PREFIX characters, and at most
+# MAX_BLOCK_SIZE of those (the most recent), so every row costs a bounded number of comparisons
+BLOCK_PREFIX = 3
+MAX_BLOCK_SIZE = 200
+
+
+def normalise_key(value: Any) -> str:
+    """Lowercase a key value and drop its punctuation, extra whitespace and legal-form words."""
+    words = re.sub(r"[^\w\s]", " ", str(value).lower()).split()
+    return " ".join(word for word in words if word not in ENTITY_SUFFIXES) or " ".join(words)
+
+
+def entity_key(row: dict[str, Any], key_fields: list[str]) -> str:
+    """The normalised key values of a row joined in `key_fields` order, or "" when it has none."""
+    values = [normalise_key(row[name]) for name in key_fields if row.get(name) not in (None, "")]
+    return " | ".join(values) if any(values) else ""
+
+
+class EntityIndex:
+    """Groups rows into entities by their key fields as they stream by, holding one key per entity.
+
+    The first row of each group represents it. Keys match exactly after
+    normalisation; with a `fuzzy_threshold` below 1, a key also matches the most
+    similar earlier representative (difflib ratio) among the last `max_block_size`
+    ones starting with the same `BLOCK_PREFIX` characters. The pass is therefore
+    linear in the number of rows, and a near-duplicate whose first characters
+    differ, or whose block has moved on, becomes an entity of its own.
+    """
+
+    def __init__(self, key_fields: list[str], fuzzy_threshold: float = 1.0, max_block_size: int = MAX_BLOCK_SIZE):
+        self.key_fields = key_fields
+        self.fuzzy_threshold = fuzzy_threshold
+        self.max_block_size = max_block_size
+        self.representatives = {}
+        self.blocks: dict[str, deque[str]] = {}
+
+    def add(self, i: int, row: dict[str, Any]) -> int | None:
+        """Add the row at index `i`; returns its representative's index when it joins an earlier group."""
+        key = entity_key(row, self.key_fields)
+        if not key:
+            return None
+        if key not in self.representatives and self.fuzzy_threshold < 1:
+            match = difflib.get_close_matches(key, self.blocks.get(key[:BLOCK_PREFIX], ()), n=1, cutoff=self.fuzzy_threshold)
+            if match:
+                self.representatives[key] = self.representatives[match[0]]
+        if key in self.representatives:
+            return self.representatives[key]
+        self.representatives[key] = i
+        self.blocks.setdefault(key[:BLOCK_PREFIX], deque(maxlen=self.max_block_size)).append(key)
+        return None
+
+
+def find_duplicates(
+    rows: list[dict[str, Any]],
+    indexes: list[int],
+    key_fields: list[str],
+    fuzzy_threshold: float = 1.0,
+) -> dict[int, int]:
+    """Group the rows at `indexes` into entities by their key fields (see `EntityIndex`).
+
+    Returns:
+        The representative's index for every other member of a group
+    """
+    index = EntityIndex(key_fields, fuzzy_threshold)
+    duplicates = {}
+    for i in indexes:
+        representative = index.add(i, rows[i])
+        if representative is not None:
+            duplicates[i] = representative
+    return duplicates
+
+
+def enrichment_fields(rows: list[dict[str, Any]], indexes: list[int], schema_dict: dict[str, Any]) -> list[str]:
+    """The schema fields that none of the rows at `indexes` has a value for, i.e. the ones enhancement produces."""
+    filled = filled_fields(rows, indexes)
+    return [name for name in schema_dict if name not in filled]
+
+
+def filled_fields(rows: list[dict[str, Any]], indexes: list[int]) -> set[str]:
+    """The fields any of the rows at `indexes` has a value for."""
+    return {name for i in indexes for name, value in rows[i].items() if value not in (None, "")}
+
+
+def groupable_rows(
+    cleaned_rows: list[dict[str, Any]],
+    indexes: list[int],
+    schema_dict: dict[str, Any],
+    fields: list[str],
+) -> list[int]:
+    """The rows at `indexes` whose every schema field but the enrichment `fields` is present and valid."""
+    _, missing = column_plan([cleaned_rows[i] for i in indexes], schema_dict)
+    incomplete = {indexes[position] for name, positions in missing.items() if name not in fields for position in positions}
+    return [i for i in indexes if i not in incomplete]
+
+
+def deduplicate(
+    cleaned_rows: list[dict[str, Any]],
+    indexes: list[int],
+    schema_dict: dict[str, Any],
+    key_fields: list[str],
+    fuzzy_threshold: float = 1.0,
+) -> tuple[dict[int, int], list[str]]:
+    """Find the group members among the rows at `indexes` and the fields they take from their representative.
+
+    Only rows whose every other schema field is present and valid are grouped;
+    the rest go through the graph on their own, which repairs their values.
+
+    Returns:
+        The representative's index for every member, and the enrichment fields
+    """
+    fields = enrichment_fields(cleaned_rows, indexes, schema_dict)
+    complete = groupable_rows(cleaned_rows, indexes, schema_dict, fields)
+    return find_duplicates(cleaned_rows, complete, key_fields, fuzzy_threshold), fields
+
+
+def member_placeholders(cleaned_rows: list[dict[str, Any]], schema_dict: dict[str, Any]) -> list[dict[str, Any]]:
+    """The output rows of group members before fan-out: their own valid values, None elsewhere."""
+    records, _ = column_plan(cleaned_rows, schema_dict)
+    return records
+
+
+def mark_duplicates(cleaned_rows, resolved_rows, schema_dict, duplicates):
+    """Resolve the group members among the unresolved rows to their placeholders (in place), so the graph skips them.
+
+    Args:
+        duplicates: Positions of members in `cleaned_rows`
+    """
+    members = [i for i in duplicates if resolved_rows[i] is None]
+    for i, placeholder in zip(members, member_placeholders([cleaned_rows[i] for i in members], schema_dict)):
+        resolved_rows[i] = placeholder
+
+
+class DuplicateFanOut:
+    """Fills group members in from their representative's enhanced row while the job's rows stream by in order.
+
+    Only the enrichment fields are copied; every other field keeps the member's
+    own cleaned value. Representatives always come first, so one pass suffices;
+    a member whose representative's chunk did not complete is left out, like the
+    rows of failed chunks, until the job is resumed.
+    """
+
+    def __init__(self, chunk_duplicates, fields: list[str]):
+        """
+        Args:
+            chunk_duplicates: `EnhancedDataChunk.duplicates` of every chunk of the job
+            fields: `EnhancedData.dedup_fields`, the fields taken from the representative
+        """
+        self.fields = fields
+        self.representative_indexes = {rep for duplicates in chunk_duplicates for rep in duplicates.values()}
+        self.representatives = {}
+
+    def apply(self, start_row: int, chunk_rows: list, duplicates: dict[str, int]):
+        """Yield the positions in the chunk and rows of a completed chunk, with its members filled in."""
+        for offset, row in enumerate(chunk_rows):
+            if start_row + offset in self.representative_indexes:
+                self.representatives[start_row + offset] = row
+            representative = duplicates.get(str(offset))
+            if representative is None:
+                yield offset, row
+            elif representative in self.representatives:
+                enhanced = self.representatives[representative]
+                yield offset, {**row, **{name: enhanced.get(name) for name in self.fields}}
+
+
+class StreamingDeduplicator:
+    """`deduplicate` and `mark_duplicates` for a job's rows read one batch at a time.
+
+    The enrichment fields must be known up front (a first pass over the rows);
+    the `EntityIndex` holds one key per entity seen so far.
+    """
+
+    def __init__(self, schema_dict: dict[str, Any], fields: list[str], key_fields: list[str], fuzzy_threshold: float = 1.0):
+        self.schema = schema_dict
+        self.fields = fields
+        self.index = EntityIndex(key_fields, fuzzy_threshold)
+        self.pending = 0
+        self.members = 0
+
+    def apply(self, start: int, cleaned_rows, resolved_rows, carried_rows) -> dict[int, int]:
+        """Group the pending rows of a batch starting at row `start`, resolving members to their placeholders (in place).
+
+        Returns:
+            The representative's row index for each member, by row index
+        """
+        # Rows carrying copied-forward values are already cheap, and their values must not be fanned out
+        pending = [i for i, (resolved, carried) in enumerate(zip(resolved_rows, carried_rows)) if resolved is None and carried is None]
+        self.pending += len(pending)
+        duplicates = {}
+        for i in groupable_rows(cleaned_rows, pending, self.schema, self.fields):
+            representative = self.index.add(start + i, cleaned_rows[i])
+            if representative is not None:
+                duplicates[i] = representative
+        mark_duplicates(cleaned_rows, resolved_rows, self.schema, list(duplicates))
+        self.members += len(duplicates)
+        return {start + i: representative for i, representative in duplicates.items()}
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rows_deduplicated": self.members,
+            # Share of the rows needing the graph that were filled in from another row instead
+            "dedup_ratio": round(self.members / self.pending, 4) if self.pending else 0,
+        }
@@ -0,0 +1,77 @@
+import json
+import time
+from typing import Any, Iterator
+
+from graph.runtime import runtime
+
+TERMINAL_STATUSES = ("complete", "failed")
+
+
+def job_channel(enhanced_data_id: int) -> str:
+    return f"enhanced-data:{enhanced_data_id}:events"
+
+
+def job_snapshot(enhanced_data_obj) -> dict[str, Any]:
+    return {
+        "id": enhanced_data_obj.id,
+        "status": enhanced_data_obj.status,
+        "total_chunks": enhanced_data_obj.total_chunks,
+        "chunks_done": enhanced_data_obj.chunks_done,
+        "chunks_failed": enhanced_data_obj.chunks_failed,
+    }
+
+
+def publish_job_event(enhanced_data_id: int, event: str, payload: dict[str, Any]) -> None:
+    """Publish a job event over Redis pub/sub; events are best effort and never fail a task."""
+    try:
+        runtime.get_redis().publish(
+            job_channel(enhanced_data_id),
+            json.dumps({"event": event, **payload}, default=str),
+        )
+    except Exception as e:
+        print(f"Could not publish {event} event for job {enhanced_data_id}: {e}")
+
+
+def publish_job_progress(enhanced_data_id: int, event: str, **extra: Any) -> None:
+    """Publish the job's current status and progress counters."""
+    from models.enhanced_data import EnhancedData
+
+    enhanced_data_obj = EnhancedData.objects.filter(id=enhanced_data_id).only(
+        "id", "status", "total_chunks", "chunks_done", "chunks_failed"
+    ).first()
+    if enhanced_data_obj is not None:
+        publish_job_event(enhanced_data_id, event, {**job_snapshot(enhanced_data_obj), **extra})
+
+
+def format_sse(event: str, payload: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+
+def stream_job_events(enhanced_data_obj, heartbeat_seconds: float = 15, max_seconds: float = 600) -> Iterator[str]:
+    """Yield server-sent events for a job until it completes, fails or `max_seconds` pass.
+
+    The first event is a snapshot of the job's current state, so clients that
+    connect (or reconnect) late never miss the final status.
+    """
+    pubsub = runtime.get_redis().pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(job_channel(enhanced_data_obj.id))
+    try:
+        # Subscribe before taking the snapshot so no event can slip in between
+        enhanced_data_obj.refresh_from_db(fields=["status", "total_chunks", "chunks_done", "chunks_failed"])
+        yield format_sse("status", job_snapshot(enhanced_data_obj))
+        if enhanced_data_obj.status in TERMINAL_STATUSES:
+            return
+
+        deadline = time.monotonic() + max_seconds
+        while time.monotonic() < deadline:
+            message = pubsub.get_message(timeout=heartbeat_seconds)
+            if message is None:
+                yield ": keep-alive\n\n"
+                continue
+
+            payload = json.loads(message["data"])
+            yield format_sse(payload.pop("event", "message"), payload)
+            if payload.get("status") in TERMINAL_STATUSES:
+                return
+    finally:
+        pubsub.close()
@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+import typing
+from itertools import islice
+from typing import Any, Iterable, Iterator
+
+from graph.schema_registry import field_type
+from graph.preclean import CoercionError, field_coercer
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_columns(schema: dict[str, Any] | None, first_row: dict[str, Any] | None) -> list[str]:
+    """Columns of an export: the schema's fields, or the first row's keys without a schema."""
+    if schema:
+        return list(schema)
+    return list(first_row or {})
+
+
+def _batches(rows: Iterable[dict[str, Any]], batch_size: int) -> Iterator[list[dict[str, Any]]]:
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def iter_csv(rows: Iterable[dict[str, Any]], columns: list[str], batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """Serialise rows as CSV with a header line, yielding one chunk of text per batch of rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in _batches(rows, batch_size):
+        writer.writerows([_csv_value(row.get(column)) for column in columns] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header only, for a dataset without rows
+        yield buffer.getvalue()
+
+
+def iter_jsonl(rows: Iterable[dict[str, Any]], batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """Serialise rows as JSON Lines, yielding one chunk of text per batch of rows."""
+    for batch in _batches(rows, batch_size):
+        yield "".join(json.dumps(row, default=str) + "\n" for row in batch)
+
+
+class _ParquetSink(io.RawIOBase):
+    """Write-only file that keeps what was written until it is drained into the response."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_column(pa, spec: Any):
+    python_type = field_type(spec)
+    args = [arg for arg in typing.get_args(python_type) if arg is not type(None)]
+    python_type = args[0] if args else python_type
+    return {int: pa.int64(), float: pa.float64(), bool: pa.bool_()}.get(python_type, pa.string())
+
+
+def _arrow_value(coerce, is_string: bool, value: Any) -> Any:
+    if value is None or value == "":
+        return None
+    if is_string:
+        return json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+    try:
+        return coerce(value)
+    except (CoercionError, ValueError):
+        # Typed columns hold nulls for values the model got wrong
+        return None
+
+
+def iter_parquet(
+    rows: Iterable[dict[str, Any]],
+    schema: dict[str, Any] | None,
+    columns: list[str],
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """Serialise rows as Parquet, one row group per batch of rows.
+
+    Columns are typed from the schema (int, float, bool, otherwise string).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Field specs are type strings or {"type", "description"} dicts; columns outside the schema are strings
+    specs = {column: (schema or {}).get(column, "str") for column in columns}
+    arrow_schema = pa.schema([(column, _arrow_column(pa, spec)) for column, spec in specs.items()])
+    converters = [
+        (column, field_coercer(spec), arrow_schema.field(column).type == pa.string())
+        for column, spec in specs.items()
+    ]
+
+    sink = _ParquetSink()
+    with pq.ParquetWriter(sink, arrow_schema) as writer:
+        for batch in _batches(rows, batch_size):
+            writer.write_table(pa.table(
+                {column: [_arrow_value(coerce, is_string, row.get(column)) for row in batch] for column, coerce, is_string in converters},
+                schema=arrow_schema,
+            ))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def stream_export(rows: Iterator[dict[str, Any]], schema: dict[str, Any] | None, export_format: str) -> Iterator[str | bytes]:
+    """Serialise streamed rows in `export_format` ('csv', 'jsonl' or 'parquet') without holding them all."""
+    if export_format == "jsonl":
+        return iter_jsonl(rows)
+
+    first = list(islice(rows, 1))
+    columns = export_columns(schema, first[0] if first else None)
+    rows = (row for batch in (first, rows) for row in batch)
+    if export_format == "parquet":
+        return iter_parquet(rows, schema, columns)
+    return iter_csv(rows, columns)
@@ -0,0 +1,89 @@
+from typing import Any
+
+from graph.schema_registry import schema_fingerprint
+from graph.utils import content_hash
+
+# Rows looked up in the previous job per query
+LOOKUP_BATCH_SIZE = 1000
+
+
+def schema_diff(previous: dict[str, Any], current: dict[str, Any]) -> dict[str, list[str]]:
+    """Compare two target schemas field by field.
+
+    Returns:
+        The current schema's fields split into "kept" (same type and description as
+        before) and "new" (added, or changed since), and the "removed" fields
+    """
+    kept, new = [], []
+    for name, spec in current.items():
+        unchanged = name in previous and schema_fingerprint({name: previous[name]}) == schema_fingerprint({name: spec})
+        (kept if unchanged else new).append(name)
+    return {"kept": kept, "new": new, "removed": [name for name in previous if name not in current]}
+
+
+def restore_kept_fields(enhanced_rows: list[dict[str, Any]], carried_rows: list[dict[str, Any] | None]) -> list[dict[str, Any]]:
+    """Put the copied-forward values back over the graph's output, so only new fields come from the LLM."""
+    return [{**row, **carried} if carried else row for row, carried in zip(enhanced_rows, carried_rows)]
+
+
+class IncrementalPlan:
+    """Copies a previous job's results forward for rows whose original content did not change.
+
+    Rows are matched on the content hash of the original row they were enhanced
+    from. A matched row is resolved outright when the schema gained no fields;
+    otherwise it is sent to the graph with its kept fields already filled in,
+    and those values are restored over the graph's output.
+    """
+
+    def __init__(self, previous_enhanced_data, schema_dict: dict[str, Any]):
+        self.previous = previous_enhanced_data
+        self.schema = schema_dict
+        diff = schema_diff(previous_enhanced_data.schema or {}, schema_dict)
+        self.kept_fields = diff["kept"]
+        self.new_fields = diff["new"]
+        self.copied = 0
+        self.new_fields_only = 0
+
+    @classmethod
+    def for_job(cls, enhanced_data) -> "IncrementalPlan | None":
+        """The plan of an incremental job, or None for a full run."""
+        if enhanced_data.previous_enhanced_data is None:
+            return None
+        return cls(enhanced_data.previous_enhanced_data, enhanced_data.schema)
+
+    def previous_rows(self, rows: list[dict[str, Any]]) -> list[dict[str, Any] | None]:
+        """The previous job's result for each original row, aligned with `rows` (None when the row is new or changed)."""
+        hashes = [content_hash(row) for row in rows]
+        found = dict(self.previous.rows.filter(source_hash__in=set(hashes)).values_list("source_hash", "payload"))
+        return [found.get(row_hash) for row_hash in hashes]
+
+    def apply(
+        self,
+        rows: list[dict[str, Any]],
+        cleaned_rows: list[dict[str, Any]],
+        resolved_rows: list[dict[str, Any] | None],
+    ) -> list[dict[str, Any] | None]:
+        """Resolve, or pre-fill with their kept fields, the unresolved rows found in the previous job (in place).
+
+        Returns:
+            The kept field values of each row that still needs the graph for its new fields (None for other rows)
+        """
+        carried_rows = [None] * len(rows)
+        pending = [i for i, resolved in enumerate(resolved_rows) if resolved is None]
+        for batch_start in range(0, len(pending), LOOKUP_BATCH_SIZE):
+            batch = pending[batch_start:batch_start + LOOKUP_BATCH_SIZE]
+            for i, previous in zip(batch, self.previous_rows([rows[i] for i in batch])):
+                if previous is None:
+                    continue
+                carried = {name: previous[name] for name in self.kept_fields if name in previous}
+                if not self.new_fields:
+                    resolved_rows[i] = {name: carried.get(name) for name in self.schema}
+                    self.copied += 1
+                else:
+                    cleaned_rows[i] = {**cleaned_rows[i], **carried}
+                    carried_rows[i] = carried
+                    self.new_fields_only += 1
+        return carried_rows
+
+    def stats(self) -> dict[str, int]:
+        return {"rows_copied": self.copied, "rows_new_fields_only": self.new_fields_only}
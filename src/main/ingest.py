@@ -0,0 +1,205 @@
+import codecs
+import csv
+import io
+import json
+import time
+from itertools import chain, islice
+from typing import IO, Any, Iterable, Iterator
+
+FILE_TYPES = ("csv", "json", "jsonl")
+SCHEMA_SAMPLE_SIZE = 1000
+READ_SIZE = 64 * 1024
+
+_EXTENSIONS = {"csv": "csv", "json": "json", "jsonl": "jsonl", "ndjson": "jsonl"}
+_JSON_WHITESPACE = " \t\n\r"
+# Longest tail of a value cut off by the end of a read that still fails to decode, e.g. "\u00e"
+_JSON_CUT_OFF_TAIL = 6
+
+
+class IngestError(ValueError):
+    pass
+
+
+def detect_file_type(filename: str) -> str:
+    """Map an upload's file extension to one of `FILE_TYPES`."""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension not in _EXTENSIONS:
+        raise IngestError("Unsupported file type. Please upload a CSV, JSON or JSONL file.")
+    return _EXTENSIONS[extension]
+
+
+def to_cell(value: Any) -> str:
+    """Store a value the way the upload form does: strings, with nested values as JSON."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def iter_csv_rows(file: IO[bytes]) -> Iterator[dict[str, str]]:
+    """Stream the rows of a CSV file with a header line."""
+    reader = csv.reader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [name.strip() or f"column_{i + 1}" for i, name in enumerate(header)]
+    for line in reader:
+        if not any(cell.strip() for cell in line):
+            continue
+        if len(line) > len(header):
+            raise IngestError(f"CSV line {reader.line_num} has {len(line)} values but the header has {len(header)}")
+        yield {name: cell.strip() for name, cell in zip(header, chain(line, [""] * len(header)))}
+
+
+def iter_json_values(file: IO[bytes], read_size: int = READ_SIZE) -> Iterator[Any]:
+    """Stream the items of a top-level JSON array, or a sequence of JSON values (JSONL).
+
+    Only the current value and one read of look-ahead are held in memory, so
+    the file size does not matter, only the size of the largest row.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    pos = 0
+    eof = False
+    in_array = None
+    expect_separator = False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        data = file.read(read_size)
+        eof = not data
+        buffer = buffer[pos:] + text_decoder.decode(data, final=eof)
+        pos = 0
+        return not eof
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in _JSON_WHITESPACE:
+            pos += 1
+        if pos == len(buffer):
+            if fill():
+                continue
+            if in_array:
+                raise IngestError("JSON array is not closed")
+            return
+
+        char = buffer[pos]
+        if in_array is None:
+            in_array = char == "["
+            if in_array:
+                pos += 1
+                continue
+        if in_array and char == "]":
+            return
+        if in_array and expect_separator:
+            if char != ",":
+                raise IngestError(f"Expected ',' or ']' in JSON array, found {char!r}")
+            pos += 1
+            expect_separator = False
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            # A value cut off by the end of the read continues in the next one; any other error is final
+            cut_off = e.msg.startswith("Unterminated string") or len(buffer) - e.pos <= _JSON_CUT_OFF_TAIL
+            if cut_off and fill():
+                continue
+            raise IngestError(f"Invalid JSON: {e.msg}") from e
+        if end == len(buffer) and not eof:
+            # A number at the end of the buffer may have more digits to come
+            fill()
+            continue
+        pos = end
+        expect_separator = True
+        yield value
+
+
+def iter_json_rows(file: IO[bytes], read_size: int = READ_SIZE) -> Iterator[dict[str, str]]:
+    for value in iter_json_values(file, read_size):
+        if not isinstance(value, dict):
+            raise IngestError("JSON data must be an array of objects")
+        yield {key: to_cell(item) for key, item in value.items()}
+
+
+def iter_upload_rows(file: IO[bytes], file_type: str) -> Iterator[dict[str, str]]:
+    """Stream the rows of an uploaded `file_type` file as string-valued objects."""
+    if file_type == "csv":
+        return iter_csv_rows(file)
+    return iter_json_rows(file)
+
+
+def _cell_type(value: str) -> str | None:
+    if value == "":
+        return None
+    if value.lower() in ("true", "false"):
+        return "bool"
+    try:
+        int(value)
+        return "int"
+    except ValueError:
+        pass
+    try:
+        float(value)
+        return "float"
+    except ValueError:
+        return "str"
+
+
+def infer_schema(rows: Iterable[dict[str, str]]) -> dict[str, str]:
+    """Infer a column -> type ('int', 'float', 'bool' or 'str') schema from sample rows.
+
+    Follows the upload form's rules: a column of ints stays "int" unless a
+    float appears, empty values are ignored and mixed columns become "str".
+    """
+    column_types: dict[str, set[str]] = {}
+    for row in rows:
+        for key, value in row.items():
+            types = column_types.setdefault(key, set())
+            cell_type = _cell_type(value)
+            if cell_type is not None:
+                types.add(cell_type)
+
+    schema = {}
+    for key, types in column_types.items():
+        if types == {"int"}:
+            schema[key] = "int"
+        elif types == {"float"} or types == {"int", "float"}:
+            schema[key] = "float"
+        elif types == {"bool"}:
+            schema[key] = "bool"
+        else:
+            schema[key] = "str"
+    return schema
+
+
+def ingest_rows(original_data, rows: Iterator[dict[str, str]], schema: dict[str, str] | None = None, sample_size: int = SCHEMA_SAMPLE_SIZE) -> dict[str, Any]:
+    """Write streamed `rows` into an empty `original_data` in bulk batches.
+
+    The schema is inferred from the first `sample_size` rows unless given.
+
+    Returns:
+        The row count, the schema and the ingestion throughput.
+    """
+    started = time.perf_counter()
+    sample = list(islice(rows, sample_size))
+    if schema is None:
+        schema = infer_schema(sample)
+
+    row_count = original_data.append_rows(chain(sample, rows), 0)
+    original_data.row_count = row_count
+    original_data.schema = schema
+    original_data.save(update_fields=["row_count", "schema", "updated_at"])
+
+    seconds = time.perf_counter() - started
+    rows_per_second = round(row_count / seconds, 1) if seconds else float(row_count)
+    print(f"Ingested {row_count} rows into OriginalData {original_data.id} in {seconds:.2f}s ({rows_per_second} rows/s)")
+    return {
+        "row_count": row_count,
+        "schema": schema,
+        "seconds": round(seconds, 3),
+        "rows_per_second": rows_per_second,
+    }
@@ -0,0 +1,110 @@
+import json
+import platform
+import sys
+import tempfile
+from contextlib import ExitStack, redirect_stdout
+from datetime import datetime, timezone
+from itertools import product
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from main.benchmark import ReplayResponses, run_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the enhancement pipeline offline: the LLMs and web search are replaced by deterministic "
+        "local stand-ins and synthetic datasets run through process_enhancement_coordinator and the chunk tasks. "
+        "Runs in a throwaway test database and writes a JSON report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000], help="Dataset sizes in rows")
+        parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[10, 50], help="Maximum rows per chunk")
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8], help="Chunks in flight at once")
+        parser.add_argument("--modes", nargs="+", choices=["prefork", "async"], default=["prefork"], help="ENHANCEMENT_EXECUTION_MODE values")
+        parser.add_argument("--routing-modes", nargs="+", choices=["llm", "rules"], default=["llm"], help="ENHANCEMENT_ROUTING_MODE values")
+        parser.add_argument("--composer-modes", nargs="+", choices=["llm", "parse"], default=["llm"], help="ENHANCEMENT_COMPOSER_MODE values")
+        parser.add_argument("--strategies", nargs="+", choices=["rows", "columns"], default=["rows"], help="ENHANCEMENT_STRATEGY values")
+        parser.add_argument("--column-batch-size", type=int, default=200, help="Maximum rows per chunk under the columns strategy")
+        parser.add_argument("--dedup", nargs="+", choices=["off", "on"], default=["off"], help="Entity deduplication by company name and country")
+        parser.add_argument("--entity-repeats", type=int, default=1, help="Rows per company in the synthetic datasets")
+        parser.add_argument("--latency", type=float, default=0.05, help="Seconds per fake LLM call")
+        parser.add_argument("--search-latency", type=float, default=0.02, help="Seconds per fake search")
+        parser.add_argument("--completion-tokens", type=int, default=None, help="Output tokens recorded per LLM call (default: estimated from the response)")
+        parser.add_argument("--approval-rate", type=float, default=1.0, help="Share of reviews the fake reviewer approves")
+        parser.add_argument("--max-reviews", type=int, default=2, help="Reviews after which the fake supervisor composes regardless")
+        parser.add_argument("--responses", help="JSON file of recorded responses per node to replay")
+        parser.add_argument("--output", help="Write the report to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        if not 0 <= options["approval_rate"] <= 1:
+            raise CommandError("--approval-rate must be between 0 and 1")
+        replay = ReplayResponses.from_file(options["responses"])
+
+        old_name = connection.settings_dict["NAME"]
+        with ExitStack() as stack:
+            test_settings = connection.settings_dict.setdefault("TEST", {})
+            if connection.vendor == "sqlite" and not test_settings.get("NAME"):
+                # The default shared-cache in-memory database fails concurrent writes from the worker threads
+                # with "database table is locked" instead of waiting; a database file waits for the lock
+                test_settings["NAME"] = f"{stack.enter_context(tempfile.TemporaryDirectory())}/benchmark.sqlite3"
+                stack.callback(test_settings.pop, "NAME")
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                # The pipeline logs with print(); keep stdout for the report
+                with redirect_stdout(sys.stderr):
+                    runs = self.run_all(options, replay)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "config": {
+                key: options[key]
+                for key in ("column_batch_size", "entity_repeats", "latency", "search_latency", "completion_tokens", "approval_rate", "max_reviews", "responses")
+            },
+            "runs": runs,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+    def run_all(self, options, replay):
+        runs = []
+        combinations = list(product(
+            options["sizes"], options["chunk_sizes"], options["concurrency"],
+            options["modes"], options["routing_modes"], options["composer_modes"], options["strategies"], options["dedup"],
+        ))
+        for run_index, (size, chunk_size, concurrency, mode, routing, composer, strategy, dedup) in enumerate(combinations):
+            result = run_benchmark(
+                size,
+                chunk_size,
+                concurrency,
+                mode,
+                routing=routing,
+                composer=composer,
+                strategy=strategy,
+                column_batch_size=options["column_batch_size"],
+                dedup=dedup == "on",
+                entity_repeats=options["entity_repeats"],
+                salt=f"{run_index}-",
+                latency=options["latency"],
+                search_latency=options["search_latency"],
+                completion_tokens=options["completion_tokens"],
+                approval_rate=options["approval_rate"],
+                max_reviews=options["max_reviews"],
+                replay=replay,
+            )
+            runs.append(result)
+            self.stderr.write(
+                f"[{run_index + 1}/{len(combinations)}] {size} rows, chunks of {chunk_size}, concurrency {concurrency} ({mode}, {routing} routing, {composer} composer, {strategy} strategy, dedup {dedup}): "
+                f"{result['rows_per_second']} rows/s, {result['llm_calls']} LLM calls, status {result['status']}"
+            )
+        return runs
@@ -0,0 +1,86 @@
+from typing import Any
+
+from graph.instrumentation import NODE_COUNTERS, TOOL_COUNTERS
+from graph.runtime import runtime
+
+# Cluster-wide counters since the Redis instance started, fed by every chunk run
+TOTALS_KEY = "enhancement-metrics:totals"
+
+# (metric name, help) per counter, for the Prometheus exposition
+NODE_METRICS = {
+    "runs": ("demas_node_runs_total", "Graph node runs"),
+    "seconds": ("demas_node_seconds_total", "Wall time spent in graph nodes"),
+    "errors": ("demas_node_errors_total", "Graph node runs that raised"),
+    "llm_calls": ("demas_llm_calls_total", "LLM requests"),
+    "llm_seconds": ("demas_llm_seconds_total", "Wall time spent in LLM requests, including rate limiting and retries"),
+    "prompt_tokens": ("demas_llm_prompt_tokens_total", "LLM input tokens (provider-reported, else estimated)"),
+    "completion_tokens": ("demas_llm_completion_tokens_total", "LLM output tokens (provider-reported, else estimated)"),
+    "retries": ("demas_llm_retries_total", "LLM requests retried after a rate limit error"),
+}
+TOOL_METRICS = {
+    "calls": ("demas_tool_calls_total", "Tool calls"),
+    "seconds": ("demas_tool_seconds_total", "Wall time spent in tool calls"),
+    "errors": ("demas_tool_errors_total", "Tool calls that raised"),
+    "cache_hits": ("demas_tool_cache_hits_total", "Tool calls served from the cache"),
+}
+
+
+def record_metric_totals(metrics: dict[str, Any]) -> None:
+    """Add a chunk run's metrics to the cluster-wide counters; best effort, never fails a task."""
+    try:
+        pipeline = runtime.get_redis().pipeline()
+        for section in ("nodes", "tools"):
+            for name, counters in metrics.get(section, {}).items():
+                for counter, value in counters.items():
+                    if value:
+                        pipeline.hincrbyfloat(TOTALS_KEY, f"{section}:{name}:{counter}", value)
+        pipeline.execute()
+    except Exception as e:
+        print(f"Could not record metric totals: {e}")
+
+
+def read_metric_totals() -> dict[str, dict[str, dict[str, float]]]:
+    """Cluster-wide counters in the shape of `ChunkMetrics.as_dict()`."""
+    totals = {"nodes": {}, "tools": {}}
+    for field, value in runtime.get_redis().hgetall(TOTALS_KEY).items():
+        field = field.decode() if isinstance(field, bytes) else field
+        section, name, counter = field.split(":", 2)
+        if section in totals:
+            totals[section].setdefault(name, {})[counter] = float(value)
+    return totals
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_prometheus(totals: dict[str, Any], job_counts: dict[str, int]) -> str:
+    """Render the counters and job gauges in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+
+    def family(metric, help_text, metric_type, samples):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+            lines.append(f"{metric}{{{label_text}}} {_format_value(value)}")
+
+    for section, label, counters, metrics in (
+        ("nodes", "node", NODE_COUNTERS, NODE_METRICS),
+        ("tools", "tool", TOOL_COUNTERS, TOOL_METRICS),
+    ):
+        entries = totals.get(section, {})
+        for counter in counters:
+            metric, help_text = metrics[counter]
+            family(metric, help_text, "counter", [
+                ({label: name}, entry.get(counter, 0)) for name, entry in sorted(entries.items())
+            ])
+
+    family("demas_jobs", "Enhancement jobs by status", "gauge", [
+        ({"status": job_status}, count) for job_status, count in sorted(job_counts.items())
+    ])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0003_originaldata_schema'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnhancementCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='Hash of row content, schema fingerprint, model names and prompt version', max_length=64, unique=True)),
+                ('data', models.JSONField(help_text='Enhanced row produced for the cached input row')),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='enhanceddata',
+            name='stats',
+            field=models.JSONField(blank=True, default=dict, help_text='Job statistics such as cache hits and misses'),
+        ),
+    ]
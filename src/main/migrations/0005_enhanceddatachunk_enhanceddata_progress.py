@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0004_enhancementcacheentry_enhanceddata_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enhanceddata',
+            name='chunks_done',
+            field=models.PositiveIntegerField(default=0, help_text='Number of successfully enhanced chunks'),
+        ),
+        migrations.AddField(
+            model_name='enhanceddata',
+            name='chunks_failed',
+            field=models.PositiveIntegerField(default=0, help_text='Number of chunks that failed'),
+        ),
+        migrations.AddField(
+            model_name='enhanceddata',
+            name='total_chunks',
+            field=models.PositiveIntegerField(default=0, help_text='Number of chunks the data was split into'),
+        ),
+        migrations.CreateModel(
+            name='EnhancedDataChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chunk_index', models.PositiveIntegerField(help_text='Position of the chunk in the dataset')),
+                ('start_row', models.PositiveIntegerField(help_text='Index of the first original row in the chunk')),
+                ('end_row', models.PositiveIntegerField(help_text='Index after the last original row in the chunk')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('complete', 'Complete'), ('failed', 'Failed')], default='pending', help_text='Status of the chunk', max_length=20)),
+                ('data', models.JSONField(default=list, help_text='Array of objects representing the enhanced rows of the chunk')),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('enhanced_data', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='main.enhanceddata')),
+            ],
+            options={
+                'ordering': ['chunk_index'],
+                'constraints': [models.UniqueConstraint(fields=('enhanced_data', 'chunk_index'), name='unique_enhanced_data_chunk')],
+            },
+        ),
+    ]
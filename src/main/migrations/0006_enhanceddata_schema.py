@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_enhanceddatachunk_enhanceddata_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enhanceddata',
+            name='schema',
+            field=models.JSONField(blank=True, default=dict, help_text='Target output schema the data was enhanced with'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:19
+
+from django.db import migrations, models
+
+
+def fill_row_counts(apps, schema_editor):
+    for model_name in ("OriginalData", "EnhancedData"):
+        model = apps.get_model("main", model_name)
+        for obj in model.objects.only("id", "data").iterator():
+            row_count = len(obj.data) if isinstance(obj.data, list) else 0
+            model.objects.filter(id=obj.id).update(row_count=row_count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_enhanceddata_schema'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enhanceddata',
+            name='row_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of rows in data'),
+        ),
+        migrations.AddField(
+            model_name='originaldata',
+            name='row_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of rows in data'),
+        ),
+        migrations.AddIndex(
+            model_name='enhanceddata',
+            index=models.Index(fields=['-created_at', '-id'], name='enhanced_data_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enhanceddata',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='enhanced_data_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enhanceddata',
+            index=models.Index(fields=['original_data', '-created_at', '-id'], name='enhanced_data_original_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='originaldata',
+            index=models.Index(fields=['-created_at', '-id'], name='original_data_created_idx'),
+        ),
+        migrations.RunPython(fill_row_counts, migrations.RunPython.noop),
+    ]
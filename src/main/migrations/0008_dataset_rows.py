@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def copy_data_to_rows(apps, schema_editor):
+    from graph.utils import content_hash
+
+    for model_name in ("OriginalData", "EnhancedData"):
+        model = apps.get_model("main", model_name)
+        row_model = apps.get_model("main", f"{model_name}Row")
+        for obj in model.objects.only("id", "data").iterator():
+            rows = obj.data if isinstance(obj.data, list) else []
+            for start in range(0, len(rows), BATCH_SIZE):
+                row_model.objects.bulk_create([
+                    row_model(dataset_id=obj.id, row_index=start + i, payload=row, content_hash=content_hash(row))
+                    for i, row in enumerate(rows[start:start + BATCH_SIZE])
+                ])
+            model.objects.filter(id=obj.id).update(row_count=len(rows))
+
+
+def copy_rows_to_data(apps, schema_editor):
+    for model_name in ("OriginalData", "EnhancedData"):
+        model = apps.get_model("main", model_name)
+        row_model = apps.get_model("main", f"{model_name}Row")
+        for obj in model.objects.only("id").iterator():
+            rows = list(row_model.objects.filter(dataset_id=obj.id).order_by("row_index").values_list("payload", flat=True))
+            model.objects.filter(id=obj.id).update(data=rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_list_row_counts_and_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnhancedDataRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row_index', models.PositiveIntegerField(help_text='Position of the row in the dataset')),
+                ('payload', models.JSONField(help_text='The row, as an object')),
+                ('content_hash', models.CharField(db_index=True, help_text='Hash of the payload', max_length=64)),
+                ('dataset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='main.enhanceddata')),
+            ],
+            options={
+                'ordering': ['row_index'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('dataset', 'row_index'), name='unique_enhanced_data_row')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OriginalDataRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row_index', models.PositiveIntegerField(help_text='Position of the row in the dataset')),
+                ('payload', models.JSONField(help_text='The row, as an object')),
+                ('content_hash', models.CharField(db_index=True, help_text='Hash of the payload', max_length=64)),
+                ('dataset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='main.originaldata')),
+            ],
+            options={
+                'ordering': ['row_index'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('dataset', 'row_index'), name='unique_original_data_row')],
+            },
+        ),
+        migrations.AlterField(
+            model_name='enhanceddata',
+            name='row_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of rows'),
+        ),
+        migrations.AlterField(
+            model_name='originaldata',
+            name='row_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of rows'),
+        ),
+        migrations.RunPython(copy_data_to_rows, copy_rows_to_data),
+        migrations.RemoveField(
+            model_name='enhanceddata',
+            name='data',
+        ),
+        migrations.RemoveField(
+            model_name='originaldata',
+            name='data',
+        ),
+    ]
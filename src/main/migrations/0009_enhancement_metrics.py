@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_dataset_rows'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enhanceddata',
+            name='metrics',
+            field=models.JSONField(blank=True, default=dict, help_text='LLM calls, tokens, retries and wall time per graph node and tool, summed over the chunks'),
+        ),
+        migrations.AddField(
+            model_name='enhanceddatachunk',
+            name='metrics',
+            field=models.JSONField(blank=True, default=dict, help_text='LLM calls, tokens, retries and wall time per graph node and tool, over every run of the chunk'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:45
+
+from django.db import migrations, models
+
+
+def fingerprint_schemas(apps, schema_editor):
+    from graph.schema_registry import schema_fingerprint
+
+    for model_name in ("OriginalData", "EnhancedData"):
+        model = apps.get_model("main", model_name)
+        for obj in model.objects.only("id", "schema").iterator():
+            if obj.schema:
+                model.objects.filter(id=obj.id).update(schema_fingerprint=schema_fingerprint(obj.schema))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_enhancement_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enhanceddata',
+            name='schema_fingerprint',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Fingerprint of the schema, kept up to date on save', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='originaldata',
+            name='schema_fingerprint',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Fingerprint of the schema, kept up to date on save', max_length=64),
+        ),
+        migrations.RunPython(fingerprint_schemas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_schema_fingerprints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enhanceddata',
+            name='previous_enhanced_data',
+            field=models.ForeignKey(blank=True, help_text='Earlier job whose results for unchanged rows and fields were copied forward', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='incremental_runs', to='main.enhanceddata'),
+        ),
+        migrations.AddField(
+            model_name='enhanceddatarow',
+            name='source_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='Content hash of the original row this row was enhanced from, empty when unknown', max_length=64),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_incremental_enhancement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enhanceddatachunk',
+            name='duplicates',
+            field=models.JSONField(blank=True, default=dict, help_text="Positions in the chunk of rows filled in from their entity's representative, mapped to its row index"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_entity_deduplication'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enhanceddata',
+            name='dedup_fields',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text="Fields that deduplicated rows take from their entity's representative"),
+        ),
+    ]
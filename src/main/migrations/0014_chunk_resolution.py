@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_dedup_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enhanceddatachunk',
+            name='carried',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='In incremental jobs, the kept field values copied forward for each row that needs the graph for new fields only'),
+        ),
+        migrations.AddField(
+            model_name='enhanceddatachunk',
+            name='resolved',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text="Each row's output resolved before the graph (pre-clean, row cache, previous job or duplicate placeholder), null for rows the graph enhances"),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+ROW_RANGE_PARAMETERS = [
+    OpenApiParameter(name="offset", type=int, description="Index of the first row of `data` to return (default: 0)"),
+    OpenApiParameter(name="limit", type=int, description="Maximum number of rows of `data` to return (default: all)"),
+]
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Newest first; the cursor keeps every page O(page size) however many records exist."""
+
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+def row_range(request) -> slice:
+    """Slice of the rows selected by the `offset` and `limit` query parameters."""
+    bounds = {}
+    for name in ("offset", "limit"):
+        value = request.query_params.get(name)
+        if value is None:
+            bounds[name] = None
+            continue
+        try:
+            bounds[name] = int(value)
+        except ValueError:
+            raise ValidationError({name: "Must be an integer."})
+        if bounds[name] < 0:
+            raise ValidationError({name: "Must not be negative."})
+
+    start = bounds["offset"] or 0
+    return slice(start, None if bounds["limit"] is None else start + bounds["limit"])
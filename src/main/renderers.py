@@ -0,0 +1,51 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets `text/event-stream` requests through content negotiation.
+
+    Streaming actions return a `StreamingHttpResponse` themselves, so this
+    renderer only ever renders error payloads (e.g. a 404) as an SSE event.
+    """
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, (str, bytes)):
+            return data
+        return f"event: error\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class ExportRenderer(BaseRenderer):
+    """Lets export formats through content negotiation (e.g. `?format=csv`).
+
+    The export action streams the file itself, so these renderers only ever
+    render error payloads (e.g. a 404).
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        return json.dumps(data, default=str).encode()
+
+
+class CSVRenderer(ExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class JSONLinesRenderer(ExportRenderer):
+    media_type = "application/jsonl"
+    format = "jsonl"
+
+
+class ParquetRenderer(ExportRenderer):
+    media_type = "application/vnd.apache.parquet"
+    format = "parquet"
+    charset = None
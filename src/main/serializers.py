@@ -1,7 +1,20 @@
 from rest_framework import serializers
+from main.ingest import FILE_TYPES
 from models.enhanced_data import EnhancedData
 from models.original_data import OriginalData
 
+class RowsField(serializers.ListField):
+    """The rows of a dataset, read from its row table.
+
+    The `rows` slice in the serializer context limits which rows are read.
+    """
+    child = serializers.DictField()
+
+    def get_attribute(self, instance):
+        rows = self.context.get("rows", slice(None))
+        return list(instance.iter_rows(rows.start or 0, rows.stop))
+
+
 class OriginalDataSerializer(serializers.ModelSerializer):
     schema = serializers.DictField(
         child=serializers.ChoiceField(
@@ -13,17 +26,137 @@ class OriginalDataSerializer(serializers.ModelSerializer):
         help_text="Schema definition mapping field names to types (e.g., {'id': 'int', 'name': 'str'})"
     )
     
+    data = RowsField(required=False, help_text="Array of objects representing the data")
+    
     class Meta:
         model = OriginalData
-        fields = '__all__'
+        fields = ("id", "schema", "schema_fingerprint", "data", "row_count", "created_at", "updated_at")
+        read_only_fields = ("row_count",)
+
+    def create(self, validated_data):
+        rows = validated_data.pop("data", [])
+        original_data = super().create(validated_data)
+        original_data.set_rows(rows)
+        return original_data
+
+    def update(self, instance, validated_data):
+        rows = validated_data.pop("data", None)
+        original_data = super().update(instance, validated_data)
+        if rows is not None:
+            original_data.set_rows(rows)
+        return original_data
+
+
+class OriginalDataSummarySerializer(serializers.ModelSerializer):
+    """List representation without `data`; `first_row` is annotated by the view for previews."""
+    first_row = serializers.JSONField(read_only=True, allow_null=True, help_text="First row of data, for previews")
+
+    class Meta:
+        model = OriginalData
+        fields = ("id", "schema", "schema_fingerprint", "row_count", "first_row", "created_at", "updated_at")
+
+
+class OriginalDataUploadSerializer(serializers.Serializer):
+    file = serializers.FileField(help_text="CSV (with a header line), JSON array of objects or JSONL file")
+    file_type = serializers.ChoiceField(
+        choices=FILE_TYPES,
+        required=False,
+        help_text="Format of the file; detected from the file extension when omitted"
+    )
+    schema = serializers.JSONField(
+        binary=True,
+        required=False,
+        help_text="JSON schema mapping field names to types; inferred from a sample of rows when omitted"
+    )
+
+    def validate_schema(self, value):
+        if not isinstance(value, dict) or any(field_type not in ("int", "str", "bool", "float") for field_type in value.values()):
+            raise serializers.ValidationError("Must map field names to one of: 'int', 'str', 'bool', 'float'")
+        return value
+
+
+class OriginalDataUploadResultSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    schema = serializers.DictField(child=serializers.CharField())
+    row_count = serializers.IntegerField()
+    seconds = serializers.FloatField(help_text="Time spent parsing and storing the rows")
+    rows_per_second = serializers.FloatField(help_text="Ingestion throughput")
 
 
 class EnhancedDataSerializer(serializers.ModelSerializer):
     status = serializers.CharField(default="pending", required=False)
+    data = RowsField(read_only=True, help_text="Array of objects representing the enhanced data")
     
     class Meta:
         model = EnhancedData
         fields = '__all__'
+        read_only_fields = ("schema", "stats", "metrics", "total_chunks", "chunks_done", "chunks_failed", "previous_enhanced_data")
+
+
+class EnhancedDataSummarySerializer(serializers.ModelSerializer):
+    """List representation without `data`."""
+
+    class Meta:
+        model = EnhancedData
+        fields = (
+            "id", "status", "schema", "schema_fingerprint", "stats", "total_chunks", "chunks_done", "chunks_failed",
+            "row_count", "created_at", "updated_at", "original_data", "previous_enhanced_data",
+        )
+
+class NodeMetricsSerializer(serializers.Serializer):
+    runs = serializers.IntegerField()
+    seconds = serializers.FloatField(help_text="Wall time of the node runs")
+    errors = serializers.IntegerField()
+    llm_calls = serializers.IntegerField()
+    llm_seconds = serializers.FloatField(help_text="Wall time of the node's LLM requests, including rate limiting and retries")
+    prompt_tokens = serializers.IntegerField(help_text="Provider-reported input tokens, estimated when the provider reports none")
+    completion_tokens = serializers.IntegerField(help_text="Provider-reported output tokens, estimated when the provider reports none")
+    retries = serializers.IntegerField(help_text="LLM requests retried after a rate limit error")
+
+
+class ToolMetricsSerializer(serializers.Serializer):
+    calls = serializers.IntegerField()
+    seconds = serializers.FloatField()
+    errors = serializers.IntegerField()
+    cache_hits = serializers.IntegerField()
+
+
+class MetricsTotalsSerializer(serializers.Serializer):
+    llm_calls = serializers.IntegerField()
+    prompt_tokens = serializers.IntegerField()
+    completion_tokens = serializers.IntegerField()
+    retries = serializers.IntegerField()
+    node_seconds = serializers.FloatField()
+    llm_seconds = serializers.FloatField()
+    tool_calls = serializers.IntegerField()
+    tool_cache_hits = serializers.IntegerField()
+    tool_seconds = serializers.FloatField()
+
+
+class JobMetricsSerializer(serializers.Serializer):
+    nodes = serializers.DictField(child=NodeMetricsSerializer(), help_text="Metrics per graph node")
+    tools = serializers.DictField(child=ToolMetricsSerializer(), help_text="Metrics per tool")
+    totals = MetricsTotalsSerializer()
+
+
+class ChunkStatsSerializer(serializers.Serializer):
+    chunk_index = serializers.IntegerField()
+    status = serializers.CharField()
+    rows = serializers.IntegerField()
+    totals = MetricsTotalsSerializer()
+
+
+class EnhancedDataStatsSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.CharField()
+    total_chunks = serializers.IntegerField()
+    chunks_done = serializers.IntegerField()
+    chunks_failed = serializers.IntegerField()
+    elapsed_seconds = serializers.FloatField(help_text="Time since the job started, or its duration once it finished")
+    stats = serializers.DictField(help_text="Cache hits and misses and rows that bypassed the LLM")
+    metrics = JobMetricsSerializer(help_text="Metrics summed over every chunk run so far")
+    chunks = ChunkStatsSerializer(many=True)
+
 
 class SchemaFieldSerializer(serializers.Serializer):
     type = serializers.ChoiceField(
@@ -44,4 +177,9 @@ class EnhancedDataEnhanceRequestSerializer(serializers.Serializer):
     schema = serializers.DictField(
         child=SchemaFieldSerializer(),
         help_text="Schema definition mapping field names to field specs with type and description (e.g., {'id': {'type': 'int', 'description': 'User ID'}})"
+    )
+    previous_enhanced_data_id = serializers.IntegerField(
+        required=False,
+        allow_null=True,
+        help_text="ID of a complete EnhancedData to re-enhance incrementally: unchanged rows and fields are copied from it"
     )
\ No newline at end of file
@@ -1,40 +1,153 @@
+import asyncio
+import sys
+from collections import deque
+from itertools import repeat, tee
+
+from asgiref.sync import sync_to_async
 from celery import shared_task, group, chord
+from django.conf import settings
+from django.db.models import F
 from langchain_core.messages import HumanMessage
 from langchain_core.prompts import PromptTemplate
-from langgraph.graph import START, END, StateGraph
-from graph.agents.composer import composer_node
-from graph.agents.enhancer import enhancer_node
-from graph.agents.reviewer import reviewer_node
-from graph.agents.supervisor import supervisor_node
-from graph.main import supervisor_routing
-from graph.states import MessagesState
-from graph.utils import CsvChunker
+from graph.instrumentation import ChunkMetrics, current_metrics, merge_metrics, usage_callback
+from graph.runtime import current_job_id, runtime
+from graph.search_cache import search_cache_stats
+from graph.models import chunk_token_budget, enhancer_model_name
+from graph.preclean import preclean_rows
+from graph.utils import TokenBudgetChunker
+from main.cache import RowCache
+from main.dedup import StreamingDeduplicator, filled_fields, mark_duplicates
+from main.events import publish_job_progress
+from main.incremental import IncrementalPlan, restore_kept_fields
+from main.metrics import record_metric_totals
+from models.dataset_row import ROW_BATCH_SIZE
+
+# Collects the provider-reported token usage of every LLM call in the graph
+GRAPH_CONFIG = {"callbacks": [usage_callback]}
+# Chunk records the coordinator writes per query; each holds its rows' resolution
+CHUNK_BATCH_SIZE = 100
+
+
+def add_job_stats(enhanced_data_id, counters):
+    """Add numeric counters to the job's stats, e.g. when a resumed run reports more cache hits."""
+    from models.enhanced_data import EnhancedData
+
+    stats = EnhancedData.objects.values_list("stats", flat=True).get(id=enhanced_data_id)
+    for key, value in counters.items():
+        stats[key] = stats.get(key, 0) + value
+    EnhancedData.objects.filter(id=enhanced_data_id).update(stats=stats)
+
+
+def save_chunk_result(enhanced_data_id, result):
+    """Persist a finished chunk, add its metrics to the chunk's earlier runs and bump the job's progress counters."""
+    from models.enhanced_data import EnhancedData
+    from models.enhanced_data_chunk import EnhancedDataChunk
+
+    success = result["success"]
+    chunk = EnhancedDataChunk.objects.filter(enhanced_data_id=enhanced_data_id, chunk_index=result["chunk_index"])
+    metrics = result.get("metrics")
+    # Only one task runs a chunk at a time, so reading and writing its metrics cannot race
+    previous_metrics = chunk.values_list("metrics", flat=True).first() if metrics else None
+    chunk.update(
+        status="complete" if success else "failed",
+        data=result["data"] if success else [],
+        error=result["error"] or "",
+        **({"metrics": merge_metrics(previous_metrics, metrics)} if metrics else {}),
+    )
+    if metrics:
+        record_metric_totals(metrics)
+
+    counter = "chunks_done" if success else "chunks_failed"
+    EnhancedData.objects.filter(id=enhanced_data_id).update(**{counter: F(counter) + 1})
+    publish_job_progress(
+        enhanced_data_id,
+        "chunk",
+        chunk_index=result["chunk_index"],
+        success=success,
+        error=result["error"],
+    )
+
+
+def load_chunk(enhanced_data_id, chunk_index):
+    """
+    Read a chunk's original rows and the resolution the coordinator stored for them from the database.
+    Chunk tasks only receive IDs, so the rows never travel through the broker.
+
+    Returns:
+        The target schema, its stored fingerprint, the cleaned rows, the resolved result for each row (None when it
+        needs the graph) and, in incremental jobs, the values copied forward for each row that needs the graph for
+        new fields only
+    """
+    from models.enhanced_data_chunk import EnhancedDataChunk
+
+    chunk = EnhancedDataChunk.objects.select_related(
+        "enhanced_data__original_data", "enhanced_data__previous_enhanced_data"
+    ).get(
+        enhanced_data_id=enhanced_data_id, chunk_index=chunk_index
+    )
+    schema_dict = chunk.enhanced_data.schema
+    fingerprint = chunk.enhanced_data.schema_fingerprint
+    rows = list(chunk.enhanced_data.original_data.iter_rows(chunk.start_row, chunk.end_row))
+    if len(chunk.resolved) != len(rows):
+        # Chunks created before their resolution was stored
+        cleaned_rows, resolved_rows, _, carried_rows = resolve_rows(
+            rows, schema_dict, RowCache(schema_dict, fingerprint=fingerprint), IncrementalPlan.for_job(chunk.enhanced_data)
+        )
+        mark_duplicates(cleaned_rows, resolved_rows, schema_dict, [int(offset) for offset in chunk.duplicates])
+        return schema_dict, fingerprint, cleaned_rows, resolved_rows, carried_rows
+
+    # Pre-cleaning is deterministic, so only the database lookups' outcome had to be stored
+    cleaned_rows, _ = preclean_rows(rows, schema_dict)
+    carried_rows = chunk.carried or [None] * len(rows)
+    cleaned_rows = [{**row, **carried} if carried else row for row, carried in zip(cleaned_rows, carried_rows)]
+    return schema_dict, fingerprint, cleaned_rows, chunk.resolved, carried_rows
+
+
+def resolved_chunk_result(chunk_index, resolved_rows):
+    """The result of a chunk whose rows are all resolved, or None when some rows still need the graph."""
+    if any(resolved is None for resolved in resolved_rows):
+        return None
+    return {"chunk_index": chunk_index, "success": True, "data": resolved_rows, "error": None}
+
+
+def chunk_summary(result):
+    """Chunk result without its rows and metrics, which are already persisted; keeps the chord payload small."""
+    return {key: value for key, value in result.items() if key not in ("data", "metrics")}
 
 
 @shared_task
-def process_single_chunk_task(chunk, chunk_index, schema_dict):
-    """Process a single chunk of data and return enhanced results."""
-    try:
-        # Compile graph inside task for thread safety
-        graph = StateGraph(MessagesState)
-        graph.add_node("supervisor", supervisor_node)
-        graph.add_node("composer", composer_node)
-        graph.add_node("enhancer", enhancer_node)
-        graph.add_node("reviewer", reviewer_node)
+def process_single_chunk_task(enhanced_data_id, chunk_index):
+    """
+    Process a single chunk of a job and persist its enhanced results.
 
-        graph.add_edge(START, "supervisor")
-        graph.add_conditional_edges("supervisor", supervisor_routing, {
-            "composer": "composer",
-            "enhancer": "enhancer"
-        })
+    Args:
+        enhanced_data_id: ID of the EnhancedData job
+        chunk_index: Position of the chunk in the job; its row range is read from the EnhancedDataChunk
+    """
+    current_job_id.set(enhanced_data_id)
+    try:
+        schema_dict, fingerprint, chunk, resolved_rows, carried_rows = load_chunk(enhanced_data_id, chunk_index)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        result = {"chunk_index": chunk_index, "success": False, "data": None, "error": str(e)}
+    else:
+        result = resolved_chunk_result(chunk_index, resolved_rows)
+        if result is None:
+            # Only as many chunks run at once as the model's current (adaptive) rate allows;
+            # the slot's lease lasts as long as the task may, so a slow chunk keeps it
+            with runtime.get_limiter().chunk_slot(
+                enhancer_model_name, settings.ENHANCEMENT_MAX_CONCURRENT_CHUNKS, lease=settings.CELERY_TASK_TIME_LIMIT
+            ):
+                result = enhance_chunk(chunk, chunk_index, schema_dict, resolved_rows, carried_rows, fingerprint)
 
-        graph.add_edge("enhancer", "reviewer")
-        graph.add_edge("reviewer", "supervisor")
-        graph.add_edge("composer", END)
+    save_chunk_result(enhanced_data_id, result)
+    return chunk_summary(result)
 
-        compiled_graph = graph.compile()
 
-        prompt_template = PromptTemplate.from_template("""You are an expert Data Supervisor and Enrichment Agent. Your primary function is to ingest raw data of any type and transform it into a pristine, fully populated output based strictly on a provided Target Schema.
+def build_chunk_state(pending_rows, schema_dict, fingerprint=None):
+    """Build the initial graph state for the rows of a chunk that need the LLM; `fingerprint` is the job's stored schema fingerprint."""
+    prompt = PromptTemplate.from_template("""You are an expert Data Supervisor and Enrichment Agent. Your primary function is to ingest raw data of any type and transform it into a pristine, fully populated output based strictly on a provided Target Schema.
 
         ## CORE OBJECTIVES
 
@@ -76,61 +189,366 @@ def process_single_chunk_task(chunk, chunk_index, schema_dict):
                 
                 Output format:
                 {output_format}
-                """).format(chunk=chunk, output_format=schema_dict)
-        
-        result = compiled_graph.invoke({
-            "messages": [
-                HumanMessage(prompt_template),
-            ],  
-            "review_count": 0,
-            "schema": schema_dict,
-        })
-        
-        enhanced_data_list = result.get("composed_data", [])
-        
-        if not enhanced_data_list:
-            return {"chunk_index": chunk_index, "success": False, "data": None, "error": "No data returned from graph"}
-        
-        if isinstance(enhanced_data_list, list):
-            enhanced_data_list = [
-                item.model_dump() if hasattr(item, 'model_dump') 
-                else dict(item) if hasattr(item, '__dict__') 
-                else item 
-                for item in enhanced_data_list
-            ]
-            return {"chunk_index": chunk_index, "success": True, "data": enhanced_data_list, "error": None}
-        else:
-            return {"chunk_index": chunk_index, "success": False, "data": None, "error": "Enhanced data is not a list"}
+                """).format(chunk=pending_rows, output_format=schema_dict)
+
+    return {
+        "messages": [
+            HumanMessage(prompt),
+        ],
+        "review_count": 0,
+        "schema": schema_dict,
+        "schema_fingerprint": fingerprint,
+        "context_window": settings.ENHANCEMENT_CONTEXT_WINDOW,
+        "rows": pending_rows,
+        "enhancer_mode": settings.ENHANCEMENT_ENHANCER_MODE,
+        "routing_mode": settings.ENHANCEMENT_ROUTING_MODE,
+        "max_reviews": settings.ENHANCEMENT_MAX_REVIEWS,
+        "max_null_rate": settings.ENHANCEMENT_MAX_NULL_RATE,
+        "composer_mode": settings.ENHANCEMENT_COMPOSER_MODE,
+        "column_key_fields": settings.ENHANCEMENT_COLUMN_KEY_FIELDS or None,
+    }
+
+
+def chunk_runner():
+    """The compiled graph, or the column filler under the columns strategy; both take the chunk state."""
+    return runtime.column_filler if settings.ENHANCEMENT_STRATEGY == "columns" else runtime.graph
+
+
+def finish_chunk(chunk_index, chunk, schema_dict, resolved_rows, pending_rows, result, carried_rows=None, fingerprint=None):
+    """Turn the graph output for a chunk into the chunk result, caching the newly enhanced rows."""
+    enhanced_data_list = result.get("composed_data", [])
+    
+    if not enhanced_data_list:
+        return {"chunk_index": chunk_index, "success": False, "data": None, "error": "No data returned from graph"}
+    
+    if isinstance(enhanced_data_list, list):
+        enhanced_data_list = [
+            item.model_dump() if hasattr(item, 'model_dump') 
+            else dict(item) if hasattr(item, '__dict__') 
+            else item 
+            for item in enhanced_data_list
+        ]
+
+        if len(enhanced_data_list) == len(pending_rows):
+            if carried_rows:
+                pending_carried = [carried for carried, resolved in zip(carried_rows, resolved_rows) if resolved is None]
+                enhanced_data_list = restore_kept_fields(enhanced_data_list, pending_carried)
+            RowCache(schema_dict, fingerprint=fingerprint).set_many(pending_rows, enhanced_data_list)
+            enhanced_rows = iter(enhanced_data_list)
+            enhanced_data_list = [resolved if resolved is not None else next(enhanced_rows) for resolved in resolved_rows]
+        elif len(pending_rows) < len(chunk):
+            # Without a 1:1 mapping the graph output cannot be spliced between resolved rows
+            error = f"Expected {len(pending_rows)} enhanced rows, got {len(enhanced_data_list)}"
+            return {"chunk_index": chunk_index, "success": False, "data": None, "error": error}
+
+        return {"chunk_index": chunk_index, "success": True, "data": enhanced_data_list, "error": None}
+    else:
+        return {"chunk_index": chunk_index, "success": False, "data": None, "error": "Enhanced data is not a list"}
+
+
+def enhance_chunk(chunk, chunk_index, schema_dict, resolved_rows=None, carried_rows=None, fingerprint=None):
+    """Run the graph over the unresolved rows of a chunk and return the chunk result with its metrics."""
+    metrics = ChunkMetrics()
+    token = current_metrics.set(metrics)
+    try:
+        resolved_rows = resolved_rows or [None] * len(chunk)
+        pending_rows = [row for row, resolved in zip(chunk, resolved_rows) if resolved is None]
+
+        # The compiled graph (or column filler) is immutable and shared by every chunk in this worker process
+        result = chunk_runner().invoke(build_chunk_state(pending_rows, schema_dict, fingerprint), config=GRAPH_CONFIG)
+        result = finish_chunk(chunk_index, chunk, schema_dict, resolved_rows, pending_rows, result, carried_rows, fingerprint)
     except Exception as e:
         import traceback
         error_msg = str(e)
         traceback.print_exc()
-        return {"chunk_index": chunk_index, "success": False, "data": None, "error": error_msg}
+        result = {"chunk_index": chunk_index, "success": False, "data": None, "error": error_msg}
+    finally:
+        current_metrics.reset(token)
+    return {**result, "metrics": metrics.as_dict()}
+
+
+async def aenhance_chunk(chunk, chunk_index, schema_dict, resolved_rows=None, carried_rows=None, fingerprint=None):
+    """Async `enhance_chunk`: runs the graph through `ainvoke` so many chunks can share one event loop."""
+    # Set inside this chunk's task, so concurrent chunks keep separate metrics
+    metrics = ChunkMetrics()
+    token = current_metrics.set(metrics)
+    try:
+        resolved_rows = resolved_rows or [None] * len(chunk)
+        pending_rows = [row for row, resolved in zip(chunk, resolved_rows) if resolved is None]
+
+        result = await chunk_runner().ainvoke(build_chunk_state(pending_rows, schema_dict, fingerprint), config=GRAPH_CONFIG)
+        result = await sync_to_async(finish_chunk)(
+            chunk_index, chunk, schema_dict, resolved_rows, pending_rows, result, carried_rows, fingerprint
+        )
+    except Exception as e:
+        import traceback
+        error_msg = str(e)
+        traceback.print_exc()
+        result = {"chunk_index": chunk_index, "success": False, "data": None, "error": error_msg}
+    finally:
+        current_metrics.reset(token)
+    return {**result, "metrics": metrics.as_dict()}
+
+
+async def enhance_chunks_concurrently(enhanced_data_id, chunk_indexes, max_in_flight):
+    """Run the graphs of the job's `chunk_indexes` concurrently, at most `max_in_flight` at once."""
+    semaphore = asyncio.Semaphore(max_in_flight)
+    limiter = runtime.get_limiter()
+
+    async def run(chunk_index):
+        try:
+            schema_dict, fingerprint, chunk, resolved_rows, carried_rows = await sync_to_async(load_chunk)(enhanced_data_id, chunk_index)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            result = {"chunk_index": chunk_index, "success": False, "data": None, "error": str(e)}
+        else:
+            result = resolved_chunk_result(chunk_index, resolved_rows)
+            if result is None:
+                async with semaphore, limiter.achunk_slot(
+                    enhancer_model_name, settings.ENHANCEMENT_MAX_CONCURRENT_CHUNKS, lease=settings.CELERY_TASK_TIME_LIMIT
+                ):
+                    result = await aenhance_chunk(chunk, chunk_index, schema_dict, resolved_rows, carried_rows, fingerprint)
+        await sync_to_async(save_chunk_result)(enhanced_data_id, result)
+        return chunk_summary(result)
+
+    return await asyncio.gather(*(run(chunk_index) for chunk_index in chunk_indexes))
+
+
+@shared_task
+def process_chunk_batch_task(enhanced_data_id, chunk_indexes):
+    """
+    Process several chunks concurrently on one event loop and persist their results.
+    Chunk graphs mostly wait on LLM and search I/O, so one process can keep many of them in flight.
+
+    Args:
+        enhanced_data_id: ID of the EnhancedData job
+        chunk_indexes: Positions of the chunks to process, as for `process_single_chunk_task`
+    """
+    current_job_id.set(enhanced_data_id)
+    # The process's long-lived loop, which the pooled models' async clients are bound to
+    return runtime.run_async(enhance_chunks_concurrently(
+        enhanced_data_id, chunk_indexes, settings.ENHANCEMENT_ASYNC_MAX_IN_FLIGHT
+    ))
+
+
+def resolve_rows(rows, schema_dict, row_cache, plan=None):
+    """
+    Pre-clean rows and resolve every row that does not need the LLM.
+
+    Args:
+        rows: Original rows
+        schema_dict: Target output schema
+        row_cache: RowCache used to look up the rows that the pre-clean stage could not resolve
+        plan: IncrementalPlan of an incremental job, copying unchanged rows forward before the cache lookup
+
+    Returns:
+        The cleaned rows, the resolved result for each row (None when it still needs the graph),
+        the number of rows that bypassed the LLM through the pre-clean stage alone
+        and the values copied forward for each row that needs the graph for new fields only
+    """
+    cleaned_rows, resolved_rows = preclean_rows(rows, schema_dict)
+    bypassed = sum(1 for resolved in resolved_rows if resolved is not None)
+    carried_rows = plan.apply(rows, cleaned_rows, resolved_rows) if plan is not None else [None] * len(rows)
+
+    pending = [i for i, resolved in enumerate(resolved_rows) if resolved is None]
+    for batch_start in range(0, len(pending), 1000):
+        batch = pending[batch_start:batch_start + 1000]
+        for i, cached in zip(batch, row_cache.get_many([cleaned_rows[i] for i in batch])):
+            resolved_rows[i] = cached
+
+    return cleaned_rows, resolved_rows, bypassed, carried_rows
+
+
+def dispatch_chunks(enhanced_data_id):
+    """
+    Dispatch chunk tasks and the collector for every chunk of a job that is not complete yet.
+    Tasks only carry the job ID and chunk indexes; workers read the rows from the database.
+
+    Args:
+        enhanced_data_id: ID of the EnhancedData job, whose chunks already hold their resolved rows
+    """
+    from models.enhanced_data import EnhancedData
+    from models.enhanced_data_chunk import EnhancedDataChunk
+
+    total_chunks = EnhancedData.objects.values_list("total_chunks", flat=True).get(id=enhanced_data_id)
+    chunks = (
+        EnhancedDataChunk.objects.filter(enhanced_data_id=enhanced_data_id)
+        .exclude(status="complete")
+        .order_by("chunk_index")
+        .values_list("chunk_index", "resolved")
+    )
+
+    # Fully resolved chunks skip the graph and never become a task
+    pending_chunk_indexes = []
+    for chunk_index, resolved_rows in chunks.iterator(chunk_size=100):
+        result = resolved_chunk_result(chunk_index, resolved_rows) if resolved_rows else None
+        if result is not None:
+            save_chunk_result(enhanced_data_id, result)
+        else:
+            pending_chunk_indexes.append(chunk_index)
+    if settings.ENHANCEMENT_EXECUTION_MODE == "async":
+        batch_size = settings.ENHANCEMENT_ASYNC_BATCH_SIZE
+        chunk_signatures = [
+            process_chunk_batch_task.s(enhanced_data_id, pending_chunk_indexes[i:i + batch_size])
+            for i in range(0, len(pending_chunk_indexes), batch_size)
+        ]
+    else:
+        chunk_signatures = [
+            process_single_chunk_task.s(enhanced_data_id, chunk_index)
+            for chunk_index in pending_chunk_indexes
+        ]
+
+    if not chunk_signatures:
+        collect_chunk_results.delay([], enhanced_data_id, total_chunks)
+    else:
+        chord(group(chunk_signatures))(collect_chunk_results.s(enhanced_data_id, total_chunks))
+
+
+def iter_resolved_batches(enhanced_data_obj, schema_dict, row_cache, plan=None, batch_size=ROW_BATCH_SIZE):
+    """
+    Stream a job's original rows through `resolve_rows`, one batch at a time.
+
+    Yields:
+        The index of the batch's first row, then `resolve_rows`' results for the batch
+    """
+    start = 0
+    while True:
+        rows = list(enhanced_data_obj.original_data.iter_rows(start, start + batch_size))
+        if not rows:
+            return
+        yield start, *resolve_rows(rows, schema_dict, row_cache, plan)
+        start += len(rows)
+
+
+def build_deduplicator(enhanced_data_obj, schema_dict):
+    """
+    The job's `StreamingDeduplicator`, or None with deduplication off.
+    Its enrichment fields take a first pass over the rows, with its own cache and plan so the job's counters stay untouched.
+    """
+    if not settings.ENHANCEMENT_DEDUP_KEY_FIELDS:
+        return None
+    filled = set()
+    for _, cleaned_rows, resolved_rows, _, carried_rows in iter_resolved_batches(
+        enhanced_data_obj, schema_dict, RowCache(schema_dict, fingerprint=enhanced_data_obj.schema_fingerprint),
+        IncrementalPlan.for_job(enhanced_data_obj),
+    ):
+        pending = [i for i, (resolved, carried) in enumerate(zip(resolved_rows, carried_rows)) if resolved is None and carried is None]
+        filled |= filled_fields(cleaned_rows, pending)
+    return StreamingDeduplicator(
+        schema_dict,
+        [name for name in schema_dict if name not in filled],
+        settings.ENHANCEMENT_DEDUP_KEY_FIELDS,
+        settings.ENHANCEMENT_DEDUP_FUZZY_THRESHOLD,
+    )
+
+
+def record_resolution_stats(enhanced_data_id, row_cache, bypassed, plan=None, dedup_stats=None):
+    """Record bypass, cache, copy-forward and deduplication counters; done before dispatching so the collector never races with this write."""
+    add_job_stats(enhanced_data_id, {
+        "rows_bypassed": bypassed, **row_cache.stats(), **(plan.stats() if plan else {}), **(dedup_stats or {}),
+    })
+    print(f"Pre-clean: {bypassed} rows bypassed the LLM; enhancement cache: {row_cache.hits} hits, {row_cache.misses} misses")
+    if plan is not None:
+        print(f"Incremental: {plan.copied} rows copied forward, {plan.new_fields_only} rows only need {plan.new_fields}")
+    if dedup_stats:
+        print(f"Deduplication: {dedup_stats['rows_deduplicated']} rows filled in from their entity's representative")
+
+
+def build_chunker(cleaned_rows, schema_dict, skip):
+    """Chunk by the token budget, or under the columns strategy by row count alone."""
+    if settings.ENHANCEMENT_STRATEGY == "columns":
+        # Column calls carry only key values and one answer per row, so whole rows never fill a prompt
+        batch_size = settings.ENHANCEMENT_COLUMN_BATCH_SIZE
+        return TokenBudgetChunker(
+            cleaned_rows,
+            schema_dict,
+            token_budget=sys.maxsize,
+            max_chunk_size=batch_size,
+            skip=skip,
+            max_chunk_rows=max(batch_size, 1000),
+        )
+    return TokenBudgetChunker(
+        cleaned_rows,
+        schema_dict,
+        token_budget=settings.ENHANCEMENT_CHUNK_TOKEN_BUDGET or chunk_token_budget(enhancer_model_name),
+        max_chunk_size=settings.ENHANCEMENT_MAX_CHUNK_SIZE,
+        skip=skip,
+    )
 
 
 @shared_task
-def process_enhancement_coordinator(enhanced_data_id, original_data_list, schema_dict):
+def process_enhancement_coordinator(enhanced_data_id):
     """
     Coordinator task that chunks data and dispatches parallel chunk processing tasks.
     Uses Celery group and chord pattern to process chunks in parallel and collect results.
+    Rows resolved by the pre-clean stage or the row cache cost nothing in the token budget.
+    The original rows and schema are read from the database rather than passed through the broker.
     """
     try:
-        chunked_data = CsvChunker(original_data_list, 10).chunk()
-        total_chunks = len(chunked_data)
+        from models.enhanced_data import EnhancedData
+        from models.enhanced_data_chunk import EnhancedDataChunk
+
+        enhanced_data_obj = EnhancedData.objects.select_related("original_data", "previous_enhanced_data").get(id=enhanced_data_id)
+        schema_dict = enhanced_data_obj.schema
+
+        row_cache = RowCache(schema_dict, fingerprint=enhanced_data_obj.schema_fingerprint)
+        plan = IncrementalPlan.for_job(enhanced_data_obj)
+        deduplicator = build_deduplicator(enhanced_data_obj, schema_dict)
+        bypassed = 0
+        # (resolved, carried, representative) of the rows the chunker has read but not yet put in a chunk
+        unchunked = deque()
+
+        def cleaned_rows():
+            nonlocal bypassed
+            for start, batch_cleaned, batch_resolved, batch_bypassed, batch_carried in iter_resolved_batches(
+                enhanced_data_obj, schema_dict, row_cache, plan
+            ):
+                bypassed += batch_bypassed
+                duplicates = deduplicator.apply(start, batch_cleaned, batch_resolved, batch_carried) if deduplicator else {}
+                for offset, row in enumerate(batch_cleaned):
+                    unchunked.append((batch_resolved[offset], batch_carried[offset], duplicates.get(start + offset)))
+                    yield row
+
+        # The chunker reads each row before its skip flag, so the flag is the last row's
+        skip = (unchunked[-1][0] is not None for _ in repeat(None))
+
+        # Rows stream through resolution and chunking; only one batch and one chunk are held at a time
+        total_chunks = 0
+        new_chunks = []
+        for chunk_index, (start, rows) in enumerate(build_chunker(cleaned_rows(), schema_dict, skip).spans()):
+            entries = [unchunked.popleft() for _ in rows]
+            carried_rows = [carried for _, carried, _ in entries]
+            new_chunks.append(EnhancedDataChunk(
+                enhanced_data_id=enhanced_data_id,
+                chunk_index=chunk_index,
+                start_row=start,
+                end_row=start + len(rows),
+                duplicates={str(offset): rep for offset, (_, _, rep) in enumerate(entries) if rep is not None},
+                resolved=[resolved for resolved, _, _ in entries],
+                carried=carried_rows if any(carried_rows) else [],
+            ))
+            total_chunks += 1
+            if len(new_chunks) >= CHUNK_BATCH_SIZE:
+                EnhancedDataChunk.objects.bulk_create(new_chunks)
+                new_chunks = []
         
         if total_chunks == 0:
-            from models.enhanced_data import EnhancedData
             enhanced_data_obj = EnhancedData.objects.get(id=enhanced_data_id)
             enhanced_data_obj.status = "failed"
             enhanced_data_obj.save()
+            publish_job_progress(enhanced_data_id, "status")
             return
-        
-        chunk_tasks = group(
-            process_single_chunk_task.s(chunk, chunk_index, schema_dict)
-            for chunk_index, chunk in enumerate(chunked_data)
+
+        # Chunk rows exist before any chunk task runs so progress can be tracked per chunk
+        EnhancedDataChunk.objects.bulk_create(new_chunks)
+        EnhancedData.objects.filter(id=enhanced_data_id).update(
+            total_chunks=total_chunks, dedup_fields=deduplicator.fields if deduplicator else []
         )
-        
-        chord(chunk_tasks)(collect_chunk_results.s(enhanced_data_id, total_chunks))
+        publish_job_progress(enhanced_data_id, "started")
+
+        record_resolution_stats(enhanced_data_id, row_cache, bypassed, plan, deduplicator.stats() if deduplicator else None)
+        dispatch_chunks(enhanced_data_id)
         
     except Exception as e:
         import traceback
@@ -140,6 +558,7 @@ def process_enhancement_coordinator(enhanced_data_id, original_data_list, schema
             enhanced_data_obj = EnhancedData.objects.get(id=enhanced_data_id)
             enhanced_data_obj.status = "failed"
             enhanced_data_obj.save()
+            publish_job_progress(enhanced_data_id, "status")
         except:
             pass
 
@@ -147,11 +566,11 @@ def process_enhancement_coordinator(enhanced_data_id, original_data_list, schema
 @shared_task
 def collect_chunk_results(chunk_results, enhanced_data_id, total_chunks):
     """
-    Collector task that combines results from all chunk processing tasks.
+    Collector task that combines the persisted results of all chunks.
     Implements Strategy C: Best effort - saves all successful chunks, only fails if ALL chunks fail.
     
     Args:
-        chunk_results: List of results from all chunk tasks (passed by Celery chord)
+        chunk_results: List of chunk result summaries (passed by Celery chord, rows are read from the DB)
         enhanced_data_id: ID of the EnhancedData object to update
         total_chunks: Total number of chunks that were processed
     """
@@ -159,38 +578,45 @@ def collect_chunk_results(chunk_results, enhanced_data_id, total_chunks):
         from models.enhanced_data import EnhancedData
         
         enhanced_data_obj = EnhancedData.objects.get(id=enhanced_data_id)
+
+        # Batch tasks (async execution mode) return a list of chunk results each
+        chunk_results = [
+            result for entry in chunk_results
+            for result in (entry if isinstance(entry, list) else [entry])
+        ]
+        for result in chunk_results:
+            if result and isinstance(result, dict) and not result.get("success"):
+                error = result.get("error", "Unknown error")
+                chunk_idx = result.get("chunk_index", "unknown")
+                print(f"Chunk {chunk_idx} failed: {error}")
         
-        sorted_results = sorted(
-            chunk_results,
-            key=lambda x: x.get("chunk_index", 0) if isinstance(x, dict) else 0
+        # Streamed from the chunk results straight into the row table, with the original row hashes incremental runs match on
+        row_pairs, hash_pairs = tee(enhanced_data_obj.iter_partial_rows_with_sources())
+        row_count = enhanced_data_obj.set_rows(
+            (row for row, _ in row_pairs),
+            source_hashes=(source_hash for _, source_hash in hash_pairs),
         )
+        # Failed chunks and earlier runs of resumed chunks cost calls and tokens too
+        enhanced_data_obj.metrics = enhanced_data_obj.aggregate_metrics()
         
-        combined_enhanced_data = []
-        successful_chunks = 0
-        failed_chunks = 0
-        
-        for result in sorted_results:
-            if result and isinstance(result, dict):
-                if result.get("success") and result.get("data"):
-                    combined_enhanced_data.extend(result["data"])
-                    successful_chunks += 1
-                else:
-                    failed_chunks += 1
-                    error = result.get("error", "Unknown error")
-                    chunk_idx = result.get("chunk_index", "unknown")
-                    print(f"Chunk {chunk_idx} failed: {error}")
-        
-        if not combined_enhanced_data:
+        if not row_count:
             enhanced_data_obj.status = "failed"
             enhanced_data_obj.save()
+            publish_job_progress(enhanced_data_id, "status")
             print(f"Enhancement failed: All {total_chunks} chunks failed")
             return
         
-        enhanced_data_obj.data = combined_enhanced_data
         enhanced_data_obj.status = "complete"
+        try:
+            enhanced_data_obj.stats = {**enhanced_data_obj.stats, **search_cache_stats(runtime.get_redis(), enhanced_data_id)}
+        except Exception as e:
+            print(f"Could not read search cache stats: {e}")
         enhanced_data_obj.save()
+        publish_job_progress(enhanced_data_id, "status")
+
+        RowCache.evict()
         
-        print(f"Enhancement complete: {successful_chunks}/{total_chunks} chunks successful, {failed_chunks} failed")
+        print(f"Enhancement complete: {enhanced_data_obj.chunks_done}/{total_chunks} chunks successful, {enhanced_data_obj.chunks_failed} failed")
         
     except Exception as e:
         import traceback
@@ -200,5 +626,59 @@ def collect_chunk_results(chunk_results, enhanced_data_id, total_chunks):
             enhanced_data_obj = EnhancedData.objects.get(id=enhanced_data_id)
             enhanced_data_obj.status = "failed"
             enhanced_data_obj.save()
+            publish_job_progress(enhanced_data_id, "status")
+        except:
+            pass
+
+
+@shared_task
+def resume_enhancement_task(enhanced_data_id):
+    """
+    Re-run only the chunks of a job that failed or never finished.
+    The collector then rebuilds the result from all complete chunks in their original order.
+    """
+    try:
+        from models.enhanced_data import EnhancedData
+
+        enhanced_data_obj = EnhancedData.objects.select_related("original_data", "previous_enhanced_data").get(id=enhanced_data_id)
+        schema_dict = enhanced_data_obj.schema
+
+        if not enhanced_data_obj.chunks.exists():
+            # The coordinator failed before chunking, so there is nothing to keep
+            process_enhancement_coordinator(enhanced_data_id)
+            return
+
+        row_cache = RowCache(schema_dict, fingerprint=enhanced_data_obj.schema_fingerprint)
+        plan = IncrementalPlan.for_job(enhanced_data_obj)
+        new_cache_hits = 0
+        resumed_chunks = 0
+        for chunk in enhanced_data_obj.chunks.exclude(status="complete").order_by("chunk_index").iterator(chunk_size=100):
+            # Only the rows of the chunks being resumed are read; rows cached since the first run now resolve
+            cleaned_rows, resolved_rows, _, carried_rows = resolve_rows(
+                list(enhanced_data_obj.original_data.iter_rows(chunk.start_row, chunk.end_row)), schema_dict, row_cache, plan
+            )
+            mark_duplicates(cleaned_rows, resolved_rows, schema_dict, [int(offset) for offset in chunk.duplicates])
+            # Pre-clean and copy-forward results cannot change, so a row resolved only now is a new cache hit
+            new_cache_hits += sum(1 for before, now in zip(chunk.resolved, resolved_rows) if before is None and now is not None)
+            chunk.resolved = resolved_rows
+            chunk.carried = carried_rows if any(carried_rows) else []
+            chunk.save(update_fields=["resolved", "carried"])
+            resumed_chunks += 1
+        publish_job_progress(enhanced_data_id, "started", resumed_chunks=resumed_chunks)
+
+        # The coordinator already counted every row; only misses that turned into hits change
+        add_job_stats(enhanced_data_id, {"cache_hits": new_cache_hits, "cache_misses": -new_cache_hits})
+        print(f"Resume: {resumed_chunks} chunks re-run, {new_cache_hits} rows newly served by the enhancement cache")
+        dispatch_chunks(enhanced_data_id)
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        try:
+            from models.enhanced_data import EnhancedData
+            enhanced_data_obj = EnhancedData.objects.get(id=enhanced_data_id)
+            enhanced_data_obj.status = "failed"
+            enhanced_data_obj.save()
+            publish_job_progress(enhanced_data_id, "status")
         except:
             pass
@@ -1,3 +1,1116 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import threading
+import time
+from unittest.mock import patch
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from rest_framework.test import APIClient
+
+from graph.agents.composer import parse_composed_data
+from graph.agents.enhancer import enhancer_node
+from graph.agents.reviewer import ReviewerResponse
+from graph.agents.supervisor import SupervisorResponse
+from graph.instrumentation import ChunkMetrics, current_metrics, merge_metrics, metrics_totals
+from graph.models import composer_model_name, enhancer_model_name, reviewer_model_name, supervisor_model_name
+from graph.output_formats import build_response_wrapper
+from graph.preclean import field_coercer, preclean_rows
+from graph.rate_limit import LocalLimiterStore, RateLimiter
+from graph.runtime import GraphRuntime, current_job_id, runtime
+from graph.routing import validator_node
+from graph.schema_registry import SchemaRegistry, schema_fingerprint
+from graph.search_cache import RELEASE_LOCK_SCRIPT, CachedSearchTool, normalize_query, search_cache_stats
+from graph.utils import Chunker, TokenBudgetChunker, content_hash
+from main.benchmark import FakeEnhancerAgent, FakeLLM, FakeSearchTool, LocalRedis, ReplayResponses
+from main.cache import RowCache
+from main.dedup import DuplicateFanOut, EntityIndex, StreamingDeduplicator, deduplicate, find_duplicates, mark_duplicates
+from main.events import job_channel, publish_job_progress, stream_job_events
+from main.exports import stream_export
+from main.incremental import IncrementalPlan, restore_kept_fields, schema_diff
+from main.ingest import IngestError, infer_schema, iter_csv_rows, iter_json_rows
+from main.metrics import render_prometheus
+from main.tasks import (
+    build_chunk_state,
+    collect_chunk_results,
+    load_chunk,
+    process_enhancement_coordinator,
+    resume_enhancement_task,
+    save_chunk_result,
+)
+from models.enhanced_data import EnhancedData
+from models.enhanced_data_chunk import EnhancedDataChunk
+from models.original_data import OriginalData
+
+
+class CachedSearchToolTests(SimpleTestCase):
+    def setUp(self):
+        self.redis = LocalRedis()
+        self.backend = FakeSearchTool()
+        self.tool = CachedSearchTool(self.backend, self.redis, poll_interval=0.01)
+        token = current_job_id.set(42)
+        self.addCleanup(current_job_id.reset, token)
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  CEO of  Acme, Inc.? "), "ceo of acme inc")
+
+    def test_near_identical_queries_share_one_search(self):
+        first = self.tool.invoke({"query": "CEO of Acme"})
+        second = self.tool.invoke({"query": "ceo of acme?"})
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.backend.calls, 1)
+        stats = search_cache_stats(self.redis, 42)
+        self.assertEqual((stats["search_hits"], stats["search_misses"]), (1, 1))
+        self.assertEqual(stats["search_hit_rate"], 0.5)
+
+    def test_in_flight_query_is_coalesced(self):
+        key = self.tool._cache_key({"query": "CEO of Acme"})
+        self.redis.set(f"{key}:lock", "1")
+
+        def finish_other_search():
+            time.sleep(0.05)
+            self.redis.set(key, '{"results": ["from another worker"]}')
+
+        threading.Thread(target=finish_other_search).start()
+        result = self.tool.invoke({"query": "CEO of Acme"})
+
+        self.assertEqual(result, {"results": ["from another worker"]})
+        self.assertEqual(self.backend.calls, 0)
+        self.assertEqual(search_cache_stats(self.redis, 42)["search_coalesced"], 1)
+
+    def test_expired_lock_taken_by_another_worker_is_not_released(self):
+        redis_client = self.redis
+        key = self.tool._cache_key({"query": "CEO of Acme"})
+
+        class SlowSearchTool(FakeSearchTool):
+            def _run(self, query: str) -> dict:
+                # The lock expires mid-search and another worker takes it
+                redis_client.set(f"{key}:lock", "other-worker")
+                return super()._run(query)
+
+        CachedSearchTool(SlowSearchTool(), redis_client).invoke({"query": "CEO of Acme"})
+
+        self.assertEqual(self.redis.get(f"{key}:lock"), "other-worker")
+
+    def test_async_search_shares_the_cache_and_coalesces(self):
+        first = asyncio.run(self.tool.ainvoke({"query": "CEO of Acme"}))
+        second = asyncio.run(self.tool.ainvoke({"query": "ceo of acme?"}))
+        self.assertEqual(first, second)
+        self.assertEqual(self.backend.calls, 1)
+
+        key = self.tool._cache_key({"query": "CFO of Acme"})
+        self.redis.set(f"{key}:lock", "other-worker")
+
+        async def finish_other_search():
+            await asyncio.sleep(0.05)
+            self.redis.set(key, '{"results": ["from another worker"]}')
+
+        async def search_while_another_worker_searches():
+            result, _ = await asyncio.gather(self.tool.ainvoke({"query": "CFO of Acme"}), finish_other_search())
+            return result
+
+        self.assertEqual(asyncio.run(search_while_another_worker_searches()), {"results": ["from another worker"]})
+        self.assertEqual(self.backend.calls, 1)
+        self.assertEqual(search_cache_stats(self.redis, 42)["search_coalesced"], 1)
+
+    def test_release_script_is_registered_once_per_tool(self):
+        with patch.object(self.redis, "register_script", wraps=self.redis.register_script) as register_script:
+            tool = CachedSearchTool(self.backend, self.redis)
+            tool.invoke({"query": "CEO of Acme"})
+            tool.invoke({"query": "CFO of Acme"})
+
+        register_script.assert_called_once_with(RELEASE_LOCK_SCRIPT)
+        self.assertEqual(self.backend.calls, 2)
+        self.assertFalse(any(key.endswith(":lock") for key in self.redis.values))
+
+    def test_scripts_without_a_local_implementation_are_refused(self):
+        self.assertEqual(self.redis.register_script(RELEASE_LOCK_SCRIPT)(keys=["missing"], args=["token"]), 0)
+        with self.assertRaisesRegex(ValueError, "no implementation"):
+            self.redis.register_script("return redis.call('GET', KEYS[1])")
+
+
+class MessageStateTests(SimpleTestCase):
+    schema = {"id": {"type": "int"}, "name": {"type": "str"}}
+    max_reviews = 5
+
+    def setUp(self):
+        self.addCleanup(runtime.reset)
+        self.reviews = 0
+        self.routes = 0
+        self.enhancer = FakeEnhancerAgent(search_tool=FakeSearchTool())
+        self.enhancer_output('[{"id": 1, "name": "Acme"}]')
+        wrapper = build_response_wrapper(self.schema, "ComposerResponse")
+
+        def route(prompt):
+            self.routes += 1
+            cmd = "composer" if self.reviews >= self.max_reviews else "enhancer"
+            return SupervisorResponse(response="Fix the data", cmd=cmd)
+
+        def review(prompt):
+            self.reviews += 1
+            return ReviewerResponse(status="NEEDS_REVISION", reasoning="Try again")
+
+        runtime.set_model(supervisor_model_name, FakeLLM("supervisor", route), SupervisorResponse)
+        runtime.set_model(reviewer_model_name, FakeLLM("reviewer", review), ReviewerResponse)
+        runtime.set_model(
+            composer_model_name,
+            FakeLLM("composer", lambda prompt: wrapper(composed_data=[{"id": 1, "name": "Acme"}])),
+            wrapper,
+        )
+        runtime.set_resource("enhancer_agent", self.enhancer)
+        runtime.set_resource("limiter", RateLimiter(LocalLimiterStore()))
+
+    def enhancer_output(self, output):
+        self.enhancer.replay = ReplayResponses({"enhancer": [output]})
+
+    def test_state_grows_by_one_message_per_step(self):
+        states = list(runtime.graph.stream(
+            {
+                "messages": [HumanMessage("Enhance this data")],
+                "review_count": 0,
+                "schema": self.schema,
+                "context_window": 3,
+            },
+            stream_mode="values",
+        ))
+
+        message_counts = [len(state["messages"]) for state in states]
+        self.assertEqual(message_counts, list(range(1, len(states) + 1)))
+        # supervisor + (enhancer, reviewer, supervisor) per review + composer
+        self.assertEqual(len(states), 1 + 1 + 3 * self.max_reviews + 1)
+        # Task message + 3 recent messages + the new instruction, however many iterations ran
+        self.assertEqual(len(self.enhancer.message_counts), self.max_reviews)
+        self.assertLessEqual(max(self.enhancer.message_counts), 5)
+
+    def test_node_metrics_and_llm_calls_are_recorded(self):
+        runtime.set_resource("limiter", RateLimiter(LocalLimiterStore(), base_backoff=0))
+        # The first supervisor request is rate limited and retried
+        endpoint = FakeLLMEndpoint(failures=1)
+        supervisor = runtime.get_model(supervisor_model_name, SupervisorResponse)
+        route = supervisor.respond
+        supervisor.respond = lambda prompt: endpoint.invoke(prompt) and route(prompt)
+        metrics = ChunkMetrics()
+        token = current_metrics.set(metrics)
+        self.addCleanup(current_metrics.reset, token)
+
+        result = runtime.graph.invoke({
+            "messages": [HumanMessage("Enhance this data")],
+            "review_count": 0,
+            "schema": self.schema,
+            "context_window": 3,
+        })
+
+        nodes = metrics.as_dict()["nodes"]
+        self.assertEqual(nodes["enhancer"]["runs"], self.max_reviews)
+        self.assertEqual(nodes["supervisor"]["retries"], 1)
+        # supervisor per review and once more, enhancer and reviewer per review, composer once
+        self.assertEqual(result["llm_calls"], (self.max_reviews + 1) + 2 * self.max_reviews + 1)
+        self.assertEqual(result["llm_calls"], metrics_totals(metrics.as_dict())["llm_calls"])
+
+    def run_with_rules_routing(self):
+        return runtime.graph.invoke({
+            "messages": [HumanMessage("Enhance this data")],
+            "review_count": 0,
+            "schema": self.schema,
+            "rows": [{"id": 1, "name": ""}],
+            "enhancer_mode": "text",
+            "routing_mode": "rules",
+            "max_reviews": 2,
+        })
+
+    def test_rules_routing_skips_supervisor_and_reviewer_when_checks_pass(self):
+        result = self.run_with_rules_routing()
+
+        self.assertEqual(result["check_problems"], [])
+        self.assertEqual((self.routes, self.reviews), (0, 0))
+        # Enhancer and composer only
+        self.assertEqual(result["llm_calls"], 2)
+
+    def test_rules_routing_reviews_failed_checks_up_to_the_cap(self):
+        self.enhancer_output('[{"id": "one", "name": "Acme"}, {"id": 2, "name": null}]')
+
+        result = self.run_with_rules_routing()
+
+        self.assertEqual(len(result["check_problems"]), 3)
+        self.assertIn("Expected 1 rows, got 2.", result["check_problems"])
+        self.assertEqual((self.routes, self.reviews), (0, 2))
+        self.assertEqual(len(self.enhancer.message_counts), 2)
+
+    def test_parse_composer_only_sends_invalid_records_to_the_llm(self):
+        self.enhancer_output('[{"id": 1, "name": "Acme"}, {"id": "two", "name": "Beta"}]')
+        wrapper = build_response_wrapper(self.schema, "ComposerResponse")
+        prompts = []
+
+        def repair(prompt):
+            prompts.append(prompt)
+            return wrapper(composed_data=[{"id": 2, "name": "Beta"}])
+
+        runtime.set_model(composer_model_name, FakeLLM("composer", repair), wrapper)
+
+        result = runtime.graph.invoke({
+            "messages": [HumanMessage("Enhance this data")],
+            "review_count": 0,
+            "schema": self.schema,
+            "rows": [{"id": 1, "name": "Acme"}, {"id": "two", "name": "Beta"}],
+            "enhancer_mode": "text",
+            "routing_mode": "rules",
+            "composer_mode": "parse",
+            "max_reviews": 0,
+        })
+
+        self.assertEqual([row.model_dump() for row in result["composed_data"]], [{"id": 1, "name": "Acme"}, {"id": 2, "name": "Beta"}])
+        self.assertEqual(len(prompts), 1)
+        self.assertIn("'two'", prompts[0])
+        self.assertNotIn("Acme", prompts[0])
+
+    def test_columns_strategy_makes_one_call_per_missing_field(self):
+        tasks = []
+
+        class ColumnAgent(FakeEnhancerAgent):
+            def _respond(self, inputs):
+                task = inputs["messages"][0].content
+                tasks.append(task)
+                if task.startswith('Find the value of "ceo"'):
+                    return {"output": '[{"row": 1, "value": "Bob"}, {"row": 5, "value": "Nobody"}]'}
+                return {"output": '[{"row": 0, "value": "120"}, {"row": 1, "value": "many"}]'}
+
+        runtime.set_resource("enhancer_agent", ColumnAgent(search_tool=FakeSearchTool()))
+        schema = {**self.schema, "ceo": {"type": "str"}, "employees": {"type": "int"}}
+
+        result = runtime.column_filler.invoke({
+            "schema": schema,
+            "rows": [{"id": 1, "name": "Acme", "ceo": "Ann", "note": ""}, {"id": 2, "name": "Beta", "employees": "lots"}],
+        })
+
+        self.assertEqual(result["composed_data"], [
+            {"id": 1, "name": "Acme", "ceo": "Ann", "employees": 120},
+            {"id": 2, "name": "Beta", "ceo": "Bob", "employees": None},
+        ])
+        self.assertEqual(result["llm_calls"], 2)
+        # Only the rows missing a field are sent, as their key values
+        self.assertIn('{"row": 1, "name": "Beta", "employees": "lots"}', tasks[0])
+        self.assertNotIn("Acme", tasks[0])
+        self.assertIn('{"row": 0, "name": "Acme", "ceo": "Ann"}', tasks[1])
+
+    def test_async_execution_runs_the_same_graph(self):
+        state = {
+            "messages": [HumanMessage("Enhance this data")],
+            "review_count": 0,
+            "schema": self.schema,
+            "context_window": 3,
+        }
+
+        async def run_concurrently():
+            return await asyncio.gather(*(runtime.graph.ainvoke(dict(state)) for _ in range(3)))
+
+        results = asyncio.run(run_concurrently())
+
+        for result in results:
+            self.assertEqual([row.model_dump() for row in result["composed_data"]], [{"id": 1, "name": "Acme"}])
+        # Every graph went through the enhancer at least once
+        self.assertGreaterEqual(len(self.enhancer.message_counts), 3)
+
+    def test_async_batches_share_the_loop_pooled_clients_are_bound_to(self):
+        composer = runtime.get_model(composer_model_name, build_response_wrapper(self.schema, "ComposerResponse"))
+        respond = composer.respond
+        loops = []
+
+        class LoopBoundComposer(FakeLLM):
+            # Like a gRPC aio channel, created on first use and unusable from any other loop
+            async def ainvoke(self, prompt):
+                loop = asyncio.get_running_loop()
+                if loops and (loops[0] is not loop or loops[0].is_closed()):
+                    raise RuntimeError("Task got Future attached to a different loop")
+                loops.append(loop)
+                return self.respond(prompt)
+
+        runtime.set_model(composer_model_name, LoopBoundComposer("composer", respond), build_response_wrapper(self.schema, "ComposerResponse"))
+        state = {
+            "messages": [HumanMessage("Enhance this data")],
+            "review_count": 0,
+            "schema": self.schema,
+            "context_window": 3,
+        }
+
+        # Two batch tasks in a row in the same worker process
+        for _ in range(2):
+            self.reviews = 0
+            result = runtime.run_async(runtime.graph.ainvoke(dict(state)))
+            self.assertEqual([row.model_dump() for row in result["composed_data"]], [{"id": 1, "name": "Acme"}])
+        self.assertEqual(len(loops), 2)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RateLimitedError(Exception):
+    code = 429
+
+
+class FakeLLMEndpoint:
+    """Local LLM endpoint that answers 429 for its first `failures` requests."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.requests = 0
+
+    def invoke(self, prompt):
+        self.requests += 1
+        if self.requests <= self.failures:
+            raise RateLimitedError("429 RESOURCE_EXHAUSTED")
+        return f"answer to {prompt}"
+
+
+class ToolCallingModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+class RateLimiterTests(SimpleTestCase):
+    model_name = "fake-model"
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(
+            LocalLimiterStore(clock=self.clock),
+            limits=lambda model_name: {"rpm": 60, "tpm": 600},
+            sleep=self.clock.sleep,
+        )
+
+    def test_token_budget_is_shared_between_requests(self):
+        self.limiter.acquire(self.model_name, 600)
+        self.limiter.acquire(self.model_name, 300)
+
+        # The token bucket refills at 600 tokens per minute, so the second request waits 30s
+        self.assertAlmostEqual(sum(self.clock.sleeps), 30)
+
+    def test_429_backs_off_and_lowers_concurrency(self):
+        endpoint = FakeLLMEndpoint(failures=2)
+
+        result = self.limiter.call(self.model_name, 10, lambda: endpoint.invoke("hi"))
+
+        self.assertEqual(result, "answer to hi")
+        self.assertEqual(endpoint.requests, 3)
+        self.assertEqual(len(self.clock.sleeps), 2)
+        # Halved twice, plus what recovered during the (at most 3s of) backoff
+        self.assertGreaterEqual(self.limiter.scale(self.model_name), 0.25)
+        self.assertLess(self.limiter.scale(self.model_name), 0.25 + 3 * self.limiter.recovery_rate)
+        self.assertEqual(self.limiter.concurrency(self.model_name, 8), 2)
+
+    def test_scale_recovers_with_time_not_with_calls(self):
+        self.limiter.on_throttle(self.model_name)
+        for _ in range(20):
+            self.limiter.call(self.model_name, 1, lambda: "ok")
+        self.assertEqual(self.limiter.scale(self.model_name), 0.5)
+
+        self.clock.now += 25
+        self.assertAlmostEqual(self.limiter.scale(self.model_name), 0.75)
+        # A 429 halves the recovered scale, not the stored one
+        self.limiter.on_throttle(self.model_name)
+        self.assertAlmostEqual(self.limiter.scale(self.model_name), 0.375)
+
+        self.clock.now += 3600
+        self.assertEqual(self.limiter.scale(self.model_name), 1.0)
+
+    def test_gives_up_after_max_retries(self):
+        endpoint = FakeLLMEndpoint(failures=100)
+
+        with self.assertRaises(RateLimitedError):
+            self.limiter.call(self.model_name, 10, lambda: endpoint.invoke("hi"))
+        self.assertEqual(endpoint.requests, self.limiter.max_retries + 1)
+        self.assertLess(self.limiter.scale(self.model_name), 0.25)
+
+    def test_scale_never_drops_below_the_minimum(self):
+        for _ in range(10):
+            self.limiter.on_throttle(self.model_name)
+
+        self.assertEqual(self.limiter.scale(self.model_name), self.limiter.min_scale)
+
+    def test_chunk_slots_wait_for_a_free_slot(self):
+        self.limiter.on_throttle(self.model_name)
+        self.limiter.on_throttle(self.model_name)
+
+        with self.limiter.chunk_slot(self.model_name, max_concurrency=4):
+            # Scale 0.25 of 4 slots leaves one, so the lease of the first chunk must expire first
+            with self.limiter.chunk_slot(self.model_name, max_concurrency=4, lease=5):
+                pass
+        self.assertGreaterEqual(sum(self.clock.sleeps), 5)
+
+    def test_each_model_call_of_an_agent_run_takes_a_token(self):
+        self.addCleanup(runtime.reset)
+        search = {"name": "tavily_search", "args": {"query": "CEO of Acme"}}
+        runtime.set_model(enhancer_model_name, ToolCallingModel(messages=iter([
+            AIMessage("", tool_calls=[{**search, "id": "1"}]),
+            AIMessage("", tool_calls=[{**search, "id": "2"}]),
+            AIMessage("TASK COMPLETED: added the CEO."),
+        ])))
+        runtime.set_resource("search_tool", FakeSearchTool())
+        runtime.set_resource("limiter", self.limiter)
+        requests = []
+
+        with patch.object(self.limiter, "acquire", lambda model_name, tokens: requests.append(model_name)):
+            result = enhancer_node({"messages": [HumanMessage("Add the CEO of every company")]})
+
+        self.assertEqual(result["enhanced_data"], ["TASK COMPLETED: added the CEO."])
+        # Two tool rounds and the final answer
+        self.assertEqual(requests, [enhancer_model_name] * 3)
+
+
+class TokenBudgetChunkerTests(SimpleTestCase):
+    schema = {"id": {"type": "int"}, "name": {"type": "str"}, "ceo": {"type": "str"}}
+
+    def setUp(self):
+        self.rows = [{"id": i, "name": f"Company {i}"} for i in range(7)]
+        self.row_tokens = TokenBudgetChunker(self.rows, self.schema, 1).estimate_row_tokens(self.rows[0])
+
+    def test_chunks_are_split_at_the_token_budget(self):
+        chunker = TokenBudgetChunker(self.rows, self.schema, token_budget=3 * self.row_tokens)
+
+        self.assertEqual(list(chunker.ranges()), [(0, 3), (3, 6), (6, 7)])
+        self.assertEqual([len(chunk) for chunk in chunker.chunk()], [3, 3, 1])
+
+    def test_row_over_the_budget_gets_a_chunk_of_its_own(self):
+        self.rows[1]["name"] = "x" * 100 * self.row_tokens
+        chunker = TokenBudgetChunker(self.rows, self.schema, token_budget=3 * self.row_tokens)
+
+        self.assertEqual(list(chunker.ranges())[:3], [(0, 1), (1, 2), (2, 5)])
+
+    def test_rows_are_read_lazily_one_chunk_ahead(self):
+        read = []
+
+        def stream():
+            for row in self.rows:
+                read.append(row["id"])
+                yield row
+
+        spans = TokenBudgetChunker(stream(), self.schema, token_budget=3 * self.row_tokens).spans()
+
+        self.assertEqual(next(spans), (0, self.rows[:3]))
+        # The fourth row is read to find the end of the first chunk, no more
+        self.assertEqual(read, [0, 1, 2, 3])
+        self.assertEqual([start for start, _ in spans], [3, 6])
+
+    def test_invalid_data_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Chunker({"id": 1}, 10)
+        with self.assertRaises(ValueError):
+            list(Chunker(iter([{"id": 1}, "two"]), 10).chunk())
+        with self.assertRaises(ValueError):
+            list(Chunker(iter([]), 10).ranges())
+
+    def test_string_specs_cost_the_same_as_dict_specs(self):
+        string_schema = {"id": "int", "name": "str", "ceo": "str | null"}
+        chunker = TokenBudgetChunker(self.rows, string_schema, token_budget=3 * self.row_tokens)
+
+        self.assertEqual(chunker.estimate_row_tokens(self.rows[0]), self.row_tokens)
+        self.assertEqual(list(chunker.ranges()), [(0, 3), (3, 6), (6, 7)])
+
+    def test_skipped_rows_cost_no_tokens(self):
+        skip = [i % 2 == 1 for i in range(7)]
+        chunker = TokenBudgetChunker(self.rows, self.schema, token_budget=2 * self.row_tokens, skip=skip)
+
+        # Two rows for the LLM per chunk, plus the resolved rows between them
+        self.assertEqual(list(chunker.ranges()), [(0, 4), (4, 7)])
+
+
+class PrecleanTests(SimpleTestCase):
+    def test_coercion_table(self):
+        cases = [
+            ("int", "1,234", 1234),
+            ("int", " 42 ", 42),
+            ("int", "3.0", 3),
+            ({"type": "int | null"}, 7.0, 7),
+            ("float", "2_500.5", 2500.5),
+            ("float", 3, 3.0),
+            ("bool", "Yes", True),
+            ("bool", "f", False),
+            ("bool", 0, False),
+            ("str", 12, "12"),
+            ({"type": "text"}, "free text", "free text"),
+        ]
+        for spec, value, expected in cases:
+            with self.subTest(spec=spec, value=value):
+                result = field_coercer(spec)(value)
+                self.assertEqual(result, expected)
+                self.assertIs(type(result), type(expected))
+
+    def test_lossy_coercions_are_refused(self):
+        cases = [("int", "3.5"), ("int", True), ("int", "many"), ("float", "nan"), ("bool", "maybe"), ("bool", 2), ("str", ["a"])]
+        for spec, value in cases:
+            with self.subTest(spec=spec, value=value), self.assertRaises(ValueError):
+                field_coercer(spec)(value)
+
+    def test_only_complete_rows_bypass_the_llm(self):
+        schema = {"id": {"type": "int"}, "name": {"type": "str"}, "active": {"type": "bool"}}
+        rows = [
+            {"id": "1", "name": "  Acme   Inc ", "active": "yes", "note": "keep  me"},
+            {"id": "two", "name": "Beta", "active": "no"},
+            {"id": "3", "name": "", "active": "true"},
+        ]
+
+        cleaned, resolved = preclean_rows(rows, schema)
+
+        self.assertEqual(cleaned[0], {"id": 1, "name": "Acme Inc", "active": True, "note": "keep me"})
+        self.assertEqual(cleaned[1], {"id": "two", "name": "Beta", "active": False})
+        self.assertEqual(resolved, [{"id": 1, "name": "Acme Inc", "active": True}, None, None])
+
+
+class IngestTests(SimpleTestCase):
+    def test_json_array_is_parsed_across_reads(self):
+        data = b'[{"id": 12345, "tags": ["a"], "note": null}, {"id": 2, "ok": true}]'
+        rows = list(iter_json_rows(io.BytesIO(data), read_size=1))
+        # One byte at a time, so every value straddles a read boundary
+        self.assertEqual(rows, [{"id": "12345", "tags": '["a"]', "note": ""}, {"id": "2", "ok": "true"}])
+
+    def test_jsonl_and_csv_give_the_same_rows(self):
+        jsonl = io.BytesIO(b'{"id": 1, "name": "Acme, Inc"}\n{"id": 2, "name": "Beta"}\n')
+        csv_file = io.BytesIO(b'id,name\n1,"Acme, Inc"\n\n2,Beta\n')
+
+        self.assertEqual(list(iter_json_rows(jsonl)), list(iter_csv_rows(csv_file)))
+
+    def test_unclosed_array_is_an_error(self):
+        with self.assertRaises(IngestError):
+            list(iter_json_rows(io.BytesIO(b'[{"id": 1},')))
+
+    def test_malformed_record_fails_without_reading_the_rest(self):
+        valid = b"".join(b'{"id": %d, "name": "Acme \\u00e9"}\n' % i for i in range(10000))
+        file = io.BytesIO(b'{"id": 1, "name": Acme}\n' + valid)
+
+        with self.assertRaisesMessage(IngestError, "Expecting value"):
+            list(iter_json_rows(file, read_size=64))
+        self.assertEqual(file.tell(), 64)
+
+    def test_values_cut_off_at_any_read_boundary_are_parsed(self):
+        data = b'[{"name": "Acme \\u00e9 \\"Inc\\"", "score": -1.5e3, "ok": false, "tags": null}]'
+        expected = [{"name": 'Acme \u00e9 "Inc"', "score": "-1500.0", "ok": "false", "tags": ""}]
+
+        for read_size in range(1, len(data) + 1):
+            self.assertEqual(list(iter_json_rows(io.BytesIO(data), read_size=read_size)), expected)
+
+    def test_infer_schema(self):
+        rows = [
+            {"id": "1", "score": "1", "ok": "true", "name": "Acme", "empty": ""},
+            {"id": "2", "score": "2.5", "ok": "False", "name": "3", "empty": ""},
+        ]
+        self.assertEqual(
+            infer_schema(rows),
+            {"id": "int", "score": "float", "ok": "bool", "name": "str", "empty": "str"},
+        )
+
+
+class ExportTests(SimpleTestCase):
+    schema = {"id": {"type": "int"}, "name": {"type": "str"}, "active": {"type": "bool"}}
+
+    def test_csv_follows_the_schema_columns(self):
+        rows = iter([{"name": "Acme, Inc", "id": 1, "active": True, "extra": "x"}, {"id": 2}])
+
+        self.assertEqual(
+            "".join(stream_export(rows, self.schema, "csv")),
+            'id,name,active\r\n1,"Acme, Inc",true\r\n2,,\r\n',
+        )
+
+    def test_exports_are_streamed_in_batches(self):
+        rows = ({"id": i, "name": str(i), "active": False} for i in range(2500))
+
+        chunks = list(stream_export(rows, self.schema, "jsonl"))
+
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(sum(chunk.count("\n") for chunk in chunks), 2500)
+
+    def test_parquet_round_trips_typed_columns(self):
+        import pyarrow.parquet as pq
+
+        # String specs, as original data schemas use, and dict specs
+        schema = {"id": "int", "name": "str | None", "active": {"type": "bool"}, "score": {"type": "float"}}
+        rows = iter([
+            {"id": 1, "name": "Acme", "active": True, "score": 1.5},
+            {"id": "2", "name": None, "active": "no", "score": "n/a"},
+        ])
+
+        table = pq.read_table(io.BytesIO(b"".join(stream_export(rows, schema, "parquet"))))
+
+        self.assertEqual([str(field.type) for field in table.schema], ["int64", "string", "bool", "double"])
+        self.assertEqual(table.to_pylist(), [
+            {"id": 1, "name": "Acme", "active": True, "score": 1.5},
+            {"id": 2, "name": None, "active": False, "score": None},
+        ])
+
+
+class MetricsTests(SimpleTestCase):
+    def test_chunk_metrics_add_up_to_prometheus_counters(self):
+        chunk = {
+            "nodes": {"enhancer": {"llm_calls": 2, "prompt_tokens": 100, "seconds": 1.5}},
+            "tools": {"tavily_search": {"calls": 3, "cache_hits": 1}},
+        }
+
+        job = merge_metrics(chunk, chunk, {})
+        text = render_prometheus(job, {"complete": 2, "pending": 0})
+
+        self.assertEqual(job["nodes"]["enhancer"], {"llm_calls": 4, "prompt_tokens": 200, "seconds": 3.0})
+        self.assertEqual(metrics_totals(job)["tool_cache_hits"], 2)
+        self.assertIn('demas_llm_calls_total{node="enhancer"} 4\n', text)
+        self.assertIn('demas_node_seconds_total{node="enhancer"} 3\n', text)
+        self.assertIn('demas_tool_cache_hits_total{tool="tavily_search"} 2\n', text)
+        self.assertIn('# TYPE demas_jobs gauge\ndemas_jobs{status="complete"} 2\ndemas_jobs{status="pending"} 0\n', text)
+
+
+class SchemaRegistryTests(SimpleTestCase):
+    schema = {"id": {"type": "int"}, "name": {"type": "str", "description": "Company name"}}
+
+    def test_fingerprint_normalises_type_spelling_but_not_field_order(self):
+        self.assertEqual(
+            schema_fingerprint({"id": "int", "name": "str"}),
+            schema_fingerprint({"id": {"type": " INT "}, "name": {"type": "str", "description": ""}}),
+        )
+        self.assertNotEqual(schema_fingerprint({"id": "int", "name": "str"}), schema_fingerprint({"name": "str", "id": "int"}))
+
+    def test_compiled_schemas_are_reused_and_evicted_least_recently_used_first(self):
+        registry = SchemaRegistry(max_size=2)
+        first = registry.get(self.schema)
+        registry.get({"id": {"type": "int"}})
+        self.assertIs(registry.get(dict(self.schema)), first)
+
+        registry.get({"name": {"type": "str"}})
+
+        self.assertEqual(len(registry), 2)
+        self.assertIs(registry.get(self.schema), first)
+        self.assertIsNot(registry.get({"id": {"type": "int"}}).model, first.model)
+
+    def test_chunk_is_validated_in_batch(self):
+        compiled = SchemaRegistry().get(self.schema)
+
+        validated, errors = compiled.validate_rows([{"id": 1, "name": "Acme"}, {"id": "two", "name": "Beta"}, {"id": "3", "name": "Gamma"}])
+
+        self.assertEqual([record and record.id for record in validated], [1, None, 3])
+        self.assertEqual([error["loc"] for error in errors], [(1, "id")])
+        self.assertEqual(compiled.row_errors([{"id": 1, "name": "Acme"}]), [])
+
+    def test_structured_model_pool_is_bounded(self):
+        class FakeChatModel:
+            def with_structured_output(self, schema):
+                return FakeLLM("composer", lambda prompt: schema)
+
+        pool = GraphRuntime(structured_pool_size=2)
+        pool.set_model("fake-model", FakeChatModel())
+        wrappers = [SchemaRegistry().get({f"field_{i}": "str"}).wrapper for i in range(3)]
+        first = pool.get_model("fake-model", wrappers[0])
+        self.assertIs(pool.get_model("fake-model", wrappers[0]), first)
+
+        for wrapper in wrappers[1:]:
+            pool.get_model("fake-model", wrapper)
+
+        self.assertEqual(len(pool._structured_models), 2)
+        self.assertIsNot(pool.get_model("fake-model", wrappers[0]), first)
+
+
+class FakePreviousJob:
+    """Stand-in for a previous EnhancedData whose rows are looked up by source hash."""
+
+    def __init__(self, schema, rows_by_source):
+        self.schema = schema
+        self.rows = self
+        self.rows_by_source = rows_by_source
+
+    def filter(self, source_hash__in):
+        self.found = [(h, self.rows_by_source[h]) for h in source_hash__in if h in self.rows_by_source]
+        return self
+
+    def values_list(self, *fields):
+        return self.found
+
+
+class IncrementalTests(SimpleTestCase):
+    schema = {"id": {"type": "int"}, "name": {"type": "str"}, "ceo": {"type": "str", "description": "CEO"}}
+    rows = [{"id": 1, "name": "acme"}, {"id": 2, "name": "beta"}]
+
+    def previous_job(self, schema):
+        return FakePreviousJob(schema, {content_hash(self.rows[0]): {"id": 1, "name": "Acme", "ceo": "Ann"}})
+
+    def test_schema_diff_treats_changed_fields_as_new(self):
+        diff = schema_diff(self.schema, {"id": "int", "ceo": {"type": "str"}, "hq": {"type": "str"}})
+
+        self.assertEqual(diff, {"kept": ["id"], "new": ["ceo", "hq"], "removed": ["name"]})
+
+    def test_unchanged_rows_are_copied_forward(self):
+        plan = IncrementalPlan(self.previous_job(self.schema), self.schema)
+        resolved = [None, None]
+
+        carried = plan.apply(self.rows, [dict(row) for row in self.rows], resolved)
+
+        self.assertEqual(resolved, [{"id": 1, "name": "Acme", "ceo": "Ann"}, None])
+        self.assertEqual(carried, [None, None])
+        self.assertEqual(plan.stats(), {"rows_copied": 1, "rows_new_fields_only": 0})
+
+    def test_only_new_fields_come_from_the_graph(self):
+        plan = IncrementalPlan(self.previous_job(self.schema), {**self.schema, "hq": {"type": "str"}})
+        cleaned = [dict(row) for row in self.rows]
+
+        carried = plan.apply(self.rows, cleaned, [None, None])
+        enhanced = restore_kept_fields([{**cleaned[0], "ceo": "Bob", "hq": "Zagreb"}], carried[:1])
+
+        self.assertEqual(cleaned[0], {"id": 1, "name": "Acme", "ceo": "Ann"})
+        self.assertEqual(enhanced, [{"id": 1, "name": "Acme", "ceo": "Ann", "hq": "Zagreb"}])
+        self.assertEqual(plan.stats(), {"rows_copied": 0, "rows_new_fields_only": 1})
+
+
+class DedupTests(SimpleTestCase):
+    schema = {"id": {"type": "int"}, "company": {"type": "str"}, "ceo": {"type": "str", "description": "CEO"}}
+    rows = [
+        {"id": 1, "company": "ACME, Inc."},
+        {"id": 2, "company": "Beta"},
+        {"id": 3, "company": "acme"},
+        {"id": 4, "company": "Acmee"},
+        {"id": 5, "company": ""},
+    ]
+
+    def test_keys_match_exactly_after_normalisation(self):
+        self.assertEqual(find_duplicates(self.rows, range(5), ["company"]), {2: 0})
+
+    def test_fuzzy_threshold_matches_similar_keys(self):
+        self.assertEqual(find_duplicates(self.rows, range(5), ["company"], fuzzy_threshold=0.8), {2: 0, 3: 0})
+
+    def test_fuzzy_matches_are_searched_within_a_bounded_block(self):
+        rows = [{"company": name} for name in ("Acme Alpha", "Acme Bravo", "Acme Charlie", "Acme Alpah", "Xacme Alpha")]
+
+        self.assertEqual(find_duplicates(rows, range(5), ["company"], fuzzy_threshold=0.8), {3: 0})
+        # Only the two latest keys starting with "acm" are compared, and "Acme Alpha" is no longer one of them
+        index = EntityIndex(["company"], fuzzy_threshold=0.8, max_block_size=2)
+        self.assertEqual([index.add(i, row) for i, row in enumerate(rows)], [None] * 5)
+        self.assertEqual(list(index.blocks["acm"]), ["acme charlie", "acme alpah"])
+
+    def test_members_only_take_the_enrichment_fields(self):
+        duplicates, fields = deduplicate(self.rows, range(5), self.schema, ["company"])
+        resolved = [None] * 5
+        mark_duplicates(self.rows, resolved, self.schema, list(duplicates))
+        enhanced = [{"id": 1, "company": "Acme", "ceo": "Ann"}, {"id": 2, "company": "Beta", "ceo": "Bob"}, resolved[2]]
+
+        rows = list(DuplicateFanOut([duplicates], fields).apply(0, enhanced, {"2": 0}))
+
+        self.assertEqual(fields, ["ceo"])
+        self.assertEqual(resolved[2], {"id": 3, "company": "acme", "ceo": None})
+        self.assertEqual(rows[2], (2, {"id": 3, "company": "acme", "ceo": "Ann"}))
+        # Without its representative's row a member is left out
+        self.assertEqual(list(DuplicateFanOut([{"0": 0}], fields).apply(1, enhanced[2:], {"0": 0})), [])
+
+    def test_members_with_an_invalid_source_field_are_enhanced_on_their_own(self):
+        rows = [{"id": 1, "company": "Acme"}, {"id": "three", "company": "acme"}, {"id": None, "company": "acme"}]
+
+        duplicates, fields = deduplicate(rows, range(3), self.schema, ["company"])
+
+        # Their id would otherwise be taken from the representative
+        self.assertEqual((duplicates, fields), ({}, ["ceo"]))
+
+
+    def test_streaming_matches_the_whole_dataset_at_once(self):
+        duplicates, fields = deduplicate(self.rows, range(5), self.schema, ["company"], fuzzy_threshold=0.8)
+        deduplicator = StreamingDeduplicator(self.schema, fields, ["company"], fuzzy_threshold=0.8)
+        streamed = {}
+        for start in range(0, 5, 2):
+            batch = [dict(row) for row in self.rows[start:start + 2]]
+            streamed.update(deduplicator.apply(start, batch, [None] * len(batch), [None] * len(batch)))
+
+        self.assertEqual(streamed, duplicates)
+        self.assertEqual(deduplicator.stats(), {"rows_deduplicated": 2, "dedup_ratio": 0.4})
+
+
+def create_job(rows, schema, chunk_ranges):
+    """An enhancement job over `rows` with a pending chunk per (start, end) range."""
+    original_data = OriginalData.objects.create(schema={})
+    original_data.set_rows(rows)
+    enhanced_data = EnhancedData.objects.create(original_data=original_data, schema=schema, total_chunks=len(chunk_ranges))
+    for chunk_index, (start_row, end_row) in enumerate(chunk_ranges):
+        EnhancedDataChunk.objects.create(enhanced_data=enhanced_data, chunk_index=chunk_index, start_row=start_row, end_row=end_row)
+    return enhanced_data
+
+
+class RowStorageTests(TestCase):
+    def test_rows_are_stored_in_batches_and_streamed_by_range(self):
+        original_data = OriginalData.objects.create(schema={})
+        rows = [{"id": i, "name": f"Company {i}"} for i in range(5)]
+
+        self.assertEqual(original_data.set_rows(rows, batch_size=2), 5)
+
+        self.assertEqual(list(original_data.iter_rows()), rows)
+        self.assertEqual(list(original_data.iter_rows(1, 3, chunk_size=1)), rows[1:3])
+        self.assertEqual(original_data.rows.get(row_index=4).content_hash, content_hash(rows[4]))
+        self.assertEqual(OriginalData.objects.get(id=original_data.id).row_count, 5)
+
+    def test_set_rows_replaces_every_row(self):
+        enhanced_data = create_job([{"id": 1}, {"id": 2}], {}, [])
+        enhanced_data.set_rows([{"id": 1}, {"id": 2}])
+
+        enhanced_data.set_rows([{"id": 2, "ceo": "Bo"}], source_hashes=["abc"])
+
+        self.assertEqual(list(enhanced_data.iter_rows()), [{"id": 2, "ceo": "Bo"}])
+        self.assertEqual(list(enhanced_data.rows.values_list("row_index", "source_hash")), [(0, "abc")])
+        self.assertEqual(enhanced_data.row_count, 1)
+
+
+class ChunkProgressTests(TestCase):
+    schema = {"id": {"type": "int"}, "ceo": {"type": "str"}}
+
+    def setUp(self):
+        self.addCleanup(runtime.reset)
+        self.redis = LocalRedis()
+        runtime.set_resource("redis", self.redis)
+        self.job = create_job([{"id": i} for i in range(4)], self.schema, [(0, 2), (2, 4)])
+
+    def test_finished_chunks_are_readable_before_the_job_completes(self):
+        rows = [{"id": 2, "ceo": "Cy"}, {"id": 3, "ceo": "Di"}]
+        save_chunk_result(self.job.id, {"chunk_index": 1, "success": True, "data": rows, "error": None})
+        save_chunk_result(self.job.id, {"chunk_index": 0, "success": False, "data": None, "error": "timeout"})
+
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.chunks_done, self.job.chunks_failed), ("pending", 1, 1))
+        self.assertEqual(list(self.job.iter_partial_rows()), rows)
+        self.assertEqual(
+            [(message["chunk_index"], message["chunks_done"], message["chunks_failed"]) for _, message in self.redis.messages],
+            [(1, 1, 0), (0, 1, 1)],
+        )
+
+
+class JobEventStreamTests(TestCase):
+    def setUp(self):
+        self.addCleanup(runtime.reset)
+        self.redis = LocalRedis()
+        runtime.set_resource("redis", self.redis)
+        self.job = create_job([{"id": 1}, {"id": 2}], {"id": {"type": "int"}}, [(0, 1), (1, 2)])
+
+    def test_snapshot_comes_first_and_a_finished_job_ends_the_stream(self):
+        EnhancedData.objects.filter(id=self.job.id).update(status="complete", chunks_done=2)
+
+        events = list(stream_job_events(self.job, heartbeat_seconds=0.01))
+
+        self.assertEqual(len(events), 1)
+        self.assertTrue(events[0].startswith("event: status\n"))
+        self.assertEqual(json.loads(events[0].split("data: ", 1)[1])["chunks_done"], 2)
+        self.assertEqual(self.redis.subscribers[job_channel(self.job.id)], [])
+
+    def test_events_are_relayed_until_the_job_finishes(self):
+        stream = stream_job_events(self.job, heartbeat_seconds=0.01)
+
+        self.assertIn('"status": "pending"', next(stream))
+        # Nothing published within the heartbeat
+        self.assertEqual(next(stream), ": keep-alive\n\n")
+
+        publish_job_progress(self.job.id, "chunk", chunk_index=0)
+        EnhancedData.objects.filter(id=self.job.id).update(status="failed", chunks_done=1, chunks_failed=1)
+        publish_job_progress(self.job.id, "status")
+        publish_job_progress(self.job.id, "status")
+
+        events = list(stream)
+        self.assertEqual([event.split("\n", 1)[0] for event in events], ["event: chunk", "event: status"])
+        self.assertEqual(json.loads(events[0].split("data: ", 1)[1])["chunk_index"], 0)
+        self.assertIn('"status": "failed"', events[1])
+        self.assertEqual(self.redis.subscribers[job_channel(self.job.id)], [])
+
+
+class CoordinatorTests(TestCase):
+    schema = {"id": {"type": "int"}, "ceo": {"type": "str"}}
+
+    def setUp(self):
+        self.addCleanup(runtime.reset)
+        runtime.set_resource("redis", LocalRedis())
+
+    @override_settings(ENHANCEMENT_MAX_CHUNK_SIZE=2, ENHANCEMENT_CHUNK_TOKEN_BUDGET=10 ** 9, ENHANCEMENT_DEDUP_KEY_FIELDS=[])
+    def test_chunk_tasks_get_ids_only_and_read_their_rows_from_the_database(self):
+        rows = [{"id": " 1 ", "ceo": "Al"}, {"id": 2, "ceo": "Bo"}, {"id": 3}, {"id": "4"}, {"id": 5}]
+        job = create_job(rows, self.schema, [])
+
+        with patch("main.tasks.chord") as chord:
+            process_enhancement_coordinator(job.id)
+
+        tasks = chord.call_args.args[0].tasks
+        # The two complete rows cost nothing, so the first chunk takes them plus two rows for the LLM
+        self.assertEqual([task.args for task in tasks], [(job.id, 0), (job.id, 1)])
+        schema_dict, fingerprint, cleaned_rows, resolved_rows, carried_rows = load_chunk(job.id, 0)
+        self.assertEqual((schema_dict, fingerprint), (self.schema, job.schema_fingerprint))
+        self.assertEqual(cleaned_rows, [{"id": 1, "ceo": "Al"}, {"id": 2, "ceo": "Bo"}, {"id": 3}, {"id": 4}])
+        self.assertEqual(resolved_rows, [{"id": 1, "ceo": "Al"}, {"id": 2, "ceo": "Bo"}, None, None])
+        self.assertEqual(carried_rows, [None] * 4)
+        self.assertEqual(load_chunk(job.id, 1)[2:4], ([{"id": 5}], [None]))
+
+    def test_the_stored_schema_fingerprint_is_used_instead_of_rehashing_the_schema(self):
+        job = create_job([{"id": 1}], self.schema, [(0, 1)])
+        _, fingerprint, chunk, _, _ = load_chunk(job.id, 0)
+        state = {**build_chunk_state(chunk, self.schema, fingerprint), "enhanced_data": [{"id": 1, "ceo": "Al"}]}
+        self.assertEqual(state["schema_fingerprint"], schema_fingerprint(self.schema))
+
+        with patch("graph.schema_registry.schema_fingerprint", side_effect=AssertionError("schema hashed again")):
+            self.assertEqual(validator_node(state)["check_problems"], [])
+            composed, invalid = parse_composed_data(state)
+
+        self.assertEqual([record.model_dump() for record in composed], [{"id": 1, "ceo": "Al"}])
+        self.assertEqual(invalid, [])
+
+
+class ResumeTests(TestCase):
+    schema = {"id": {"type": "int"}, "ceo": {"type": "str"}}
+
+    def setUp(self):
+        self.addCleanup(runtime.reset)
+        runtime.set_resource("redis", LocalRedis())
+        self.job = create_job([{"id": i} for i in range(6)], self.schema, [(0, 2), (2, 4), (4, 6)])
+        self.job.chunks.filter(chunk_index=0).update(status="complete", data=[{"id": 0, "ceo": "Al"}, {"id": 1, "ceo": "Bo"}])
+        self.job.chunks.filter(chunk_index=1).update(status="failed", error="timeout")
+
+    def test_resume_reruns_only_unfinished_chunks_and_keeps_the_row_order(self):
+        with patch("main.tasks.chord") as chord:
+            resume_enhancement_task(self.job.id)
+
+        self.assertEqual([task.args for task in chord.call_args.args[0].tasks], [(self.job.id, 1), (self.job.id, 2)])
+
+        # Resumed chunks may finish in any order
+        for chunk_index, ceos in ((2, ["Ed", "Fa"]), (1, ["Cy", "Di"])):
+            rows = [{"id": 2 * chunk_index + i, "ceo": ceo} for i, ceo in enumerate(ceos)]
+            save_chunk_result(self.job.id, {"chunk_index": chunk_index, "success": True, "data": rows, "error": None})
+        collect_chunk_results([], self.job.id, 3)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, "complete")
+        self.assertEqual([row["ceo"] for row in self.job.iter_rows()], ["Al", "Bo", "Cy", "Di", "Ed", "Fa"])
+
+
+    def test_resume_only_adds_the_new_cache_hits_to_the_stats(self):
+        self.job.chunks.filter(chunk_index__gte=1).update(resolved=[None, None])
+        EnhancedData.objects.filter(id=self.job.id).update(stats={"rows_bypassed": 0, "cache_hits": 0, "cache_misses": 4})
+        RowCache(self.schema).set_many([{"id": 2}], [{"id": 2, "ceo": "Cy"}])
+
+        with patch("main.tasks.chord"):
+            resume_enhancement_task(self.job.id)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.stats, {"rows_bypassed": 0, "cache_hits": 1, "cache_misses": 3})
+        self.assertEqual(self.job.chunks.get(chunk_index=1).resolved, [{"id": 2, "ceo": "Cy"}, None])
+
+
+class RowCacheTests(TestCase):
+    schema = {"id": {"type": "int"}, "ceo": {"type": "str"}}
+    row = {"id": 1, "name": "Acme"}
+
+    @override_settings(ENHANCEMENT_ENHANCER_MODE="text")
+    def test_prompt_changes_miss_the_cache(self):
+        key = RowCache(self.schema).key(self.row)
+
+        self.assertEqual(RowCache(dict(self.schema)).key(dict(self.row)), key)
+        with patch("main.cache.prompt_version", "next"):
+            self.assertNotEqual(RowCache(self.schema).key(self.row), key)
+        # Patch output is not interchangeable with full-row output
+        with override_settings(ENHANCEMENT_ENHANCER_MODE="patch"):
+            self.assertNotEqual(RowCache(self.schema).key(self.row), key)
+
+    def test_cached_rows_hit_until_the_prompt_version_changes(self):
+        cache = RowCache(self.schema)
+        self.assertEqual(cache.get_many([self.row]), [None])
+        cache.set_many([self.row], [{"id": 1, "ceo": "Ann"}])
+
+        cache = RowCache(self.schema)
+        self.assertEqual(cache.get_many([dict(self.row), {"id": 2, "name": "Beta"}]), [{"id": 1, "ceo": "Ann"}, None])
+        self.assertEqual(cache.stats(), {"cache_hits": 1, "cache_misses": 1})
+        with patch("main.cache.prompt_version", "next"):
+            self.assertEqual(RowCache(self.schema).get_many([self.row]), [None])
+
+    def test_evict_drops_expired_then_least_recently_used_entries(self):
+        cache = RowCache(self.schema)
+        rows = [{"id": i, "name": f"Company {i}"} for i in range(3)]
+        cache.set_many(rows, [{"id": i, "ceo": None} for i in range(3)])
+        cache.get_many(rows[:1])
+
+        self.assertEqual(RowCache.evict(max_entries=1), 2)
+        self.assertEqual(cache.get_many(rows), [{"id": 0, "ceo": None}, None, None])
+        self.assertEqual(RowCache.evict(ttl=-1), 1)
+
+
+class ApiViewTests(TestCase):
+    schema = {"id": {"type": "int"}, "ceo": {"type": "str"}}
+
+    def setUp(self):
+        self.addCleanup(runtime.reset)
+        runtime.set_resource("redis", LocalRedis())
+        self.client = APIClient()
+        self.rows = [{"id": i, "ceo": f"CEO {i}"} for i in range(5)]
+
+    def create_enhancement(self, original_data, status="complete"):
+        enhanced_data = EnhancedData.objects.create(original_data=original_data, schema=self.schema, status=status)
+        enhanced_data.set_rows(self.rows)
+        return enhanced_data
+
+    def list_ids(self, query=""):
+        response = self.client.get(f"/api/enhanced-data/{query}")
+        self.assertEqual(response.status_code, 200, response.content)
+        return {item["id"] for item in response.json()["results"]}
+
+    def test_enhancements_are_filtered_by_status_and_original_data(self):
+        first, second = OriginalData.objects.create(), OriginalData.objects.create()
+        complete = self.create_enhancement(first)
+        pending = self.create_enhancement(first, status="pending")
+        other = self.create_enhancement(second)
+
+        self.assertEqual(self.list_ids(), {complete.id, pending.id, other.id})
+        self.assertEqual(self.list_ids("?status=complete"), {complete.id, other.id})
+        self.assertEqual(self.list_ids(f"?original_data={first.id}"), {complete.id, pending.id})
+        self.assertEqual(self.list_ids(f"?original_data={first.id}&status=pending"), {pending.id})
+
+    def test_invalid_filter_values_are_rejected(self):
+        for query, field in (("?status=done", "status"), ("?original_data=first", "original_data"), ("?original_data=-1", "original_data")):
+            response = self.client.get(f"/api/enhanced-data/{query}")
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn(field, response.json())
+
+    def test_cursor_pages_walk_every_record_newest_first(self):
+        original_data = OriginalData.objects.create()
+        created = [self.create_enhancement(original_data).id for _ in range(5)]
+
+        pages = []
+        url = "/api/enhanced-data/?page_size=2"
+        while url:
+            body = self.client.get(url).json()
+            pages.append([item["id"] for item in body["results"]])
+            url = body["next"]
+
+        self.assertEqual(pages, [created[4:2:-1], created[2:0:-1], created[:1]])
+        self.assertNotIn("data", self.client.get("/api/enhanced-data/").json()["results"][0])
+
+    def test_offset_and_limit_slice_the_original_data_rows(self):
+        original_data = OriginalData.objects.create(schema={"id": "int", "ceo": "str"})
+        original_data.set_rows(self.rows)
+        url = f"/api/original-data/{original_data.id}/"
+
+        self.assertEqual(self.client.get(url).json()["data"], self.rows)
+        self.assertEqual(self.client.get(f"{url}?offset=1&limit=2").json()["data"], self.rows[1:3])
+        self.assertEqual(self.client.get(f"{url}?offset=4&limit=10").json()["data"], self.rows[4:])
+        self.assertEqual(self.client.get(f"{url}?limit=0").json()["data"], [])
+        self.assertEqual(self.client.get(f"{url}?offset=-1").status_code, 400)
+        self.assertEqual(self.client.get(f"{url}?limit=many").status_code, 400)
+
+    def test_offset_and_limit_slice_the_enhanced_rows(self):
+        enhanced_data = self.create_enhancement(OriginalData.objects.create())
+        url = f"/api/enhanced-data/{enhanced_data.id}/"
+
+        self.assertEqual(self.client.get(url).json()["data"], self.rows)
+        self.assertEqual(self.client.get(f"{url}?offset=2&limit=2").json()["data"], self.rows[2:4])
+        self.assertEqual(self.client.get(f"{url}?offset=3").json()["data"], self.rows[3:])
+        self.assertEqual(self.client.get(f"{url}?offset=x").status_code, 400)
+
+    def test_offset_and_limit_slice_the_partial_rows_of_a_pending_job(self):
+        job = create_job([{"id": i} for i in range(4)], self.schema, [(0, 2), (2, 4)])
+        finished = [{"id": 2, "ceo": "Cy"}, {"id": 3, "ceo": "Di"}]
+        save_chunk_result(job.id, {"chunk_index": 1, "success": True, "data": finished, "error": None})
+        url = f"/api/enhanced-data/{job.id}/"
+
+        self.assertEqual(self.client.get(url).json()["data"], finished)
+        self.assertEqual(self.client.get(f"{url}?offset=1&limit=1").json()["data"], finished[1:])
+        self.assertEqual(self.client.get(f"{url}?partial=false").json()["data"], [])
@@ -3,6 +3,7 @@ from django.urls import include, path
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 from rest_framework.routers import DefaultRouter
 from main.views.enhanced_data import EnhancedDataView
+from main.views.metrics import prometheus_metrics
 from main.views.original_data import OriginalDataView
 
 
@@ -18,4 +19,5 @@ urlpatterns = [
     path('api/schema/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
 
     path('api/', include(router.urls)),
+    path('metrics', prometheus_metrics, name='metrics'),
 ]
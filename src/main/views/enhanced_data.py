@@ -1,20 +1,68 @@
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import status
-from main.serializers import EnhancedDataEnhanceRequestSerializer, EnhancedDataSerializer
-from main.tasks import process_enhancement_coordinator
+from graph.instrumentation import merge_metrics, metrics_totals
+from main.serializers import (
+    EnhancedDataEnhanceRequestSerializer,
+    EnhancedDataSerializer,
+    EnhancedDataStatsSerializer,
+    EnhancedDataSummarySerializer,
+)
+from main.events import stream_job_events
+from main.exports import stream_export
+from main.pagination import ROW_RANGE_PARAMETERS, CreatedAtCursorPagination, row_range
+from main.renderers import CSVRenderer, EventStreamRenderer, JSONLinesRenderer, ParquetRenderer
+from main.tasks import process_enhancement_coordinator, resume_enhancement_task
 from models.enhanced_data import EnhancedData
 from models.original_data import OriginalData
 from rest_framework.decorators import action
-from drf_spectacular.utils import extend_schema, OpenApiExample
+from rest_framework.exceptions import ValidationError
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiParameter
 
 class EnhancedDataView(viewsets.ModelViewSet):
     queryset = EnhancedData.objects.all()
     serializer_class = EnhancedDataSerializer
-    
+    pagination_class = CreatedAtCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != "list":
+            return queryset
+
+        status_filter = self.request.query_params.get("status")
+        if status_filter:
+            if status_filter not in dict(EnhancedData.STATUS_CHOICES):
+                raise ValidationError({"status": f"Must be one of: {', '.join(dict(EnhancedData.STATUS_CHOICES))}"})
+            queryset = queryset.filter(status=status_filter)
+        original_data_filter = self.request.query_params.get("original_data")
+        if original_data_filter:
+            if not original_data_filter.isdigit():
+                raise ValidationError({"original_data": "Must be an integer."})
+            queryset = queryset.filter(original_data_id=int(original_data_filter))
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return EnhancedDataSummarySerializer
+        return super().get_serializer_class()
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="status", type=str, enum=["pending", "complete", "failed"], description="Only list enhancements with this status"),
+            OpenApiParameter(name="original_data", type=int, description="Only list enhancements of this OriginalData"),
+        ]
+    )
     def list(self, request, *args, **kwargs):
         try:
             return super().list(request, *args, **kwargs)
+        except ValidationError:
+            raise
         except Exception as e:
             error_msg = str(e)
             if "status" in error_msg.lower() or "column" in error_msg.lower():
@@ -25,11 +73,140 @@ class EnhancedDataView(viewsets.ModelViewSet):
             traceback.print_exc()
             return Response({"error": error_msg}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="partial",
+                type=bool,
+                description="While the job is pending, return the rows of the chunks completed so far (default: true)",
+            ),
+            *ROW_RANGE_PARAMETERS,
+        ]
+    )
+    def retrieve(self, request, *args, **kwargs):
+        rows = row_range(request)
+        enhanced_data_obj = self.get_object()
+        data = self.get_serializer(enhanced_data_obj, context={**self.get_serializer_context(), "rows": rows}).data
+
+        if enhanced_data_obj.status == "pending" and request.query_params.get("partial", "true").lower() != "false":
+            data["data"] = list(islice(enhanced_data_obj.iter_partial_rows(), rows.start, rows.stop))
+
+        return Response(data)
+
+    @extend_schema(
+        responses={(200, "text/event-stream"): str},
+        description="Server-sent events with the job's status, progress and chunk completions. "
+                    "The first event is a snapshot of the current state; the stream ends once the job completes or fails.",
+    )
+    @action(detail=True, methods=['get'], url_path="events", renderer_classes=[EventStreamRenderer, JSONRenderer])
+    def events(self, request, pk=None):
+        enhanced_data_obj = self.get_object()
+
+        response = StreamingHttpResponse(stream_job_events(enhanced_data_obj), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Stop nginx/traefik from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    @extend_schema(
+        responses={200: EnhancedDataStatsSerializer},
+        description="Where the job's time and tokens go: LLM calls, tokens, retries, cache hits and wall time per graph "
+                    "node and tool, for the whole job and per chunk. While the job runs, the numbers cover the chunk runs finished so far.",
+    )
+    @action(detail=True, methods=['get'], url_path="stats")
+    def stats(self, request, pk=None):
+        enhanced_data_obj = self.get_object()
+
+        chunks = []
+        chunk_metrics = []
+        for chunk_index, chunk_status, start_row, end_row, metrics in enhanced_data_obj.chunks.values_list(
+            "chunk_index", "status", "start_row", "end_row", "metrics"
+        ).iterator():
+            chunks.append({
+                "chunk_index": chunk_index,
+                "status": chunk_status,
+                "rows": end_row - start_row,
+                "totals": metrics_totals(metrics),
+            })
+            chunk_metrics.append(metrics)
+
+        # The collector stores the job's metrics once it finishes; until then they are summed live
+        metrics = enhanced_data_obj.metrics if enhanced_data_obj.status != "pending" and enhanced_data_obj.metrics else merge_metrics(*chunk_metrics)
+        finished_at = timezone.now() if enhanced_data_obj.status == "pending" else enhanced_data_obj.updated_at
+
+        return Response(EnhancedDataStatsSerializer({
+            "id": enhanced_data_obj.id,
+            "status": enhanced_data_obj.status,
+            "total_chunks": enhanced_data_obj.total_chunks,
+            "chunks_done": enhanced_data_obj.chunks_done,
+            "chunks_failed": enhanced_data_obj.chunks_failed,
+            "elapsed_seconds": round((finished_at - enhanced_data_obj.created_at).total_seconds(), 3),
+            "stats": enhanced_data_obj.stats,
+            "metrics": {**metrics, "totals": metrics_totals(metrics)},
+            "chunks": chunks,
+        }).data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="format", type=str, enum=["csv", "jsonl", "parquet"], description="File format (default: csv)"),
+        ],
+        responses={
+            (200, "text/csv"): OpenApiTypes.BINARY,
+            (200, "application/jsonl"): OpenApiTypes.BINARY,
+            (200, "application/vnd.apache.parquet"): OpenApiTypes.BINARY,
+        },
+        description="Download the enhanced rows as a file. Rows are read and serialised in batches while the "
+                    "response streams, so the size of the result does not matter.",
+    )
+    @action(detail=True, methods=['get'], url_path="export", renderer_classes=[CSVRenderer, JSONLinesRenderer, ParquetRenderer])
+    def export(self, request, pk=None):
+        enhanced_data_obj = self.get_object()
+
+        if enhanced_data_obj.status != "complete":
+            return Response({"error": "Only complete enhancements can be exported"}, status=status.HTTP_409_CONFLICT)
+
+        export_format = request.accepted_renderer.format
+        response = StreamingHttpResponse(
+            stream_export(enhanced_data_obj.iter_rows(), enhanced_data_obj.schema, export_format),
+            content_type=request.accepted_renderer.media_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="enhanced-data-{enhanced_data_obj.id}.{export_format}"'
+        return response
+
+    @extend_schema(
+        request=None,
+        responses={202: EnhancedDataSerializer},
+        description="Re-run only the failed or unfinished chunks of an enhancement and merge them into the existing result",
+    )
+    @action(detail=True, methods=['post'], url_path="resume")
+    def resume(self, request, pk=None):
+        enhanced_data_obj = self.get_object()
+
+        if enhanced_data_obj.status == "pending":
+            return Response({"error": "Enhancement is still running"}, status=status.HTTP_409_CONFLICT)
+
+        if not enhanced_data_obj.schema:
+            return Response({"error": "EnhancedData has no stored schema, start a new enhancement instead"}, status=status.HTTP_400_BAD_REQUEST)
+
+        resumable_chunks = enhanced_data_obj.chunks.exclude(status="complete")
+        if enhanced_data_obj.chunks.exists() and not resumable_chunks.exists():
+            return Response({"error": "All chunks are already complete"}, status=status.HTTP_400_BAD_REQUEST)
+
+        resumable_chunks.update(status="pending", error="")
+        enhanced_data_obj.status = "pending"
+        enhanced_data_obj.chunks_failed = 0
+        enhanced_data_obj.save(update_fields=["status", "chunks_failed", "updated_at"])
+
+        resume_enhancement_task.delay(enhanced_data_obj.id)
+
+        return Response(EnhancedDataSerializer(enhanced_data_obj).data, status=status.HTTP_202_ACCEPTED)
+
 
     @extend_schema(
         request=EnhancedDataEnhanceRequestSerializer,
         responses={202: None},
-        description="Enhance the original data",
+        description="Enhance the original data. With `previous_enhanced_data_id`, only rows whose original content "
+                    "changed and fields added or changed since that job are enhanced; everything else is copied forward.",
         examples=[
             OpenApiExample(
                 name="Enhance the original data",
@@ -81,12 +258,8 @@ class EnhancedDataView(viewsets.ModelViewSet):
         except OriginalData.DoesNotExist:
             return Response({"error": f"OriginalData with id {original_data_id} not found"}, status=status.HTTP_404_NOT_FOUND)
         
-        original_data_list = original_data.data
-        if not original_data_list:
+        if not original_data.row_count:
             return Response({"error": "OriginalData contains no data"}, status=status.HTTP_400_BAD_REQUEST)
-        
-        if not isinstance(original_data_list, list):
-            return Response({"error": "OriginalData.data must be an array"}, status=status.HTTP_400_BAD_REQUEST)
 
         schema_dict = request.data.get("schema")
         if not schema_dict:
@@ -94,19 +267,26 @@ class EnhancedDataView(viewsets.ModelViewSet):
         
         if not isinstance(schema_dict, dict):
             return Response({"error": "schema must be a dictionary/object"}, status=status.HTTP_400_BAD_REQUEST)
+
+        previous_enhanced_data = None
+        previous_enhanced_data_id = request.data.get("previous_enhanced_data_id")
+        if previous_enhanced_data_id:
+            try:
+                previous_enhanced_data = EnhancedData.objects.get(id=previous_enhanced_data_id)
+            except EnhancedData.DoesNotExist:
+                return Response({"error": f"EnhancedData with id {previous_enhanced_data_id} not found"}, status=status.HTTP_404_NOT_FOUND)
+            if previous_enhanced_data.status != "complete":
+                return Response({"error": "Only a complete EnhancedData can be re-enhanced incrementally"}, status=status.HTTP_400_BAD_REQUEST)
         
         # Create EnhancedData object with pending status
         enhanced_data_obj = EnhancedData.objects.create(
-            data=[],
             status="pending",
-            original_data=original_data
+            schema=schema_dict,
+            original_data=original_data,
+            previous_enhanced_data=previous_enhanced_data,
         )
         
-        # Dispatch the coordinator task
-        process_enhancement_coordinator.delay(
-            enhanced_data_obj.id,
-            original_data_list,
-            schema_dict
-        )
+        # Dispatch the coordinator task; it reads the rows and schema from the database
+        process_enhancement_coordinator.delay(enhanced_data_obj.id)
         
         return Response(EnhancedDataSerializer(enhanced_data_obj).data, status=status.HTTP_202_ACCEPTED)
\ No newline at end of file
@@ -0,0 +1,20 @@
+from django.db.models import Count
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from main.metrics import read_metric_totals, render_prometheus
+from models.enhanced_data import EnhancedData
+
+
+@require_GET
+def prometheus_metrics(request):
+    """Prometheus scrape endpoint: LLM, token, retry, tool and job counters of the whole cluster."""
+    job_counts = dict.fromkeys(dict(EnhancedData.STATUS_CHOICES), 0)
+    job_counts.update(EnhancedData.objects.order_by().values_list("status").annotate(count=Count("id")))
+    try:
+        totals = read_metric_totals()
+    except Exception as e:
+        # Job gauges are still worth scraping while Redis is unreachable
+        print(f"Could not read metric totals: {e}")
+        totals = {}
+    return HttpResponse(render_prometheus(totals, job_counts), content_type="text/plain; version=0.0.4; charset=utf-8")
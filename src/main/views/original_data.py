@@ -1,8 +1,77 @@
+import csv
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from drf_spectacular.utils import extend_schema
 from rest_framework import viewsets
-from main.serializers import OriginalDataSerializer
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import status
+from main.ingest import IngestError, detect_file_type, ingest_rows, iter_upload_rows
+from main.pagination import ROW_RANGE_PARAMETERS, CreatedAtCursorPagination, row_range
+from main.serializers import (
+    OriginalDataSerializer,
+    OriginalDataSummarySerializer,
+    OriginalDataUploadResultSerializer,
+    OriginalDataUploadSerializer,
+)
 from models.original_data import OriginalData
+from models.original_data_row import OriginalDataRow
 
 
 class OriginalDataView(viewsets.ModelViewSet):
     queryset = OriginalData.objects.all()
-    serializer_class = OriginalDataSerializer
\ No newline at end of file
+    serializer_class = OriginalDataSerializer
+    pagination_class = CreatedAtCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "list":
+            # Only the first row is read from the database, for the overview preview
+            first_row = OriginalDataRow.objects.filter(dataset=OuterRef("pk"), row_index=0).values("payload")[:1]
+            queryset = queryset.annotate(first_row=Subquery(first_row))
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return OriginalDataSummarySerializer
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == "retrieve":
+            context["rows"] = row_range(self.request)
+        return context
+
+    @extend_schema(parameters=ROW_RANGE_PARAMETERS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(
+        request={"multipart/form-data": OriginalDataUploadSerializer},
+        responses={201: OriginalDataUploadResultSerializer},
+        description="Upload a CSV, JSON or JSONL file. The file is parsed on the server as it is read "
+                    "and its rows are stored in batches, so large files never have to fit in memory.",
+    )
+    @action(detail=False, methods=['post'], url_path="upload", parser_classes=[MultiPartParser])
+    def upload(self, request):
+        serializer = OriginalDataUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data["file"]
+
+        try:
+            file_type = serializer.validated_data.get("file_type") or detect_file_type(upload.name)
+            with transaction.atomic():
+                original_data = OriginalData.objects.create()
+                result = ingest_rows(
+                    original_data,
+                    iter_upload_rows(upload.file, file_type),
+                    serializer.validated_data.get("schema"),
+                )
+                if not result["row_count"]:
+                    raise IngestError("File contains no data")
+        except (IngestError, csv.Error, UnicodeDecodeError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"id": original_data.id, **result}, status=status.HTTP_201_CREATED)
@@ -0,0 +1,80 @@
+from typing import Any, Iterable, Iterator
+
+from django.db import models, transaction
+
+from graph.utils import content_hash
+
+ROW_BATCH_SIZE = 1000
+
+
+class DatasetRow(models.Model):
+    """One row of a dataset, stored as its own record so rows can be streamed by range instead of loaded as one blob."""
+
+    row_index = models.PositiveIntegerField(help_text="Position of the row in the dataset")
+    payload = models.JSONField(help_text="The row, as an object")
+    content_hash = models.CharField(max_length=64, db_index=True, help_text="Hash of the payload")
+
+    class Meta:
+        abstract = True
+        app_label = 'main'
+        ordering = ["row_index"]
+
+    def __str__(self):
+        return f"Row {self.row_index} of {self.dataset_id}"
+
+
+class RowStorageMixin:
+    """Row access for datasets whose rows live in a `rows` table of `DatasetRow`s."""
+
+    def iter_rows(self, start: int = 0, stop: int | None = None, chunk_size: int = ROW_BATCH_SIZE) -> Iterator[dict[str, Any]]:
+        """Stream the payloads of rows [start, stop) in order, fetching `chunk_size` rows at a time."""
+        rows = self.rows.filter(row_index__gte=start)
+        if stop is not None:
+            rows = rows.filter(row_index__lt=stop)
+        return rows.order_by("row_index").values_list("payload", flat=True).iterator(chunk_size=chunk_size)
+
+    def append_rows(
+        self,
+        rows: Iterable[dict[str, Any]],
+        start_index: int,
+        batch_size: int = ROW_BATCH_SIZE,
+        source_hashes: Iterable[str] | None = None,
+    ) -> int:
+        """Bulk insert `rows` from `start_index` on, one batch at a time; returns the number inserted.
+
+        `source_hashes` (enhanced datasets only) gives the content hash of the original row each row came from.
+        """
+        row_model = self.rows.model
+        source_hashes = iter(source_hashes) if source_hashes is not None else None
+        batch = []
+        count = 0
+        for row in rows:
+            extra = {"source_hash": next(source_hashes)} if source_hashes is not None else {}
+            batch.append(row_model(
+                dataset=self,
+                row_index=start_index + count,
+                payload=row,
+                content_hash=content_hash(row),
+                **extra,
+            ))
+            count += 1
+            if len(batch) >= batch_size:
+                row_model.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            row_model.objects.bulk_create(batch)
+        return count
+
+    def set_rows(
+        self,
+        rows: Iterable[dict[str, Any]],
+        batch_size: int = ROW_BATCH_SIZE,
+        source_hashes: Iterable[str] | None = None,
+    ) -> int:
+        """Replace every row of the dataset with `rows` and update `row_count`; returns the row count."""
+        with transaction.atomic():
+            self.rows.all().delete()
+            count = self.append_rows(rows, 0, batch_size, source_hashes)
+            type(self).objects.filter(pk=self.pk).update(row_count=count)
+        self.row_count = count
+        return count
@@ -1,29 +1,104 @@
+from graph.instrumentation import merge_metrics
+from models.dataset_row import RowStorageMixin
+from models.schema_fingerprint import SchemaFingerprintMixin
 from models.original_data import OriginalData
 from django.db import models
 
-class EnhancedData(models.Model):
+class EnhancedData(SchemaFingerprintMixin, RowStorageMixin, models.Model):
     STATUS_CHOICES = [
         ("pending", "Pending"),
         ("complete", "Complete"),
         ("failed", "Failed"),
     ]
     
-    data = models.JSONField(
-        help_text="Array of objects representing the enhanced data",
-        default=list
-    )
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
         default="pending",
         help_text="Status of the enhancement process"
     )
+    schema = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Target output schema the data was enhanced with"
+    )
+    schema_fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text="Fingerprint of the schema, kept up to date on save"
+    )
+    stats = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Job statistics such as cache hits and misses"
+    )
+    metrics = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="LLM calls, tokens, retries and wall time per graph node and tool, summed over the chunks"
+    )
+    total_chunks = models.PositiveIntegerField(default=0, help_text="Number of chunks the data was split into")
+    chunks_done = models.PositiveIntegerField(default=0, help_text="Number of successfully enhanced chunks")
+    chunks_failed = models.PositiveIntegerField(default=0, help_text="Number of chunks that failed")
+    row_count = models.PositiveIntegerField(default=0, editable=False, help_text="Number of rows")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     original_data = models.ForeignKey(OriginalData, on_delete=models.CASCADE)
+    previous_enhanced_data = models.ForeignKey(
+        "self",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="incremental_runs",
+        help_text="Earlier job whose results for unchanged rows and fields were copied forward"
+    )
+    dedup_fields = models.JSONField(
+        default=list,
+        blank=True,
+        editable=False,
+        help_text="Fields that deduplicated rows take from their entity's representative"
+    )
 
     class Meta:
         app_label = 'main'
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="enhanced_data_created_idx"),
+            models.Index(fields=["status", "-created_at", "-id"], name="enhanced_data_status_idx"),
+            models.Index(fields=["original_data", "-created_at", "-id"], name="enhanced_data_original_idx"),
+        ]
+
+    def iter_partial_rows(self):
+        """Stream the enhanced rows of the chunks completed so far, in dataset order."""
+        from main.dedup import DuplicateFanOut
+
+        completed = self.chunks.filter(status="complete").order_by("chunk_index")
+        fan_out = DuplicateFanOut(completed.values_list("duplicates", flat=True), self.dedup_fields)
+        for start_row, chunk_rows, duplicates in completed.values_list("start_row", "data", "duplicates").iterator():
+            for _, row in fan_out.apply(start_row, chunk_rows, duplicates):
+                yield row
+
+    def iter_partial_rows_with_sources(self):
+        """`iter_partial_rows` paired with the content hash of the original row each was enhanced from ("" when unknown)."""
+        from main.dedup import DuplicateFanOut
+
+        completed = self.chunks.filter(status="complete").order_by("chunk_index")
+        fan_out = DuplicateFanOut(completed.values_list("duplicates", flat=True), self.dedup_fields)
+        for start_row, end_row, chunk_rows, duplicates in completed.values_list("start_row", "end_row", "data", "duplicates").iterator():
+            source_hashes = list(
+                self.original_data.rows.filter(row_index__gte=start_row, row_index__lt=end_row)
+                .order_by("row_index").values_list("content_hash", flat=True)
+            )
+            # A chunk whose graph returned a different number of rows has no row-to-row mapping
+            if len(source_hashes) != len(chunk_rows):
+                source_hashes = [""] * len(chunk_rows)
+            for offset, row in fan_out.apply(start_row, chunk_rows, duplicates):
+                yield row, source_hashes[offset]
+
+    def aggregate_metrics(self):
+        """Sum the metrics of every chunk run so far, including failed attempts."""
+        return merge_metrics(*self.chunks.values_list("metrics", flat=True).iterator())
 
     def __str__(self):
-        return str(self.data) if self.data else "Empty data"
\ No newline at end of file
+        return f"Enhanced data {self.id} ({self.status}, {self.row_count} rows)"
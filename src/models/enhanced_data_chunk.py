@@ -0,0 +1,59 @@
+from models.enhanced_data import EnhancedData
+from django.db import models
+
+class EnhancedDataChunk(models.Model):
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("complete", "Complete"),
+        ("failed", "Failed"),
+    ]
+
+    enhanced_data = models.ForeignKey(EnhancedData, on_delete=models.CASCADE, related_name="chunks")
+    chunk_index = models.PositiveIntegerField(help_text="Position of the chunk in the dataset")
+    start_row = models.PositiveIntegerField(help_text="Index of the first original row in the chunk")
+    end_row = models.PositiveIntegerField(help_text="Index after the last original row in the chunk")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="pending",
+        help_text="Status of the chunk"
+    )
+    data = models.JSONField(
+        help_text="Array of objects representing the enhanced rows of the chunk",
+        default=list
+    )
+    duplicates = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Positions in the chunk of rows filled in from their entity's representative, mapped to its row index"
+    )
+    resolved = models.JSONField(
+        default=list,
+        blank=True,
+        editable=False,
+        help_text="Each row's output resolved before the graph (pre-clean, row cache, previous job or duplicate placeholder), null for rows the graph enhances"
+    )
+    carried = models.JSONField(
+        default=list,
+        blank=True,
+        editable=False,
+        help_text="In incremental jobs, the kept field values copied forward for each row that needs the graph for new fields only"
+    )
+    error = models.TextField(blank=True, default="")
+    metrics = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="LLM calls, tokens, retries and wall time per graph node and tool, over every run of the chunk"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = 'main'
+        ordering = ["chunk_index"]
+        constraints = [
+            models.UniqueConstraint(fields=["enhanced_data", "chunk_index"], name="unique_enhanced_data_chunk"),
+        ]
+
+    def __str__(self):
+        return f"Chunk {self.chunk_index} of {self.enhanced_data_id} ({self.status})"
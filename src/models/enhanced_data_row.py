@@ -0,0 +1,17 @@
+from models.dataset_row import DatasetRow
+from models.enhanced_data import EnhancedData
+from django.db import models
+
+class EnhancedDataRow(DatasetRow):
+    dataset = models.ForeignKey(EnhancedData, on_delete=models.CASCADE, related_name="rows")
+    source_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        help_text="Content hash of the original row this row was enhanced from, empty when unknown"
+    )
+
+    class Meta(DatasetRow.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=["dataset", "row_index"], name="unique_enhanced_data_row"),
+        ]
@@ -0,0 +1,18 @@
+from django.db import models
+
+class EnhancementCacheEntry(models.Model):
+    key = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text="Hash of row content, schema fingerprint, model names and prompt version"
+    )
+    data = models.JSONField(help_text="Enhanced row produced for the cached input row")
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        app_label = 'main'
+
+    def __str__(self):
+        return self.key
@@ -1,18 +1,30 @@
 from django.db import models
+from models.dataset_row import RowStorageMixin
+from models.schema_fingerprint import SchemaFingerprintMixin
 
-class OriginalData(models.Model):
-    data = models.JSONField(default=list)
+class OriginalData(SchemaFingerprintMixin, RowStorageMixin, models.Model):
     schema = models.JSONField(
         default=dict,
         blank=True,
         null=True,
         help_text="Schema definition mapping field names to types (e.g., {'id': 'int', 'name': 'str'})"
     )
+    schema_fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text="Fingerprint of the schema, kept up to date on save"
+    )
+    row_count = models.PositiveIntegerField(default=0, editable=False, help_text="Number of rows")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         app_label = 'main'
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="original_data_created_idx"),
+        ]
 
     def __str__(self):
-        return self.data
\ No newline at end of file
+        return f"Original data {self.id} ({self.row_count} rows)"
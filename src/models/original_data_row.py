@@ -0,0 +1,11 @@
+from models.dataset_row import DatasetRow
+from models.original_data import OriginalData
+from django.db import models
+
+class OriginalDataRow(DatasetRow):
+    dataset = models.ForeignKey(OriginalData, on_delete=models.CASCADE, related_name="rows")
+
+    class Meta(DatasetRow.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=["dataset", "row_index"], name="unique_original_data_row"),
+        ]
@@ -0,0 +1,16 @@
+from graph.schema_registry import schema_fingerprint
+
+
+class SchemaFingerprintMixin:
+    """Keeps `schema_fingerprint` in step with `schema` on every save.
+
+    Jobs and datasets refer to their schema by this fingerprint, the same key
+    workers compile and cache the schema's validators under.
+    """
+
+    def save(self, *args, **kwargs):
+        self.schema_fingerprint = schema_fingerprint(self.schema) if self.schema else ""
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "schema" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "schema_fingerprint"}
+        super().save(*args, **kwargs)
@@ -153,7 +153,57 @@ ALLOWED_HOSTS = ['*']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_RESULT_SERIALIZER = 'json'
+# Tasks carry IDs rather than rows, but compress whatever does cross the broker
+CELERY_TASK_COMPRESSION = os.environ.get("CELERY_TASK_COMPRESSION", "zlib") or None
+CELERY_RESULT_COMPRESSION = os.environ.get("CELERY_RESULT_COMPRESSION", "zlib") or None
 CELERY_TIMEZONE = 'UTC'
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes max per task
-CELERY_WORKER_MAX_TASKS_PER_CHILD = 50  
\ No newline at end of file
+CELERY_WORKER_MAX_TASKS_PER_CHILD = 50
+# Keep DB connections open across tasks in a worker process (bounded by CONN_MAX_AGE)
+CELERY_DB_REUSE_MAX = 100
+
+# Row-level enhancement cache (main/cache.py)
+ENHANCEMENT_CACHE_TTL = int(os.environ.get("ENHANCEMENT_CACHE_TTL", 7 * 24 * 60 * 60))
+ENHANCEMENT_CACHE_MAX_ENTRIES = int(os.environ.get("ENHANCEMENT_CACHE_MAX_ENTRIES", 100_000))
+
+# Chunking (graph/utils.TokenBudgetChunker); the token budget defaults to the per-model value in graph/models.py
+ENHANCEMENT_CHUNK_TOKEN_BUDGET = int(os.environ["ENHANCEMENT_CHUNK_TOKEN_BUDGET"]) if os.environ.get("ENHANCEMENT_CHUNK_TOKEN_BUDGET") else None
+ENHANCEMENT_MAX_CHUNK_SIZE = int(os.environ.get("ENHANCEMENT_MAX_CHUNK_SIZE", 50))
+
+# Recent graph messages each agent sees besides the task message (graph/utils.context_window)
+ENHANCEMENT_CONTEXT_WINDOW = int(os.environ.get("ENHANCEMENT_CONTEXT_WINDOW", 4))
+
+# "patch": the enhancer returns per-row field updates applied in Python; "text": the full dataset as free text
+ENHANCEMENT_ENHANCER_MODE = os.environ.get("ENHANCEMENT_ENHANCER_MODE", "text")
+
+# "llm": supervisor and reviewer LLM calls route every step; "rules": routing is decided in Python
+# (schema validation, row count and null rate) and the reviewer LLM only runs when those checks fail
+ENHANCEMENT_ROUTING_MODE = os.environ.get("ENHANCEMENT_ROUTING_MODE", "llm")
+ENHANCEMENT_MAX_REVIEWS = int(os.environ.get("ENHANCEMENT_MAX_REVIEWS", 2))
+ENHANCEMENT_MAX_NULL_RATE = float(os.environ.get("ENHANCEMENT_MAX_NULL_RATE", 0.1))
+
+# "llm": the composer LLM reshapes every chunk; "parse": the enhancer's records are validated in Python
+# and only the ones that fail go to the composer LLM for repair
+ENHANCEMENT_COMPOSER_MODE = os.environ.get("ENHANCEMENT_COMPOSER_MODE", "llm")
+
+# "rows": chunks of whole rows go through the agent graph; "columns": each missing field is filled with one
+# call per chunk that sends only the rows' key values (graph/columns.py), in chunks of up to
+# ENHANCEMENT_COLUMN_BATCH_SIZE rows. Key fields are comma-separated; by default every text value is a key
+ENHANCEMENT_STRATEGY = os.environ.get("ENHANCEMENT_STRATEGY", "rows")
+ENHANCEMENT_COLUMN_BATCH_SIZE = int(os.environ.get("ENHANCEMENT_COLUMN_BATCH_SIZE", 200))
+ENHANCEMENT_COLUMN_KEY_FIELDS = [field.strip() for field in os.environ.get("ENHANCEMENT_COLUMN_KEY_FIELDS", "").split(",") if field.strip()]
+
+# Entity deduplication (main/dedup.py): pending rows with the same normalised key fields (comma-separated) are
+# enhanced once and the result fanned out; below 1, keys at least this similar (difflib ratio) also match.
+# No key fields turns deduplication off
+ENHANCEMENT_DEDUP_KEY_FIELDS = [field.strip() for field in os.environ.get("ENHANCEMENT_DEDUP_KEY_FIELDS", "").split(",") if field.strip()]
+ENHANCEMENT_DEDUP_FUZZY_THRESHOLD = float(os.environ.get("ENHANCEMENT_DEDUP_FUZZY_THRESHOLD", 1.0))
+
+# Upper bound on chunks running the graph at once across all workers; lowered automatically on 429s
+ENHANCEMENT_MAX_CONCURRENT_CHUNKS = int(os.environ.get("ENHANCEMENT_MAX_CONCURRENT_CHUNKS", 50))
+
+# "prefork": one chunk per Celery task; "async": each task runs a batch of chunk graphs on one event loop
+ENHANCEMENT_EXECUTION_MODE = os.environ.get("ENHANCEMENT_EXECUTION_MODE", "prefork")
+ENHANCEMENT_ASYNC_BATCH_SIZE = int(os.environ.get("ENHANCEMENT_ASYNC_BATCH_SIZE", 20))
+ENHANCEMENT_ASYNC_MAX_IN_FLIGHT = int(os.environ.get("ENHANCEMENT_ASYNC_MAX_IN_FLIGHT", 20))
\ No newline at end of file